@@ -1,7 +1,11 @@
 import json
 import os
+import sys
 from enrich_corpus import enrich_entries, load_dewey_data
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from src import schema_migrations  # noqa: E402
+
 def add_new_data():
     # Load the Dewey Decimal data
     # Construct the path to the data file relative to this script's location
@@ -18,7 +22,7 @@ def add_new_data():
     new_entries = []
     for filepath in new_data_files:
         with open(filepath, 'r') as f:
-            new_entries.extend(json.load(f))
+            new_entries.extend(schema_migrations.migrate_all(json.load(f), errors='raise'))
 
     enriched_entries = enrich_entries(new_entries, dewey_data)
 
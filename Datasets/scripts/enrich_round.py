@@ -3,53 +3,30 @@
 Enrich a staging round in place:
 - If cultural_tradition is missing, tag as Non-Western (opt-in)
 - If grounding_authority lacks a URL, add a sensible default per record (opt-in)
-- Keeps pretty.json and clean.jsonl synchronized
+- Rewrites clean.jsonl and regenerates the pretty.json view from it
 
 Example (PowerShell):
 py -3 nyaya\Datasets\scripts\enrich_round.py --round staging_round_0001 --tag-nonwestern --add-urls
 """
 from __future__ import annotations
-import argparse, json
+import argparse, json, sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import jsonl_codec, round_files  # noqa: E402
+
 NYAYA_ROOT = Path('nyaya')
 ROUNDS_DIR = NYAYA_ROOT / 'Datasets' / 'rounds'
 
 
-def read_pretty(p: Path) -> List[Dict[str, Any]]:
-    if not p.exists():
-        return []
-    try:
-        data = json.loads(p.read_text(encoding='utf-8'))
-        return data if isinstance(data, list) else []
-    except Exception:
-        return []
-
-
 def read_jsonl(p: Path) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    if not p.exists():
-        return items
-    for line in p.read_text(encoding='utf-8').splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        items.append(json.loads(s))
-    return items
-
-
-def write_pretty(p: Path, arr: List[Dict[str, Any]]):
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(arr, ensure_ascii=False, indent=2), encoding='utf-8')
+    return jsonl_codec.read_jsonl(p, missing_ok=True)
 
 
 def write_jsonl(p: Path, items: List[Dict[str, Any]]):
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open('w', encoding='utf-8') as f:
-        for r in items:
-            f.write(json.dumps(r, ensure_ascii=False) + '\n')
+    jsonl_codec.write_jsonl(p, items)
 
 
 def has_url(s: str) -> bool:
@@ -96,26 +73,20 @@ def main():
     ap.add_argument('--add-urls', action='store_true')
     args = ap.parse_args()
 
-    round_dir = ROUNDS_DIR / args.round
-    pretty_path = round_dir / f"nyaya_corpus_{args.round}_pretty.json"
-    clean_path = round_dir / f"nyaya_corpus_{args.round}_clean.jsonl"
+    pretty_path, clean_path = round_files.round_paths(ROUNDS_DIR, args.round)
 
     accessed = datetime.utcnow().strftime('%Y-%m-%d')
 
-    arr = read_pretty(pretty_path)
     items = read_jsonl(clean_path)
-
-    changed_pretty = enrich(arr, args.tag_nonwestern, args.add_urls, accessed)
     changed_clean = enrich(items, args.tag_nonwestern, args.add_urls, accessed)
 
-    if changed_pretty:
-        write_pretty(pretty_path, arr)
     if changed_clean:
         write_jsonl(clean_path, items)
+        round_files.write_pretty(pretty_path, items)
+        round_files.mark_pretty_fresh(pretty_path, clean_path)
 
     out = {
         'round': args.round,
-        'changed_pretty': changed_pretty,
         'changed_clean': changed_clean,
         'file_pretty': str(pretty_path),
         'file_clean': str(clean_path)
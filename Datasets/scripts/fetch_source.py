@@ -5,115 +5,51 @@ Lightweight source fetcher for Nyāya dataset research notes.
 Usage (Windows PowerShell):
   python nyaya/Datasets/scripts/fetch_source.py --url <URL> --provider sep --slug speech-acts \
     --outdir nyaya/Datasets/sources/sep
+  python nyaya/Datasets/scripts/fetch_source.py --refresh --outdir nyaya/Datasets/sources
 
 Notes
 - Saves a note file with metadata header and extracted readable text (best-effort).
 - Respects copyrights by storing for internal research; prefer writing your own summary in the note file after fetch.
-- Dependencies: requests, beautifulsoup4, readability-lxml (optional)
+- Batch mode (--manifest rows.csv, or --refresh to re-fetch every existing note) runs
+  src/source_fetch.py: concurrent, pooled requests through an on-disk ETag/Last-Modified
+  cache, with text extraction in a process pool.
+- Dependencies: requests, beautifulsoup4, readability-lxml (optional; stdlib fallbacks otherwise)
 """
 import argparse
-import datetime as dt
-import re
 import sys
-from dataclasses import dataclass
 from pathlib import Path
 
-import requests
-from bs4 import BeautifulSoup
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import source_fetch  # noqa: E402
+from src.source_fetch import NoteData, extract_text, sanitize_filename, write_note  # noqa: E402,F401
 
-try:
-    from readability import Document  # type: ignore
-    HAVE_READABILITY = True
-except Exception:
-    HAVE_READABILITY = False
+CACHE_DIR = Path(__file__).resolve().parents[1] / "sources" / source_fetch.DEFAULT_CACHE.name
 
-UA = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
-)
-
-@dataclass
-class NoteData:
-    provider: str
-    slug: str
-    url: str
-    title: str
-    text: str
-
-
-def sanitize_filename(name: str) -> str:
-    name = name.lower().strip()
-    name = re.sub(r"[^a-z0-9\-]+", "-", name)
-    name = re.sub(r"-+", "-", name).strip("-")
-    return name or "source"
 
 def fetch_html(url: str) -> str:
-    r = requests.get(url, headers={"User-Agent": UA}, timeout=30)
-    r.raise_for_status()
-    return r.text
-
-def extract_text(html: str) -> tuple[str, str]:
-    title = ""
-    try:
-        soup = BeautifulSoup(html, "lxml")
-        title = (soup.title.string or "").strip() if soup.title else ""
-    except Exception:
-        pass
-
-    # Prefer readability if available
-    if HAVE_READABILITY:
-        try:
-            doc = Document(html)
-            title = doc.short_title() or title
-            content_html = doc.summary(html_partial=True)
-            soup = BeautifulSoup(content_html, "lxml")
-            text = soup.get_text("\n", strip=True)
-            return title, text
-        except Exception:
-            pass
-
-    # Fallback: heuristic main content extraction
-    try:
-        soup = BeautifulSoup(html, "lxml")
-        # Choose the largest text block among article/main/content containers
-        candidates = soup.select("article, main, #content, .content, #main, .entry-content")
-        blocks = candidates or [soup.body or soup]
-        best_text = ""
-        best_len = 0
-        for b in blocks:
-            t = b.get_text("\n", strip=True)
-            if len(t) > best_len:
-                best_text, best_len = t, len(t)
-        return title, best_text
-    except Exception:
-        return title, ""
-
-def write_note(outdir: Path, note: NoteData) -> Path:
-    date = dt.datetime.utcnow().strftime("%Y%m%d")
-    base = f"{sanitize_filename(note.slug)}_{sanitize_filename(note.provider)}_{date}.txt"
-    path = outdir / base
-    header = [
-        f"URL: {note.url}",
-        f"Provider: {note.provider}",
-        f"Title: {note.title}",
-        f"Fetched-At-UTC: {dt.datetime.utcnow().isoformat()}",
-        "",
-        "--- Extracted text (best-effort) ---",
-        "",
-    ]
-    content = "\n".join(header) + (note.text or "[No text extracted]")
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
-    return path
+    res = source_fetch.fetch(source_fetch.make_session(1), source_fetch.HttpCache(CACHE_DIR), url)
+    if res.body is None:
+        raise RuntimeError(f"{url}: {res.error}")
+    return res.html
 
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--url", required=True)
-    p.add_argument("--provider", required=True, help="sep|iep|other")
-    p.add_argument("--slug", required=True, help="short identifier, e.g., speech-acts")
+    p.add_argument("--url")
+    p.add_argument("--provider", help="sep|iep|other")
+    p.add_argument("--slug", help="short identifier, e.g., speech-acts")
     p.add_argument("--outdir", default="nyaya/Datasets/sources", help="output dir")
+    p.add_argument("--manifest", help="batch mode: CSV/JSONL of url, provider, slug rows")
+    p.add_argument("--refresh", action="store_true", help="batch mode: re-fetch every note under --outdir")
+    p.add_argument("--workers", type=int, default=8, help="batch mode: concurrent requests")
     args = p.parse_args()
 
+    if args.manifest or args.refresh:
+        batch = ["--outdir", args.outdir, "--workers", str(args.workers)]
+        batch += ["--manifest", args.manifest] if args.manifest else ["--refresh", args.outdir]
+        return source_fetch.main(batch)
+    if not (args.url and args.provider and args.slug):
+        p.error("--url, --provider and --slug are required unless --manifest or --refresh is given")
+
     outdir = Path(args.outdir)
     if outdir.name not in {"sources", "sep", "iep"}:
         # Allow both nyaya/Datasets/sources and a nested provider dir
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Finalize a staging round:
-- Writes an approved snapshot under Datasets/approved/
+- Records the approved round as a snapshot in the content-addressed store
+  (Datasets/store); restore/diff with src/snapshot_store.py
+- Optionally exports the snapshot as a file under Datasets/approved/ (--output)
 - Optionally merges unique records into nyaya/nyaya_corpus_clean.jsonl
 - Respects validation_result.json unless --force is set
 
@@ -10,34 +12,27 @@ py -3 nyaya\Datasets\scripts\finalize_round.py --round staging_round_0001 --merg
 py -3 nyaya\Datasets\scripts\finalize_round.py --round staging_round_0001 --output approved_custom.jsonl --force
 """
 from __future__ import annotations
-import argparse, json
+import argparse, json, sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Set
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import jsonl_codec, schema_migrations, snapshot_store  # noqa: E402
+
 NYAYA_ROOT = Path('nyaya')
 ROUNDS_DIR = NYAYA_ROOT / 'Datasets' / 'rounds'
 APPROVED_DIR = NYAYA_ROOT / 'Datasets' / 'approved'
+STORE_DIR = NYAYA_ROOT / 'Datasets' / 'store'
 CLEAN_FILE = NYAYA_ROOT / 'nyaya_corpus_clean.jsonl'
 
 
 def read_jsonl(p: Path) -> List[Dict[str, Any]]:
-    if not p.exists():
-        return []
-    items: List[Dict[str, Any]] = []
-    for line in p.read_text(encoding='utf-8').splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        items.append(json.loads(s))
-    return items
+    return jsonl_codec.read_jsonl(p, missing_ok=True)
 
 
 def append_jsonl(p: Path, items: List[Dict[str, Any]]):
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open('a', encoding='utf-8') as f:
-        for r in items:
-            f.write(json.dumps(r, ensure_ascii=False) + '\n')
+    jsonl_codec.write_jsonl(p, items, append=True)
 
 
 def main():
@@ -45,7 +40,7 @@ def main():
     ap.add_argument('--round', required=True)
     ap.add_argument('--merge', action='store_true', help='Append unique records into nyaya_corpus_clean.jsonl')
     ap.add_argument('--force', action='store_true', help='Proceed even if validation_result.json indicates failure')
-    ap.add_argument('--output', help='Approved snapshot filename (defaults to approved_YYYYMMDD_<round>.jsonl)')
+    ap.add_argument('--output', help='Also export the approved snapshot to this filename under Datasets/approved/ (.jsonl, .jsonl.zst or .jsonl.gz)')
     args = ap.parse_args()
 
     round_dir = ROUNDS_DIR / args.round
@@ -61,28 +56,31 @@ def main():
         except Exception as e:
             raise SystemExit(f'Could not parse validation result: {e}')
 
-    items = read_jsonl(clean_path)
+    # Rounds pasted before records were stamped at ingest are migrated here, before they reach the corpus
+    items = schema_migrations.migrate_all(read_jsonl(clean_path), errors='raise')
     if not items:
         raise SystemExit(f'No items found in {clean_path}')
 
     today = datetime.utcnow().strftime('%Y%m%d')
-    out_name = args.output or f"approved_{today}_{args.round}.jsonl"
-    approved_path = APPROVED_DIR / out_name
+    store = snapshot_store.SnapshotStore(STORE_DIR)
 
-    # Write approved snapshot
-    approved_path.parent.mkdir(parents=True, exist_ok=True)
-    approved_path.write_text('', encoding='utf-8')  # truncate/create
-    append_jsonl(approved_path, items)
+    # Record approved snapshot (only records not already in the store take space)
+    snapshot = store.snapshot(f"approved_{today}_{args.round}", items,
+                              ref=f"approved/{args.round}", meta={'round': args.round, 'source': str(clean_path)})
+    approved_path = None
+    if args.output:
+        approved_path = APPROVED_DIR / args.output
+        store.restore(snapshot['name'], approved_path)
 
     merged = 0
     skipped = 0
     if args.merge:
         existing_ids: Set[str] = set()
-        if CLEAN_FILE.exists():
-            for r in read_jsonl(CLEAN_FILE):
-                rid = str(r.get('id',''))
-                if rid:
-                    existing_ids.add(rid)
+        existing = read_jsonl(CLEAN_FILE)
+        for r in existing:
+            rid = str(r.get('id',''))
+            if rid:
+                existing_ids.add(rid)
         new_items = []
         for r in items:
             rid = str(r.get('id',''))
@@ -90,12 +88,15 @@ def main():
                 skipped += 1
                 continue
             new_items.append(r)
+        parent = store.backup_file(CLEAN_FILE, existing)
         append_jsonl(CLEAN_FILE, new_items)
+        store.record_append(CLEAN_FILE, new_items, parent, meta={'round': args.round})
         merged = len(new_items)
 
     summary = {
         'round': args.round,
-        'approved_snapshot': str(approved_path),
+        'approved_snapshot': snapshot['name'],
+        'exported_to': str(approved_path) if approved_path else None,
         'snapshot_count': len(items),
         'merged_into_clean': merged,
         'skipped_existing': skipped,
@@ -21,8 +21,16 @@ Input format
 
 Validation
 - Required fields: domain, pratijna, hetu, udaharana, upanaya, nigamana, grounding_authority
+- Other registered schemas (e.g. major/minor premise batches) are migrated first;
+  every written record carries the current schema_version.
 - Normalizes whitespace; assigns an id if missing.
 
+Cost
+- The round's clean JSONL is the source of truth and is only appended to.
+- The pretty view is extended in place (O(batch)) while it is in sync with the
+  clean file; a stale view is left alone and regenerated on demand with
+  `round_tools.py to-pretty --if-stale`.
+
 """
 import sys
 import json
@@ -31,6 +39,9 @@ from pathlib import Path
 from typing import List, Dict, Any
 import uuid
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import jsonl_codec, round_files, schema_migrations  # noqa: E402
+
 REQUIRED = ['domain','pratijna','hetu','udaharana','upanaya','nigamana','grounding_authority']
 
 NYAYA_ROOT = Path('nyaya')
@@ -44,16 +55,18 @@ def normalize_text(s: Any) -> str:
     return ' '.join(str(s).strip().split())
 
 def validate(rec: Dict[str, Any]) -> Dict[str, Any]:
+    if schema_migrations.detect(rec) is not None:
+        rec = schema_migrations.migrate(rec)
     r = {k: normalize_text(rec.get(k)) for k in REQUIRED}
     r['id'] = rec.get('id') or str(uuid.uuid4())
     # keep optional metadata if present
-    for k in ('complexity_indicators','cultural_tradition','cross_references','notes','source'):
+    for k in ('complexity_indicators','cultural_tradition','cross_references','notes','source','migrated_from'):
         if k in rec:
             r[k] = rec[k]
     missing = [k for k in REQUIRED if not r[k]]
     if missing:
         raise ValueError(f"Missing fields: {missing}")
-    return r
+    return schema_migrations.migrate(r)
 
 
 def read_input_text(path: str | None) -> str:
@@ -81,29 +94,7 @@ def parse_payload(txt: str) -> List[Dict[str, Any]]:
 
 
 def append_global_staging(valids: List[Dict[str, Any]]):
-    GLOBAL_STAGING.parent.mkdir(parents=True, exist_ok=True)
-    with GLOBAL_STAGING.open('a', encoding='utf-8') as f:
-        for r in valids:
-            f.write(json.dumps(r, ensure_ascii=False) + '\n')
-
-
-def load_pretty(pretty_path: Path) -> List[Dict[str, Any]]:
-    if not pretty_path.exists():
-        return []
-    arr = json.loads(pretty_path.read_text(encoding='utf-8'))
-    return arr if isinstance(arr, list) else []
-
-
-def write_pretty(pretty_path: Path, arr: List[Dict[str, Any]]):
-    pretty_path.parent.mkdir(parents=True, exist_ok=True)
-    pretty_path.write_text(json.dumps(arr, ensure_ascii=False, indent=2), encoding='utf-8')
-
-
-def append_clean(clean_path: Path, valids: List[Dict[str, Any]]):
-    clean_path.parent.mkdir(parents=True, exist_ok=True)
-    with clean_path.open('a', encoding='utf-8') as f:
-        for r in valids:
-            f.write(json.dumps(r, ensure_ascii=False) + '\n')
+    jsonl_codec.write_jsonl(GLOBAL_STAGING, valids, append=True)
 
 
 def main():
@@ -123,19 +114,14 @@ def main():
         except Exception as e:
             errors.append(f"Item {i}: {e}")
 
-    round_dir = ROUNDS_DIR / args.round
-    pretty_path = round_dir / f"nyaya_corpus_{args.round}_pretty.json"
-    clean_path = round_dir / f"nyaya_corpus_{args.round}_clean.jsonl"
+    pretty_path, clean_path = round_files.round_paths(ROUNDS_DIR, args.round)
 
+    pretty_state = None
     if not args.dry_run:
         # Global staging
         append_global_staging(valids)
-        # Round pretty (append to array)
-        arr = load_pretty(pretty_path)
-        arr.extend(valids)
-        write_pretty(pretty_path, arr)
-        # Round clean (append lines)
-        append_clean(clean_path, valids)
+        # Round clean (append lines) and pretty view (append in place while in sync)
+        pretty_state = round_files.append_round(pretty_path, clean_path, valids)['pretty']
 
     summary = {
         'round': args.round,
@@ -144,6 +130,7 @@ def main():
         'errors': errors,
         'global_staging': str(GLOBAL_STAGING),
         'round_pretty': str(pretty_path),
+        'round_pretty_state': pretty_state,
         'round_clean': str(clean_path),
         'dry_run': args.dry_run,
     }
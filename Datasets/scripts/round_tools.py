@@ -3,12 +3,20 @@
 Round tools: convert between pretty (JSON array, indented) and clean (JSONL),
 plus map pretty index to clean line for manual deletion.
 
+The clean JSONL is the source of truth; the pretty file is a generated view
+(see src/round_files.py). Both conversions stream record by record.
+
 Usage (Windows PowerShell):
   # Convert staging JSONL to pretty JSON
   python nyaya/Datasets/scripts/round_tools.py to-pretty `
     --input nyaya/nyaya_corpus_staging.jsonl `
     --output nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_pretty.json
 
+  # Regenerate the pretty view only if the clean file changed since it was written
+  python nyaya/Datasets/scripts/round_tools.py to-pretty --if-stale `
+    --input nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl `
+    --output nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_pretty.json
+
   # Convert pretty JSON to clean JSONL
   python nyaya/Datasets/scripts/round_tools.py to-clean `
     --input nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_pretty.json `
@@ -19,50 +27,74 @@ Usage (Windows PowerShell):
     --pretty nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_pretty.json `
     --clean nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl `
     --index 12
+
+  # Page through a large round (or fetch one record by id) via the .idx line index
+  python nyaya/Datasets/scripts/round_tools.py show `
+    --clean nyaya/Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl `
+    --page 3 --size 20
 """
 import argparse
 import json
+import sys
 from pathlib import Path
+from typing import Optional
 
-def to_pretty(input_path: Path, output_path: Path) -> None:
-    objs = []
-    with input_path.open('r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            objs.append(json.loads(line))
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(objs, ensure_ascii=False, indent=2), encoding='utf-8')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import jsonl_codec, round_files  # noqa: E402
+from src.jsonl_index import JsonlIndex  # noqa: E402
+from src.jsonl_repair import iter_objects  # noqa: E402
+
+
+def to_pretty(input_path: Path, output_path: Path, if_stale: bool = False) -> None:
+    if if_stale and round_files.is_pretty_fresh(output_path, input_path):
+        print(f"Pretty JSON array is up to date: {output_path}")
+        return
+    round_files.render_pretty(input_path, output_path)
     print(f"Wrote pretty JSON array: {output_path}")
 
 def to_clean(input_path: Path, output_path: Path) -> None:
-    data = json.loads(Path(input_path).read_text(encoding='utf-8'))
-    if not isinstance(data, list):
-        raise ValueError("Pretty file must be a JSON array of objects")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open('w', encoding='utf-8') as f:
-        for obj in data:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    with Path(input_path).open('rb') as f:
+        head = f.read(4096).lstrip(b'\xef\xbb\xbf \t\r\n')
+        if not head.startswith(b'['):
+            raise ValueError("Pretty file must be a JSON array of objects")
+        f.seek(0)
+        jsonl_codec.write_jsonl(output_path, iter_objects(f))
     print(f"Wrote clean JSONL: {output_path}")
 
 def map_index(pretty_path: Path, clean_path: Path, index: int) -> None:
     # Normalize index (accept 1-based)
     idx = index - 1 if index >= 1 else index
-    data = json.loads(pretty_path.read_text(encoding='utf-8'))
-    if not isinstance(data, list):
-        raise ValueError("Pretty file must be a JSON array")
-    if not (0 <= idx < len(data)):
-        raise IndexError(f"Index {index} out of range (0..{len(data)-1} or 1..{len(data)})")
-
-    # In clean JSONL, objects are in the same order; line numbers are 1-based
+    # Records are in the same order in both files, so the clean file's
+    # line-offset index answers this without parsing the pretty array
+    with JsonlIndex(clean_path) as clean_index:
+        n = len(clean_index)
+        if not (0 <= idx < n):
+            raise IndexError(f"Index {index} out of range (0..{n-1} or 1..{n})")
+        offset, rid = clean_index.offsets[idx], clean_index.ids[idx]
+    # Clean JSONL line numbers are 1-based
     clean_line = idx + 1
     print(json.dumps({
         "pretty_index_input": index,
         "normalized_index": idx,
-        "mapped_clean_line": clean_line
+        "mapped_clean_line": clean_line,
+        "byte_offset": offset,
+        "id": rid or None,
+        "pretty_in_sync": round_files.is_pretty_fresh(pretty_path, clean_path),
     }, indent=2))
 
+def show(clean_path: Path, index: Optional[int] = None, record_id: Optional[str] = None,
+         page: int = 0, size: int = 10) -> None:
+    """Print one record (by 0-based index or id) or a page of records from a clean round file."""
+    with JsonlIndex(clean_path) as clean_index:
+        if record_id is not None:
+            items = [clean_index.get_by_id(record_id)]
+        elif index is not None:
+            items = [clean_index.get(index)]
+        else:
+            items = clean_index.page(page, size)
+        total = len(clean_index)
+    print(json.dumps({'total': total, 'records': items}, ensure_ascii=False, indent=2))
+
 
 def main():
     p = argparse.ArgumentParser()
@@ -71,6 +103,7 @@ def main():
     sp1 = sub.add_parser('to-pretty')
     sp1.add_argument('--input', required=True)
     sp1.add_argument('--output', required=True)
+    sp1.add_argument('--if-stale', action='store_true', help='Skip if the pretty file is newer than the input')
 
     sp2 = sub.add_parser('to-clean')
     sp2.add_argument('--input', required=True)
@@ -81,13 +114,22 @@ def main():
     sp3.add_argument('--clean', required=True)
     sp3.add_argument('--index', required=True, type=int)
 
+    sp4 = sub.add_parser('show')
+    sp4.add_argument('--clean', required=True)
+    sp4.add_argument('--index', type=int, help='0-based record index')
+    sp4.add_argument('--id', help='Record id')
+    sp4.add_argument('--page', type=int, default=0)
+    sp4.add_argument('--size', type=int, default=10)
+
     args = p.parse_args()
     if args.cmd == 'to-pretty':
-        to_pretty(Path(args.input), Path(args.output))
+        to_pretty(Path(args.input), Path(args.output), args.if_stale)
     elif args.cmd == 'to-clean':
         to_clean(Path(args.input), Path(args.output))
     elif args.cmd == 'map-index':
         map_index(Path(args.pretty), Path(args.clean), args.index)
+    elif args.cmd == 'show':
+        show(Path(args.clean), args.index, args.id, args.page, args.size)
 
 if __name__ == '__main__':
     main()
@@ -5,26 +5,23 @@ Validate a staging round and emit a JSON summary.
 Example (PowerShell):
 py -3 nyaya\\Datasets\\scripts\\validate_round.py --round staging_round_0001
 """
-import argparse, json
+import argparse, json, sys
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src import jsonl_codec  # noqa: E402
+from src.evidence_verifier import EvidenceVerifier, summarize  # noqa: E402
+from src.source_notes import SourceNotesIndex  # noqa: E402
+
 NYAYA_ROOT = Path('nyaya')
 ROUNDS_DIR = NYAYA_ROOT / 'Datasets' / 'rounds'
 APPROVED_DIR = NYAYA_ROOT / 'Datasets' / 'approved'
-REQUIRED = ['domain','pratijna','hetu','udaharana','upanaya','nigamana','grounding_authority']
+SOURCES_DIR = NYAYA_ROOT / 'Datasets' / 'sources'
 
 
 def read_jsonl(p: Path) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    if not p.exists():
-        return items
-    for line in p.read_text(encoding='utf-8').splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        items.append(json.loads(s))
-    return items
+    return jsonl_codec.read_jsonl(p, missing_ok=True)
 
 
 def is_non_western(trad: str) -> bool:
@@ -45,6 +42,7 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument('--nonwestern-thresh', type=float, default=0.25)
     ap.add_argument('--specificity-thresh', type=float, default=0.90)
     ap.add_argument('--output', help='Path to write validation_result.json; defaults to round dir')
+    ap.add_argument('--sources', default=str(SOURCES_DIR), help='Source notes directory used to resolve cited URLs')
     return ap.parse_args()
 
 
@@ -56,9 +54,11 @@ def compute_statistics(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]
 
     for i, r in enumerate(items):
         # schema
-        miss = [k for k in REQUIRED if not str(r.get(k, '')).strip()]
-        if miss:
-            missing_list.append({'index': i, 'missing': miss})
+        try:
+            jsonl_codec.entry_from_dict(r)
+        except jsonl_codec.SchemaError as e:
+            miss = [k for k in jsonl_codec.REQUIRED_FIELDS if not str(r.get(k, '')).strip()]
+            missing_list.append({'index': i, 'missing': miss, 'error': str(e)})
         # diversity
         if is_non_western(str(r.get('cultural_tradition',''))):
             non_w_count += 1
@@ -72,6 +72,16 @@ def compute_statistics(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]
     return missing_list, non_w_count, spec_count, char_sum
 
 
+def resolve_sources(items: List[Dict[str, Any]], index: SourceNotesIndex) -> List[Dict[str, Any]]:
+    """Entries whose cited URLs match a local source note, with their best supporting passages."""
+    linked = []
+    for i, r in enumerate(items):
+        link = index.link(r)
+        if link.resolved:
+            linked.append({'index': i, 'notes': link.notes, 'passages': [pid for pid, _ in link.passages]})
+    return linked
+
+
 def generate_output(
     args: argparse.Namespace,
     round_dir: Path,
@@ -80,7 +90,9 @@ def generate_output(
     missing_list: List[Dict[str, Any]],
     non_w_count: int,
     spec_count: int,
-    char_sum: int
+    char_sum: int,
+    linked: List[Dict[str, Any]],
+    evidence: Dict[str, Any]
 ) -> None:
     schema_ok = len(missing_list) == 0
     non_w_share = (non_w_count / total) if total else 0.0
@@ -96,6 +108,9 @@ def generate_output(
         'non_western_share': round(non_w_share, 3),
         'specificity_share': round(spec_share, 3),
         'avg_chars_across_steps': round(avg_chars, 1),
+        'source_resolved_share': round(len(linked) / total, 3) if total else 0.0,
+        'source_links': linked[:50],
+        'evidence': evidence,
         'thresholds': {
             'non_western_share': args.nonwestern_thresh,
             'specificity_share': args.specificity_thresh
@@ -117,9 +132,12 @@ def main():
 
     total = len(items)
     missing_list, non_w_count, spec_count, char_sum = compute_statistics(items)
+    index = SourceNotesIndex.open(args.sources)
+    linked = resolve_sources(items, index)
+    evidence = summarize(EvidenceVerifier(index).verify_all(items))
 
     generate_output(
-        args, round_dir, clean_path, total, missing_list, non_w_count, spec_count, char_sum
+        args, round_dir, clean_path, total, missing_list, non_w_count, spec_count, char_sum, linked, evidence
     )
 
 
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Nyāya Benchmark Suite
+Times the corpus hot paths against deterministic synthetic corpora and saves
+results as JSON so runs can be compared across commits.
+
+Usage:
+  # Run everything at 10k and 100k entries, results saved under benchmarks/results/
+  python benchmarks/run_benchmarks.py --sizes 10000 100000
+
+  # Only some benchmarks, then compare against an earlier run
+  python benchmarks/run_benchmarks.py --only load_jsonl analyze_content --compare benchmarks/results/<old>.json
+
+Each benchmark's setup (generating/loading the corpus) is excluded from the
+timings. Benchmarks whose optional dependencies are missing (e.g. Flask for the
+Dewey API) are reported as skipped.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / 'results'
+for p in (REPO_ROOT, REPO_ROOT / 'Datasets' / 'scripts', BENCH_DIR):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from synthetic_corpus import cached_corpus  # noqa: E402
+
+# Quadratic-ish benchmarks are capped so the 1M runs finish in reasonable time
+DEWEY_SAMPLE = 20_000
+API_SAMPLE = 2_000
+
+
+@dataclass
+class Context:
+    size: int
+    corpus_path: Path
+    workdir: Path
+    _entries: Optional[List[Dict[str, Any]]] = field(default=None, repr=False)
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        if self._entries is None:
+            with self.corpus_path.open('r', encoding='utf-8') as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+        return self._entries
+
+
+# A benchmark's factory receives the Context and returns either the timed
+# callable or a (per_repeat_setup, timed_callable) pair. It may also return
+# the number of records the timed call processes via a third tuple element.
+BenchFactory = Callable[[Context], Any]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    factory: BenchFactory
+    requires: Tuple[str, ...] = ()
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, requires: Tuple[str, ...] = ()):
+    def decorator(func: BenchFactory) -> BenchFactory:
+        BENCHMARKS.append(Benchmark(name, func, requires))
+        return func
+    return decorator
+
+
+@benchmark('load_jsonl')
+def bench_load_jsonl(ctx: Context):
+    def run():
+        with ctx.corpus_path.open('r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return None, run, ctx.size
+
+
+@benchmark('jsonl_codec.read_jsonl')
+def bench_codec_read(ctx: Context):
+    from src import jsonl_codec
+
+    def run():
+        return jsonl_codec.read_jsonl(ctx.corpus_path)
+    return None, run, ctx.size
+
+
+@benchmark('jsonl_codec.read_entries')
+def bench_codec_read_entries(ctx: Context):
+    from src import jsonl_codec
+
+    def run():
+        return jsonl_codec.read_entries(ctx.corpus_path)
+    return None, run, ctx.size
+
+
+@benchmark('jsonl_codec.write_jsonl')
+def bench_codec_write(ctx: Context):
+    from src import jsonl_codec
+    entries = ctx.entries
+    out = ctx.workdir / 'codec_write.jsonl'
+
+    def run():
+        return jsonl_codec.write_jsonl(out, entries)
+    return None, run, len(entries)
+
+
+@benchmark('corpus_store.write_compressed')
+def bench_store_write(ctx: Context):
+    from src import corpus_store
+    entries = ctx.entries
+    out = ctx.workdir / f'store_write{corpus_store.default_suffix()}'
+
+    def run():
+        return corpus_store.write_compressed(out, entries)
+    return None, run, len(entries)
+
+
+@benchmark('corpus_store.read_compressed')
+def bench_store_read(ctx: Context):
+    from src import corpus_store
+    path = ctx.workdir / f'store_read{corpus_store.default_suffix()}'
+    corpus_store.write_compressed(path, ctx.entries)
+
+    def run():
+        return corpus_store.read_compressed(path)
+    return None, run, ctx.size
+
+
+@benchmark('corpus_store.random_get')
+def bench_store_get(ctx: Context):
+    from src import corpus_store
+    path = ctx.workdir / f'store_get{corpus_store.default_suffix()}'
+    corpus_store.write_compressed(path, ctx.entries)
+    picks = [(i * 7919) % ctx.size for i in range(1000)]
+
+    def run():
+        corpus = corpus_store.CompressedCorpus(path)
+        return [corpus.get(i) for i in picks]
+    return None, run, len(picks)
+
+
+@benchmark('jsonl_index.random_get')
+def bench_index_get(ctx: Context):
+    from src.jsonl_index import JsonlIndex, build_index
+    build_index(ctx.corpus_path)
+    picks = [(i * 7919) % ctx.size for i in range(10_000)]
+
+    def run():
+        with JsonlIndex(ctx.corpus_path) as index:
+            return [index.get(i) for i in picks]
+    return None, run, len(picks)
+
+
+@benchmark('corpus_diff')
+def bench_corpus_diff(ctx: Context):
+    from src import jsonl_codec
+    from src.corpus_diff import diff_sources
+    edited = ctx.workdir / 'diff_edited.jsonl'
+    entries = [dict(e) for e in ctx.entries]
+    for e in entries[::100]:
+        e['hetu'] = e['hetu'] + ' (revised)'
+    jsonl_codec.write_jsonl(edited, entries[: -len(entries) // 50])
+
+    def run():
+        return diff_sources(str(ctx.corpus_path), str(edited))
+    return None, run, ctx.size
+
+
+@benchmark('epic_lines.refresh_filter')
+def bench_epic_lines(ctx: Context):
+    from src import jsonl_codec
+    from src.epic_lines import EpicLines
+    path = ctx.workdir / 'epic_lines.jsonl'
+    jsonl_codec.write_jsonl(path, ({'ancient_greek_text': 'μῆνιν ἄειδε θεὰ', 'english_translation': e.get('pratijna', '')}
+                                   for e in ctx.entries))
+
+    def run():
+        store = EpicLines(path)
+        store.refresh()
+        return store.page(store.filter('μηνιν empire'), 0, 50)
+    return None, run, ctx.size
+
+
+@benchmark('hexameter.scan_lines')
+def bench_hexameter(ctx: Context):
+    from src import hexameter
+    lines = ['Arma virumque cano, Troiae qui primus ab oris',
+             'μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος',
+             'conticuere omnes intentique ora tenebant']
+    batch = [lines[i % len(lines)] for i in range(ctx.size)]
+
+    def run():
+        return hexameter.scan_lines(batch)
+    return None, run, ctx.size
+
+
+@benchmark('analyze_content')
+def bench_analyze_content(ctx: Context):
+    from classify_cultural_traditions import analyze_content
+    entries = ctx.entries
+
+    def run():
+        return [analyze_content(e) for e in entries]
+    return None, run, len(entries)
+
+
+@benchmark('tradition_classifier.predict')
+def bench_tradition_classifier(ctx: Context):
+    from src.tradition_classifier import TraditionClassifier, load_training
+    model = TraditionClassifier.fit(load_training([REPO_ROOT / 'nyaya_corpus_clean.jsonl',
+                                                   *sorted((REPO_ROOT / 'Datasets' / 'approved').glob('*.jsonl'))]))
+    entries = ctx.entries
+
+    def run():
+        return model.predict(entries)
+    return None, run, len(entries)
+
+
+@benchmark('find_best_dewey_code')
+def bench_find_best_dewey_code(ctx: Context):
+    from enrich_corpus import find_best_dewey_code, load_dewey_data, preprocess_dewey_data
+    candidates = preprocess_dewey_data(load_dewey_data(str(REPO_ROOT / 'Datasets' / 'dewey_decimal_data.json')))
+    domains = [e.get('domain', '') for e in ctx.entries[:DEWEY_SAMPLE]]
+
+    def run():
+        return [find_best_dewey_code(d, candidates) for d in domains]
+    return None, run, len(domains)
+
+
+@benchmark('validate_round.compute_statistics')
+def bench_compute_statistics(ctx: Context):
+    from validate_round import compute_statistics
+    entries = ctx.entries
+
+    def run():
+        return compute_statistics(entries)
+    return None, run, len(entries)
+
+
+@benchmark('evidence_verifier.verify_all')
+def bench_evidence_verifier(ctx: Context):
+    from src.evidence_verifier import EvidenceVerifier
+    from src.source_notes import SourceNotesIndex
+    index = SourceNotesIndex(REPO_ROOT / 'Datasets' / 'sources', index_file=ctx.workdir / 'notes_index.json')
+    index.refresh()
+    urls = [n.url for n in index.notes.values()]
+    entries = [dict(e, grounding_authority=f"Source, {urls[i % len(urls)]}") for i, e in enumerate(ctx.entries)]
+
+    def run():
+        return EvidenceVerifier(index).verify_all(entries)
+    return None, run, len(entries)
+
+
+@benchmark('staging_integration')
+def bench_staging_integration(ctx: Context):
+    import sanskrit_staging_pipeline as pipeline
+    from src import schema_migrations
+    stage_dir = ctx.workdir / 'staging'
+
+    def setup():
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        stage_dir.mkdir(parents=True)
+        # Staging holds records as ingest writes them: migrated
+        schema_migrations.migrate_file(ctx.corpus_path, stage_dir / pipeline.STAGING_FILE)
+        shutil.copyfile(REPO_ROOT / 'nyaya_corpus_clean.jsonl', stage_dir / pipeline.CLEAN_CORPUS)
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(stage_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                approved, _ = pipeline.process_entries()
+                pipeline.integrate_to_corpus(approved)
+        finally:
+            os.chdir(cwd)
+    return setup, run, ctx.size
+
+
+@benchmark('dewey_service.find_subject')
+def bench_dewey_service(ctx: Context):
+    from services.dewey_service import DeweyService
+    service = DeweyService()
+    codes = [f"{(i * 37) % 1000:03d}" for i in range(ctx.size)]
+
+    def run():
+        return [service.find_subject(c) for c in codes]
+    return None, run, len(codes)
+
+
+@benchmark('dewey_api', requires=('flask',))
+def bench_dewey_api(ctx: Context):
+    from api.dewey_decimal import app
+    client = app.test_client()
+    codes = [f"{(i * 37) % 1000:03d}" for i in range(min(ctx.size, API_SAMPLE))]
+
+    def run():
+        for c in codes:
+            client.get(f'/api/dewey?code={c}')
+    return None, run, len(codes)
+
+
+def _missing(requires: Tuple[str, ...]) -> List[str]:
+    missing = []
+    for mod in requires:
+        try:
+            __import__(mod)
+        except ImportError:
+            missing.append(mod)
+    return missing
+
+
+def run_benchmark(bench: Benchmark, ctx: Context, repeat: int) -> Dict[str, Any]:
+    missing = _missing(bench.requires)
+    if missing:
+        return {'name': bench.name, 'size': ctx.size, 'skipped': f"missing {', '.join(missing)}"}
+
+    made = bench.factory(ctx)
+    setup, run, records = made if isinstance(made, tuple) else (None, made, ctx.size)
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - t0)
+
+    best = min(timings)
+    return {
+        'name': bench.name,
+        'size': ctx.size,
+        'records': records,
+        'repeat': repeat,
+        'min_s': round(best, 6),
+        'median_s': round(statistics.median(timings), 6),
+        'mean_s': round(statistics.mean(timings), 6),
+        'records_per_s': round(records / best, 1) if best > 0 else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Rows of (benchmark, size, ratio) where ratio = current / baseline min time."""
+    base = {(r['name'], r['size']): r for r in baseline.get('results', []) if 'min_s' in r}
+    rows = []
+    for r in current.get('results', []):
+        old = base.get((r['name'], r['size']))
+        if not old or 'min_s' not in r or not old['min_s']:
+            continue
+        ratio = r['min_s'] / old['min_s']
+        rows.append({'name': r['name'], 'size': r['size'], 'baseline_s': old['min_s'],
+                     'current_s': r['min_s'], 'ratio': round(ratio, 3), 'regression': ratio > threshold})
+    return rows
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10_000])
+    ap.add_argument('--seed', type=int, default=1234)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--only', nargs='+', help='Benchmark names to run')
+    ap.add_argument('--output', help='Results JSON (defaults to benchmarks/results/<timestamp>_<commit>.json)')
+    ap.add_argument('--compare', help='Earlier results JSON to compare against')
+    ap.add_argument('--threshold', type=float, default=1.2, help='Slowdown ratio reported as a regression')
+    ap.add_argument('--list', action='store_true', help='List benchmark names and exit')
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for b in BENCHMARKS:
+            print(b.name)
+        return 0
+
+    selected = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix='nyaya_bench_'))
+    try:
+        for size in args.sizes:
+            ctx = Context(size=size, corpus_path=cached_corpus(size, args.seed), workdir=workdir)
+            for bench in selected:
+                res = run_benchmark(bench, ctx, args.repeat)
+                results.append(res)
+                if 'skipped' in res:
+                    print(f"⏭️  {bench.name} [{size}]: skipped ({res['skipped']})")
+                else:
+                    print(f"⏱️  {bench.name} [{size}]: {res['min_s']:.4f}s min, {res['records_per_s']} rec/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    payload = {
+        'created': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    out = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    print(f"💾 Results saved to {out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        rows = compare(baseline, payload, args.threshold)
+        for row in rows:
+            flag = '🔴' if row['regression'] else '🟢'
+            print(f"{flag} {row['name']} [{row['size']}]: {row['baseline_s']:.4f}s → {row['current_s']:.4f}s (x{row['ratio']})")
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
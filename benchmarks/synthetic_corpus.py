@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Synthetic Nyāya Corpus Generator
+Produces deterministic benchmark corpora (10k–1M entries) whose domain,
+grounding authority, cultural tradition and optional-field distributions are
+derived from nyaya_corpus_clean.jsonl.
+
+Usage:
+  python benchmarks/synthetic_corpus.py --size 100000 --output benchmarks/.data/synthetic_100000.jsonl
+"""
+import argparse
+import json
+import random
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SOURCE_CORPUS = REPO_ROOT / 'nyaya_corpus_clean.jsonl'
+DATA_DIR = Path(__file__).resolve().parent / '.data'
+
+STEPS = ('pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana')
+WORD_RE = re.compile(r"[^\s]+")
+
+
+class CorpusProfile:
+    """Empirical distributions sampled by the generator."""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            raise ValueError('Cannot build a corpus profile from an empty corpus')
+        total = len(entries)
+        self.domains = Counter(str(e.get('domain', '')) for e in entries)
+        self.authorities = Counter(str(e.get('grounding_authority', '')) for e in entries)
+        self.traditions = Counter(e['cultural_tradition'] for e in entries if e.get('cultural_tradition'))
+        self.tradition_rate = sum(self.traditions.values()) / total
+        self.batched_rate = sum(1 for e in entries if e.get('batch_id')) / total
+        self.batch_ids = Counter(e['batch_id'] for e in entries if e.get('batch_id'))
+        # Per-step vocabulary and length distributions keep text sizes realistic
+        self.vocab = {step: [] for step in STEPS}
+        self.lengths = {step: [] for step in STEPS}
+        for e in entries:
+            for step in STEPS:
+                words = WORD_RE.findall(str(e.get(step, '')))
+                self.vocab[step].extend(words)
+                self.lengths[step].append(max(len(words), 1))
+
+    @classmethod
+    def from_file(cls, path: Path = SOURCE_CORPUS) -> 'CorpusProfile':
+        entries = []
+        with Path(path).open('r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        return cls(entries)
+
+
+def _weighted(rng: random.Random, counter: Counter):
+    keys = list(counter)
+    return rng.choices(keys, weights=[counter[k] for k in keys], k=1)[0]
+
+
+def generate_entries(size: int, seed: int = 1234, profile: Optional[CorpusProfile] = None) -> Iterator[Dict[str, Any]]:
+    """Yield ``size`` synthetic entries; identical for identical (size, seed, profile)."""
+    profile = profile or CorpusProfile.from_file()
+    rng = random.Random(seed)
+    domain_keys, domain_w = list(profile.domains), list(profile.domains.values())
+    auth_keys, auth_w = list(profile.authorities), list(profile.authorities.values())
+
+    for i in range(size):
+        entry: Dict[str, Any] = {
+            'id': f'synthetic_{seed}_{i:07d}',
+            'domain': rng.choices(domain_keys, weights=domain_w, k=1)[0],
+        }
+        for step in STEPS:
+            n_words = rng.choice(profile.lengths[step])
+            entry[step] = ' '.join(rng.choices(profile.vocab[step], k=n_words))
+        entry['grounding_authority'] = rng.choices(auth_keys, weights=auth_w, k=1)[0]
+        if profile.traditions and rng.random() < profile.tradition_rate:
+            entry['cultural_tradition'] = _weighted(rng, profile.traditions)
+        if profile.batch_ids and rng.random() < profile.batched_rate:
+            entry['batch_id'] = _weighted(rng, profile.batch_ids)
+        yield entry
+
+
+def write_corpus(path: Path, size: int, seed: int = 1234, profile: Optional[CorpusProfile] = None) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as f:
+        for entry in generate_entries(size, seed, profile):
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return path
+
+
+def cached_corpus(size: int, seed: int = 1234) -> Path:
+    """Path to a generated corpus under benchmarks/.data, generating it on first use."""
+    path = DATA_DIR / f'synthetic_{size}_{seed}.jsonl'
+    if not path.exists():
+        tmp = path.with_suffix('.tmp')
+        write_corpus(tmp, size, seed)
+        tmp.replace(path)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--size', type=int, default=10_000)
+    ap.add_argument('--seed', type=int, default=1234)
+    ap.add_argument('--output', help='Output JSONL (defaults to the benchmark data cache)')
+    args = ap.parse_args()
+
+    out = write_corpus(Path(args.output), args.size, args.seed) if args.output else cached_corpus(args.size, args.seed)
+    print(f"Wrote {args.size} synthetic entries: {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """
 Cultural Tradition Classification Tool
-Automatically classifies entries based on content analysis and cultural indicators.
+Automatically classifies entries with the trained classifier of
+src/tradition_classifier.py. The keyword scores of ``analyze_content`` are the
+fallback when no labelled entries are available to train on.
 """
 
-import json
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
+
+from src import jsonl_codec
+from src.tradition_classifier import PREDICTED, TraditionClassifier, classify
 
 # Cultural classification indicators
 CULTURAL_INDICATORS = {
@@ -85,41 +89,72 @@ def analyze_content(entry: Dict) -> str:
     else:
         return 'Unknown'
 
+_model: Optional[TraditionClassifier] = None
+_model_unavailable = False
+
+def load_model() -> Optional[TraditionClassifier]:
+    """The trained classifier (retrained if its training files changed), or None without training data.
+
+    Both outcomes are cached for the process, so a missing model costs one attempt and one warning.
+    """
+    global _model, _model_unavailable
+    if _model is None and not _model_unavailable:
+        try:
+            _model = TraditionClassifier.open()
+        except ValueError as e:
+            _model_unavailable = True
+            print(f"⚠️ Tradition classifier unavailable ({e}); using keyword scores")
+    return _model
+
+def predict_traditions(entries: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    """Fields to set on entries still marked Unknown, keyed by entry index.
+
+    As ``classify`` sets them: ``cultural_tradition``, the fine-grained
+    ``cultural_traditions`` and ``label_source``. Does not mutate ``entries``
+    so it can run alongside other workflow stages.
+    """
+    unknown = [i for i, entry in enumerate(entries) if entry.get('cultural_tradition', 'Unknown') == 'Unknown']
+    model = load_model() if unknown else None
+    if model is None:
+        return {str(i): {'cultural_tradition': analyze_content(entries[i]), 'label_source': PREDICTED}
+                for i in unknown}
+    predictions = model.predict([entries[i] for i in unknown])
+    return {str(i): p.entry_fields() for i, p in zip(unknown, predictions)}
+
 def classify_entries():
     """Main classification function."""
     print("🔍 Analyzing cultural traditions in staging entries...")
     
     # Load staging data
-    entries = []
-    with open('nyaya_corpus_staging.jsonl', 'r', encoding='utf-8') as f:
-        for line in f:
-            entries.append(json.loads(line))
+    entries = jsonl_codec.read_jsonl('nyaya_corpus_staging.jsonl')
     
     # Classify entries
     classified_count = 0
     cultural_stats = {'Western': 0, 'Non-Western': 0, 'Unknown': 0}
     
+    unknown = [e for e in entries if e.get('cultural_tradition', 'Unknown') == 'Unknown']
+    model = load_model() if unknown else None
+    if model is not None:
+        classify(unknown, model)
+    else:
+        for entry in unknown:
+            entry['cultural_tradition'] = analyze_content(entry)
+            entry['label_source'] = PREDICTED
+
+    for entry in unknown:
+        classified_count += 1
+        print(f"📝 Classified: {entry.get('id', 'No ID')[:8]}... -> {entry['cultural_tradition']}")
+        if len(entry.get('domain', '')) > 50:
+            print(f"   Domain: {entry.get('domain', '')[:50]}...")
+        else:
+            print(f"   Domain: {entry.get('domain', '')}")
+
     for entry in entries:
-        current_tradition = entry.get('cultural_tradition', 'Unknown')
-        
-        if current_tradition == 'Unknown':
-            predicted_tradition = analyze_content(entry)
-            entry['cultural_tradition'] = predicted_tradition
-            classified_count += 1
-            
-            print(f"📝 Classified: {entry.get('id', 'No ID')[:8]}... -> {predicted_tradition}")
-            if len(entry.get('domain', '')) > 50:
-                print(f"   Domain: {entry.get('domain', '')[:50]}...")
-            else:
-                print(f"   Domain: {entry.get('domain', '')}")
-        
-        cultural_stats[entry['cultural_tradition']] += 1
+        cultural_stats[entry['cultural_tradition']] = cultural_stats.get(entry['cultural_tradition'], 0) + 1
     
     # Save updated entries
     if classified_count > 0:
-        with open('nyaya_corpus_staging.jsonl', 'w', encoding='utf-8') as f:
-            for entry in entries:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        jsonl_codec.write_jsonl('nyaya_corpus_staging.jsonl', entries)
     
     # Report results
     print(f"\\n✅ Classification Complete!")
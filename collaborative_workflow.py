@@ -4,32 +4,22 @@ Complete Collaborative Workflow
 Orchestrates the entire process from staging to PR-ready state.
 """
 
+import argparse
+import copy
 import json
-import shlex
-import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
-def run_command(command: str, description: str) -> bool:
-    """Run a command and return success status."""
-    print(f"🔄 {description}...")
-    try:
-        # Split the command into a list of arguments to avoid shell=True
-        cmd_args = shlex.split(command)
-        result = subprocess.run(cmd_args, shell=False, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ {description} completed successfully")
-            if result.stdout:
-                print(f"   Output: {result.stdout.strip()}")
-            return True
-        else:
-            print(f"❌ {description} failed")
-            print(f"   Error: {result.stderr.strip()}")
-            return False
-    except Exception as e:
-        print(f"❌ {description} failed with exception: {e}")
-        return False
+import classify_cultural_traditions
+import organize_batches
+import sanskrit_staging_pipeline
+from src import jsonl_codec, schema_migrations
+from src.instrumentation import TRACER, file_size, span
+from src.workflow_dag import Stage, WorkflowError, WorkflowRunner
+
+STAGING_FILE = 'nyaya_corpus_staging.jsonl'
+CACHE_DIR = Path('.workflow_cache')
 
 def check_prerequisites():
     """Check if all required files and tools are available."""
@@ -54,14 +44,18 @@ def check_prerequisites():
     print("✅ All prerequisites satisfied")
     return True
 
-def analyze_staging_data():
+def load_staging_dataset(filepath: str = STAGING_FILE) -> list:
+    """Parse the staging file once (canonical schema since ingest); every stage shares this in-memory dataset."""
+    with span('load_staging', bytes_read=file_size(filepath)) as sp:
+        entries = list(schema_migrations.require_canonical(jsonl_codec.iter_jsonl(filepath), filepath))
+        sp.records = len(entries)
+    return entries
+
+def analyze_staging_data(entries: list):
     """Analyze current staging data and report status."""
     print("📊 Analyzing staging data...")
     
     try:
-        with open('nyaya_corpus_staging.jsonl', 'r', encoding='utf-8') as f:
-            entries = [json.loads(line) for line in f]
-        
         total_entries = len(entries)
         unclassified = sum(1 for e in entries if e.get('cultural_tradition') == 'Unknown')
         unbatched = sum(1 for e in entries if e.get('batch_id') == 'None')
@@ -80,45 +74,99 @@ def analyze_staging_data():
         print(f"❌ Failed to analyze staging data: {e}")
         return None
 
+# Stage functions must not mutate their inputs: independent stages share the
+# same artifacts and run concurrently.
+
+def classify_stage(staging: list) -> dict:
+    return {'traditions': classify_cultural_traditions.predict_traditions(staging)}
+
+def batch_stage(staging: list) -> dict:
+    plan, assignments = organize_batches.plan_batches(staging)
+    return {'batches': plan, 'batch_assignments': assignments}
+
+def prepare_stage(staging: list, traditions: dict = None, batches: dict = None) -> dict:
+    prepared = copy.deepcopy(staging)
+    for idx, fields in (traditions or {}).items():
+        prepared[int(idx)].update(fields)
+    for idx, assignment in (batches or {}).items():
+        prepared[int(idx)].update(assignment)
+    return {'prepared': prepared}
+
+def validate_stage(prepared: list) -> dict:
+    # prepare_stage already applied the classify stage's predictions
+    entries = copy.deepcopy(prepared)
+    approved, results = sanskrit_staging_pipeline.process_entries(entries, classify=False)
+    remaining = [e for i, e in enumerate(entries)
+                 if not results[sanskrit_staging_pipeline.entry_key(i, e)]['approved']]
+    return {'approved': approved, 'remaining': remaining, 'validation_results': results}
+
+def write_stage(approved: list, remaining: list) -> dict:
+    """The single write: corpus integration plus the updated staging file."""
+    with span('write_outputs', records=len(approved) + len(remaining)) as sp:
+        if approved:
+            final_count = sanskrit_staging_pipeline.integrate_to_corpus(approved, remaining)
+            sp.add_io(written=file_size(sanskrit_staging_pipeline.CLEAN_CORPUS))
+        else:
+            sanskrit_staging_pipeline._write_jsonl(STAGING_FILE, remaining)
+            final_count = None
+        sp.add_io(written=file_size(STAGING_FILE))
+    return {'final_corpus_size': final_count}
+
 def build_workflow_steps(analysis: dict) -> list:
-    """Build the list of workflow steps based on current analysis."""
+    """Build the stage graph based on current analysis."""
     workflow_steps = []
+    prepare_inputs = ['staging']
     
-    # Step 1: Cultural Classification (if needed)
+    # Cultural Classification and Batch Organization are independent
     if analysis['unclassified'] > 0:
-        workflow_steps.append({
-            'command': 'python classify_cultural_traditions.py',
-            'description': f'Classify {analysis["unclassified"]} cultural traditions'
-        })
+        workflow_steps.append(Stage(
+            'classify', classify_stage, inputs=('staging',), outputs=('traditions',),
+            description=f'Classify {analysis["unclassified"]} cultural traditions'
+        ))
+        prepare_inputs.append('traditions')
     
-    # Step 2: Batch Organization (if needed)
     if analysis['unbatched'] > 0:
-        workflow_steps.append({
-            'command': 'python organize_batches.py', 
-            'description': f'Organize {analysis["unbatched"]} entries into batches'
-        })
+        # Batch ids and assigned_date carry today's date: never reuse a cached plan
+        workflow_steps.append(Stage(
+            'batch', batch_stage, inputs=('staging',), outputs=('batches', 'batch_assignments'),
+            description=f'Organize {analysis["unbatched"]} entries into batches', cacheable=False
+        ))
+        prepare_inputs.append('batches')
     
-    # Step 3: Staging Pipeline Validation
-    workflow_steps.append({
-        'command': 'python sanskrit_staging_pipeline.py',
-        'description': 'Run complete validation pipeline'
-    })
+    workflow_steps.append(Stage(
+        'prepare', prepare_stage, inputs=tuple(prepare_inputs), outputs=('prepared',),
+        description='Apply classifications and batch assignments'
+    ))
+    # Approved entries are stamped with validation_date: never restore a cached validation
+    workflow_steps.append(Stage(
+        'validate', validate_stage, inputs=('prepared',),
+        outputs=('approved', 'remaining', 'validation_results'),
+        description='Run complete validation pipeline', cacheable=False
+    ))
+    workflow_steps.append(Stage(
+        'write', write_stage, inputs=('approved', 'remaining'), outputs=('final_corpus_size',),
+        description='Write corpus and staging file', cacheable=False
+    ))
     
     return workflow_steps
 
-def execute_workflow_steps(workflow_steps: list) -> bool:
-    """Execute the given workflow steps sequentially."""
+def _report_stage(event: str, stage: Stage):
+    icons = {'start': '🔄', 'ran': '✅', 'cached': '♻️ ', 'failed': '❌'}
+    suffix = {'start': '...', 'ran': ' completed', 'cached': ' (cached)', 'failed': ' failed'}
+    print(f"{icons[event]} {stage.description}{suffix[event]}")
+
+def execute_workflow_steps(workflow_steps: list, staging: list, cache_dir: Path = CACHE_DIR):
+    """Execute the stage graph in-process; returns the artifacts or None on failure."""
     print(f"\n🔧 Executing {len(workflow_steps)} workflow steps...")
     
-    for i, step in enumerate(workflow_steps, 1):
-        print(f"\n--- Step {i}/{len(workflow_steps)} ---")
-        success = run_command(step['command'], step['description'])
-        if not success:
-            print(f"💥 Workflow failed at step {i}")
-            return False
-    return True
+    runner = WorkflowRunner(workflow_steps, cache_dir=cache_dir, tracer=TRACER)
+    try:
+        return runner.run({'staging': staging}, on_event=_report_stage)
+    except WorkflowError as e:
+        print(f"💥 Workflow failed: {e}")
+        return None
 
-def generate_workflow_summary(analysis: dict, steps_executed: int):
+def generate_workflow_summary(analysis: dict, steps_executed: int, profile: list = None):
     """Generate and save the workflow summary."""
     print("\n📋 Generating workflow summary...")
     summary = {
@@ -126,6 +174,7 @@ def generate_workflow_summary(analysis: dict, steps_executed: int):
         'initial_analysis': analysis,
         'steps_executed': steps_executed,
         'status': 'completed',
+        'profile': profile or [],
         'next_actions': [
             'Review validation results',
             'Update analysis notebook', 
@@ -154,8 +203,16 @@ def print_final_status(final_analysis: dict):
     
     print(f"\n🤝 Ready for Pull Request Creation!")
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description='Run the collaborative staging workflow')
+    ap.add_argument('--trace', default='workflow_trace.json', help='Per-stage JSON trace output')
+    ap.add_argument('--chrome-trace', help='Optional Chrome trace-event output (chrome://tracing, Perfetto)')
+    ap.add_argument('--no-cache', action='store_true', help='Ignore cached stage outputs')
+    return ap.parse_args(argv)
+
+def main(argv=None):
     """Main collaborative workflow orchestration."""
+    args = parse_args(argv)
     print("🚀 Starting Collaborative Nyāya Corpus Workflow")
     print("=" * 50)
 
@@ -164,7 +221,8 @@ def main():
         sys.exit(1)
 
     # Analyze current state
-    analysis = analyze_staging_data()
+    staging = load_staging_dataset()
+    analysis = analyze_staging_data(staging)
     if not analysis:
         sys.exit(1)
 
@@ -172,14 +230,19 @@ def main():
     workflow_steps = build_workflow_steps(analysis)
 
     # Execute workflow steps
-    if not execute_workflow_steps(workflow_steps):
+    artifacts = execute_workflow_steps(workflow_steps, staging, cache_dir=None if args.no_cache else CACHE_DIR)
+    if artifacts is None:
+        TRACER.write_json(args.trace)
         sys.exit(1)
 
-    # Generate workflow summary
-    generate_workflow_summary(analysis, len(workflow_steps))
+    # Generate workflow summary and traces
+    generate_workflow_summary(analysis, len(workflow_steps), TRACER.summary())
+    TRACER.write_json(args.trace)
+    if args.chrome_trace:
+        TRACER.write_chrome_trace(args.chrome_trace)
 
-    # Final analysis
-    final_analysis = analyze_staging_data()
+    # Final analysis (from memory; the staging file was written exactly once)
+    final_analysis = analyze_staging_data(artifacts['remaining'])
     if final_analysis:
         print_final_status(final_analysis)
 
@@ -44,6 +44,7 @@ print(f"Analysis generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 # Load the corpus (robust JSON/JSONL loader with diagnostics)
 from pathlib import Path
+from src.instrumentation import dump_if_requested, file_size, span
 
 clean_path = Path(r"nyaya_corpus_clean.jsonl")
 orig_path = Path(r"nyaya_corpus.jsonl")
@@ -117,7 +118,9 @@ def load_json_or_jsonl(path: Path):
 
 
 try:
-    entries, load_stats = load_json_or_jsonl(corpus_path)
+    with span('load_corpus', bytes_read=file_size(corpus_path)) as load_span:
+        entries, load_stats = load_json_or_jsonl(corpus_path)
+        load_span.records = len(entries)
     print(f"✅ Loaded {len(entries)} entries from {corpus_path} [{load_stats['mode']}]")
     if load_stats.get('skipped', 0) or load_stats.get('invalid', 0):
         print(f"   (Skipped: {load_stats.get('skipped', 0)}, Invalid: {load_stats.get('invalid', 0)})")
@@ -776,8 +779,11 @@ if entries:
         return obj
 
     # Save to JSON for handoff automation
-    with open('corpus_statistics.json', 'w', encoding='utf-8') as f:
-        json.dump(to_jsonable(export_stats), f, indent=2, ensure_ascii=False)
+    with span('export_statistics', records=len(entries)) as export_span:
+        with open('corpus_statistics.json', 'w', encoding='utf-8') as f:
+            json.dump(to_jsonable(export_stats), f, indent=2, ensure_ascii=False)
+        export_span.add_io(written=file_size('corpus_statistics.json'))
+    dump_if_requested('corpus_analysis')
 
     print("💾 Statistics exported to 'corpus_statistics.json'")
     print("📊 Ready for integration with handoff automation system")
@@ -993,48 +999,31 @@ else:
 
 
 # Reformat nyaya_corpus.jsonl into proper JSONL (one JSON object per line)
+# Streams the input in chunks; broken objects are reported by byte offset and skipped.
+# The clean corpus is then migrated to the canonical schema, as every ingest writer does.
 from pathlib import Path
 import json
+from src import schema_migrations
+from src.jsonl_repair import repair_file
 
 src = Path(r"nyaya_corpus.jsonl")
 dst = src.with_name("nyaya_corpus_clean.jsonl")
 
 print(f"Reading: {src}")
-text = src.read_text(encoding="utf-8-sig")
-
-dec = json.JSONDecoder()
-idx = 0
-n = len(text)
-objs = []
-
-while idx < n:
-    while idx < n and text[idx].isspace():
-        idx += 1
-    if idx >= n:
-        break
-    obj, end = dec.raw_decode(text, idx)
-    objs.append(obj)
-    idx = end
-
-print(f"Parsed {len(objs)} JSON objects")
-
-with dst.open("w", encoding="utf-8") as f:
-    for o in objs:
-        json.dump(o, f, ensure_ascii=False, separators=(",", ":"))
-        f.write("\n")
-
-# Quick validation: read back as strict JSONL
-count = 0
-with dst.open("r", encoding="utf-8") as f:
-    for i, line in enumerate(f, 1):
-        s = line.strip()
-        if not s:
-            continue
-        json.loads(s)
-        count += 1
+with span('repair_corpus', bytes_read=file_size(src)) as repair_span:
+    repair_report = repair_file(src, dst, resync=True)
+    repair_span.records = repair_report.objects_written
+
+print(f"Parsed {repair_report.objects_written} JSON objects")
+for broken in repair_report.broken[:5]:
+    print(f"⚠️ Skipped broken object at byte {broken.byte_offset}: {broken.reason}")
+
+migration_stats = schema_migrations.migrate_file(dst, errors='skip')
+print(f"Schema migration: {migration_stats}")
+if migration_stats.get('unrecognized'):
+    print(f"⚠️ Dropped {migration_stats['unrecognized']} objects matching no known schema")
 
 print(f"Wrote: {dst}")
-print(f"Validated {count} JSONL lines")
 
 
 # # Staging Rounds Orchestration
@@ -1052,11 +1041,12 @@ print(f"Validated {count} JSONL lines")
 required_checks = 2  # Minimum number of independent passes required
 round_id = 'staging_round_0002'
 
-# File paths
+# File paths (approved rounds are recorded as snapshots in the content-addressed store)
+from src.snapshot_store import SnapshotStore
 staging_file = Path('nyaya_corpus_staging.jsonl')
-approved_file = Path(f'Datasets/approved/approved_{datetime.now().strftime("%Y%m%d")}_{round_id}.jsonl')
+approved_name = f'approved_{datetime.now().strftime("%Y%m%d")}_{round_id}'
 
-print(f"Round: {round_id}\nRequired checks: {required_checks}\nStaging: {staging_file}\nApproved target: {approved_file}")
+print(f"Round: {round_id}\nRequired checks: {required_checks}\nStaging: {staging_file}\nApproved snapshot: {approved_name}")
 
 
 # In[ ]:
@@ -1125,11 +1115,9 @@ result = {
 
 # Approve if threshold met
 if passes >= required_checks:
-    # Write approved corpus file
-    with open(approved_file, 'w', encoding='utf-8') as f:
-        for e in entries:
-            f.write(json.dumps(e, ensure_ascii=False) + "\n")
-    print(f"✅ Approved written to: {approved_file}")
+    # Record approved snapshot
+    approved = SnapshotStore().snapshot(approved_name, entries, ref=f'approved/{round_id}')
+    print(f"✅ Approved snapshot recorded: {approved['name']}")
 else:
     print("❌ Not enough checks passed; not approving this batch yet.")
 
@@ -1449,37 +1437,11 @@ for stage, status in orchestration_results.items():
 
 
 # Convert Philosophy of Religion entries to proper Nyaya format
+from src import schema_migrations
 
 def convert_to_nyaya_format(phil_religion_batch):
     """Convert entries from Western syllogistic to Nyaya format"""
-    nyaya_entries = []
-
-    for entry in phil_religion_batch:
-        # Extract cultural tradition info
-        contexts = entry['cultural_context']
-
-        # Determine if predominantly non-Western
-        non_western_contexts = [ctx for ctx in contexts if any(term in ctx for term in
-                              ['Hindu', 'Buddhist', 'Jain', 'Dharmic', 'Sufi', 'Islamic', 'Chinese'])]
-        cultural_tradition = "Non-Western" if len(non_western_contexts) >= len(contexts)/2 else "Western"
-
-        # Convert to Nyaya format
-        nyaya_entry = {
-            "domain": entry['domain'],
-            "pratijna": entry['conclusion'],  # Main thesis
-            "hetu": f"Because {entry['minor_premise'].split('.')[0].lower()}, and {entry['major_premise'].split(',')[0].lower()}.",
-            "udaharana": f"This parallels how in philosophical discourse, {entry['keywords'][0]} demonstrates the relationship between {entry['keywords'][1] if len(entry['keywords']) > 1 else 'experience'} and {'understanding' if 'epistemic' in entry.get('keywords', []) else 'reality'}.",
-            "upanaya": f"Since {entry['logical_structure'].replace('_', ' ')} applies here, the reasoning from {entry['cultural_context'][0]} tradition shows the connection.",
-            "nigamana": entry['conclusion'],
-            "grounding_authority": entry['source_authority'],
-            "cultural_tradition": cultural_tradition,
-            "complexity_indicators": entry['keywords'][:3],
-            "cross_references": [f"{entry['domain'].split('/')[0].strip()} / {kw.title()}" for kw in entry['keywords'][:2]]
-        }
-
-        nyaya_entries.append(nyaya_entry)
-
-    return nyaya_entries
+    return schema_migrations.migrate_all(phil_religion_batch, errors='raise')
 
 # Convert entries
 nyaya_phil_religion = convert_to_nyaya_format(philosophy_religion_batch)
@@ -1686,12 +1648,8 @@ updated_validation = fix_grounding_authority()
 def integrate_phil_religion_entries():
     """Integrate validated Philosophy of Religion entries into clean corpus"""
 
-    # Backup current clean corpus
-    backup_file = "nyaya_corpus_clean.jsonl.backup_pre_phil_religion"
-    if os.path.exists("nyaya_corpus_clean.jsonl"):
-        import shutil
-        shutil.copy("nyaya_corpus_clean.jsonl", backup_file)
-        print(f"Backed up clean corpus to {backup_file}")
+    from src.snapshot_store import SnapshotStore
+    store = SnapshotStore()
 
     # Read validated entries
     round_file = "Datasets/rounds/staging_round_phil_religion_2024/nyaya_corpus_staging_round_phil_religion_2024_clean.jsonl"
@@ -1704,6 +1662,10 @@ def integrate_phil_religion_entries():
         with open("nyaya_corpus_clean.jsonl", 'r', encoding='utf-8') as f:
             existing_entries = [json.loads(line) for line in f if line.strip()]
 
+    # Backup current clean corpus (content-addressed: unchanged records are not stored again)
+    parent = store.backup_file("nyaya_corpus_clean.jsonl", existing_entries)
+    print(f"Backed up clean corpus as snapshot {parent}")
+
     # Combine entries
     all_entries = existing_entries + new_entries
 
@@ -1711,6 +1673,7 @@ def integrate_phil_religion_entries():
     with open("nyaya_corpus_clean.jsonl", 'w', encoding='utf-8') as f:
         for entry in all_entries:
             f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    store.record_append("nyaya_corpus_clean.jsonl", new_entries, parent, meta={'round': 'staging_round_phil_religion_2024'})
 
     print(f"🎉 Integration completed!")
     print(f"  - Previous corpus: {len(existing_entries)} entries")
@@ -1718,17 +1681,13 @@ def integrate_phil_religion_entries():
     print(f"  - Total corpus: {len(all_entries)} entries")
 
     # Archive approved entries
-    approved_dir = "Datasets/approved"
-    os.makedirs(approved_dir, exist_ok=True)
-
-    approved_file = f"{approved_dir}/phil_religion_2024_approved.jsonl"
-    with open(approved_file, 'w', encoding='utf-8') as f:
-        for entry in new_entries:
-            entry['approval_date'] = '2024-08-15'
-            entry['approval_round'] = 2  # Completed 2-round process
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    for entry in new_entries:
+        entry['approval_date'] = '2024-08-15'
+        entry['approval_round'] = 2  # Completed 2-round process
+    approved = store.snapshot('phil_religion_2024_approved', new_entries,
+                              ref='approved/staging_round_phil_religion_2024')
 
-    print(f"  - Archived to: {approved_file}")
+    print(f"  - Archived as snapshot: {approved['name']}")
 
     return len(all_entries)
 
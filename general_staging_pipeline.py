@@ -9,32 +9,28 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from src import jsonl_codec, schema_migrations, snapshot_store
+from src.instrumentation import dump_if_requested, file_size, span
+
 # Configuration
 REQUIRED_CHECKS = 2
 STAGING_FILE = r"nyaya_corpus_staging.jsonl"
 CLEAN_CORPUS = r"nyaya_corpus_clean.jsonl"
 
 def load_staging_entries():
-    """Load entries from staging file"""
-    entries = []
-    with open(STAGING_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    entry = json.loads(line)
-                    entries.append(entry)
-                except json.JSONDecodeError:
-                    continue
-    return entries
+    """Load entries from staging file (written in the canonical schema at ingest)"""
+    return list(schema_migrations.require_canonical(jsonl_codec.iter_jsonl(STAGING_FILE, errors='skip'), STAGING_FILE))
 
 def validate_entry(entry):
     """Validate entry based on general quality gates"""
     checks = {}
 
     # Schema validation
-    required_fields = ['domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority']
-    checks['schema'] = all(field in entry and entry[field] for field in required_fields)
+    try:
+        jsonl_codec.entry_from_dict(entry)
+        checks['schema'] = True
+    except jsonl_codec.SchemaError:
+        checks['schema'] = False
 
     # Content complexity (check length and depth of explanation)
     content = f"{entry.get('pratijna', '')} {entry.get('hetu', '')} {entry.get('udaharana', '')} {entry.get('upanaya', '')} {entry.get('nigamana', '')}"
@@ -107,17 +103,17 @@ def integrate_to_corpus(approved_entries):
 
     print(f"Current corpus size: {len(existing_entries)} entries")
 
-    # Create backup
-    backup_path = CLEAN_CORPUS + f".backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    if os.path.exists(CLEAN_CORPUS):
-        os.rename(CLEAN_CORPUS, backup_path)
-        print(f"Backup created: {backup_path}")
+    # Back up the current corpus in the snapshot store (no-op if unchanged since the last run)
+    store = snapshot_store.SnapshotStore()
+    parent = store.backup_file(CLEAN_CORPUS, existing_entries)
 
     # Write updated corpus
     total_entries = existing_entries + approved_entries
     with open(CLEAN_CORPUS, 'w', encoding='utf-8') as f:
         for entry in total_entries:
             f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    snapshot = store.record_append(CLEAN_CORPUS, approved_entries, parent, meta={'pipeline': 'general'})
+    print(f"Snapshot recorded: {snapshot}")
 
     print(f"✅ Updated corpus: {len(existing_entries)} + {len(approved_entries)} = {len(total_entries)} entries")
     return len(total_entries)
@@ -131,10 +127,14 @@ def main():
 
     try:
         # Process entries
-        approved_entries, results = process_entries()
+        with span('validate', bytes_read=file_size(STAGING_FILE)) as sp:
+            approved_entries, results = process_entries()
+            sp.records = len(results)
 
         # Integration
-        final_count = integrate_to_corpus(approved_entries)
+        with span('integrate', records=len(approved_entries)) as sp:
+            final_count = integrate_to_corpus(approved_entries)
+            sp.add_io(written=file_size(CLEAN_CORPUS))
 
         # Summary
         total_processed = len(results)
@@ -151,6 +151,7 @@ def main():
             print(f"\n✅ Successfully integrated {total_approved} entries!")
             print("🎯 Domain representation significantly enhanced")
 
+        dump_if_requested('general_staging')
         return {
             'processed': total_processed,
             'approved': total_approved,
@@ -1,56 +1,67 @@
 import streamlit as st
-import json
-import os
-import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.epic_lines import EpicLines, file_fingerprint, page_count  # noqa: E402
+from src.epic_import import import_text  # noqa: E402
+from src.hexameter import scan_line  # noqa: E402
+from src.morphemes import CASES, MorphemeIndex, parse_breakdown  # noqa: E402
 
 DATA_FILE = "data/processed/epic_lines.jsonl"
+PAGE_SIZES = [25, 50, 100, 250]
 
 st.set_page_config(page_title="Homeric Epics Reader", layout="wide")
 
 st.title("🏛️ Homeric Epics Reader")
 st.markdown("Enter and analyze lines from Classical Epics (Iliad, Odyssey, Aeneid).")
 
-def parse_dactylic_hexameter(text):
+def parse_dactylic_hexameter(text, language=None):
     """
-    A basic placeholder parser for Dactylic Hexameter.
-    In a real application, this would use a proper natural language toolkit
-    (like cltk) to analyze syllabic quantity (long vs short) and identify the six metrical feet
-    (dactyls: long-short-short or spondees: long-long).
+    Scans a line as dactylic hexameter (syllable quantity by nature and position,
+    elision, synizesis; see src/hexameter.py).
     """
     if not text.strip():
         return "No text provided for meter analysis."
+    return scan_line(text, language).describe()
 
-    # Very rudimentary simulation for demonstration
-    words = text.split()
-    if len(words) < 5:
-        return f"Text too short for a full hexameter line ({len(words)} words)."
-
-    # Simulate a pattern representation:
-    # - = long, u = short
-    # Hexameter: - u u | - u u | - u u | - u u | - u u | - -
-    simulated_pattern = "- u u | - u u | - - | - u u | - u u | - x"
+@st.cache_resource
+def get_store(path=DATA_FILE):
+    """One incrementally loaded store per file, shared across reruns."""
+    return EpicLines(path)
 
-    return f"Simulated Meter: {simulated_pattern}"
+@st.cache_resource
+def get_morpheme_index(path=DATA_FILE):
+    """Inverted morpheme index over the store of ``path``, updated incrementally."""
+    index = MorphemeIndex()
+    index.update(get_store(path))
+    return index
 
 def load_data():
-    """Loads records from the JSONL file."""
-    data = []
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        data.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        st.warning("Found a malformed line in the data file.")
-    return data
+    """Brings the store up to date, reading only lines appended since the last rerun."""
+    store = get_store()
+    store.refresh()
+    get_morpheme_index().update(store)
+    if store.malformed:
+        st.warning(f"Skipped {store.malformed} malformed line(s) in the data file.")
+    return store
+
+@st.cache_data(max_entries=64)
+def filter_positions(fingerprint, query, source, morpheme, case, _store, _index):
+    """Matching record positions; recomputed only when the file or the filters change."""
+    has = {'Greek': ('ancient_greek_text',), 'Latin': ('latin_text',)}.get(source, ())
+    positions = _store.filter(query, has=has)
+    for key, kind in ((morpheme, 'any'), (case, 'case')):
+        if key:
+            allowed = set(_index.lines_with(key, kind))
+            positions = [p for p in positions if p in allowed]
+    return positions
 
 def save_entry(entry):
-    """Appends a new JSON record to the JSONL file."""
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entry) + '\n')
+    """Appends a new JSON record to the JSONL file and indexes its morphemes."""
+    store = get_store()
+    store.append([entry])
+    get_morpheme_index().update(store)
 
 # Input form
 with st.form("entry_form"):
@@ -77,14 +88,19 @@ if submit_button:
     # Meter Analysis
     if source_text_greek:
         st.markdown("**Greek Meter Analysis (Dactylic Hexameter):**")
-        meter_result_greek = parse_dactylic_hexameter(source_text_greek)
+        meter_result_greek = parse_dactylic_hexameter(source_text_greek, 'greek')
         st.code(meter_result_greek)
 
     if source_text_latin:
         st.markdown("**Latin Meter Analysis (Dactylic Hexameter):**")
-        meter_result_latin = parse_dactylic_hexameter(source_text_latin)
+        meter_result_latin = parse_dactylic_hexameter(source_text_latin, 'latin')
         st.code(meter_result_latin)
 
+    tokens = parse_breakdown(morpheme_breakdown)
+    if tokens:
+        st.markdown("**Morpheme Breakdown:**")
+        st.dataframe([t.to_dict() for t in tokens])
+
     # Save Data
     new_entry = {
         "ancient_greek_text": source_text_greek,
@@ -98,12 +114,50 @@ if submit_button:
     save_entry(new_entry)
     st.success(f"Entry saved to `{DATA_FILE}` successfully!")
 
+# Bulk import
+with st.expander("Bulk Import"):
+    upload = st.file_uploader("Plain-text or TEI edition", type=["txt", "xml"])
+    icol1, icol2, icol3 = st.columns(3)
+    with icol1:
+        import_work = st.text_input("Work", value="Iliad")
+    with icol2:
+        import_book = st.text_input("Book (if the file has no headings)")
+    with icol3:
+        import_start = st.number_input("First line number", min_value=1, value=1)
+    skip_existing = st.checkbox("Skip lines already imported", value=True)
+    if upload is not None and st.button("Import"):
+        with st.spinner("Importing and scanning meter..."):
+            summary = import_text(upload.getvalue().decode("utf-8-sig"), import_work, DATA_FILE,
+                                  book=import_book or None, start_line=int(import_start),
+                                  skip_existing=skip_existing)
+        get_store().refresh()
+        st.success(f"Imported {summary['written']} lines of {summary['work']} ({summary['language']}), "
+                   f"{summary['scanned_ok']} scanned as hexameter, {summary['skipped_existing']} skipped, "
+                   f"in {summary['seconds']}s.")
+
 # Display Data
 st.markdown("---")
 st.subheader("Saved Entries")
-entries = load_data()
-
-if entries:
-    st.dataframe(entries)
+store = load_data()
+
+if len(store):
+    fcol1, fcol2, fcol3, fcol4, fcol5 = st.columns([3, 2, 1, 1, 1])
+    with fcol1:
+        query = st.text_input("Search", help="Words to find in the text, translation or morphemes (accents ignored).")
+    with fcol2:
+        morpheme = st.text_input("Morpheme / lemma", help="Lines whose breakdown contains this word, lemma or morpheme.")
+    with fcol3:
+        case = st.selectbox("Case", [""] + list(CASES))
+    with fcol4:
+        source = st.selectbox("Language", ["All", "Greek", "Latin"])
+    with fcol5:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+    positions = filter_positions(file_fingerprint(DATA_FILE), query, source, morpheme, case,
+                                 store, get_morpheme_index())
+    pages = page_count(len(positions), page_size)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+    st.caption(f"{len(positions)} of {len(store)} entries")
+    st.dataframe(store.page(positions, page, page_size))
 else:
     st.info("No entries found yet. Submit a new entry above.")
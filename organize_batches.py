@@ -7,7 +7,9 @@ Organizes unbatched entries into logical groups for processing.
 import json
 from datetime import datetime
 from collections import defaultdict
-from typing import List
+from typing import Dict, List
+
+from src import jsonl_codec
 
 def generate_batch_id(domain_category: str) -> str:
     """Generate a batch ID based on domain category."""
@@ -43,9 +45,7 @@ def load_entries(filepath: str) -> List[Dict]:
     """Load entries from a JSONL file."""
     entries = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                entries.append(json.loads(line))
+        entries = jsonl_codec.read_jsonl(filepath)
     except FileNotFoundError:
         print(f"⚠️  Warning: Could not find {filepath}")
     return entries
@@ -82,11 +82,33 @@ def assign_batches(domain_groups: Dict[str, List[Dict]]) -> Dict[str, int]:
             }
     return batch_assignments
 
+def plan_batches(entries: List[Dict]) -> tuple[Dict[str, Dict], Dict[str, int]]:
+    """Compute batch assignments keyed by entry index without mutating entries."""
+    indexed_groups = defaultdict(list)
+    for i, entry in enumerate(entries):
+        if entry.get('batch_id', 'None') == 'None':
+            indexed_groups[categorize_domain(entry.get('domain', 'Unknown'))].append(i)
+
+    plan = {}
+    batch_assignments = {}
+    assigned_date = datetime.now().isoformat()
+    for category, indices in indexed_groups.items():
+        batch_id = generate_batch_id(category)
+        batch_assignments[batch_id] = len(indices)
+        for i in indices:
+            plan[str(i)] = {
+                'batch_id': batch_id,
+                'batch_metadata': {
+                    'category': category,
+                    'assigned_date': assigned_date,
+                    'batch_size': len(indices)
+                }
+            }
+    return plan, batch_assignments
+
 def save_entries(entries: List[Dict], filepath: str):
     """Save entries to a JSONL file."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        for entry in entries:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    jsonl_codec.write_jsonl(filepath, entries)
 
 def save_summary(unbatched_count: int, batch_assignments: Dict[str, int], categories: List[str], filepath: str = 'batch_organization_summary.json'):
     """Save summary of batch organization to a JSON file."""
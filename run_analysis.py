@@ -6,6 +6,9 @@ from collections import Counter, defaultdict
 from datetime import datetime
 import warnings
 from pathlib import Path
+
+from src import schema_migrations
+
 warnings.filterwarnings('ignore')
 
 # Cultural classification indicators
@@ -142,27 +145,20 @@ try:
     if load_stats.get('skipped', 0) or load_stats.get('invalid', 0):
         print(f"   (Skipped: {load_stats.get('skipped', 0)}, Invalid: {load_stats.get('invalid', 0)})")
 
-    # Classify entries that are missing the field
-    for entry in entries:
-        if 'cultural_tradition' not in entry or entry['cultural_tradition'] == 'Unknown':
-            entry['cultural_tradition'] = analyze_content(entry)
-
-    required_fields = ['domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority']
+    # The clean corpus is canonical since ingest; the original fallback is migrated in memory
     valid_entries = []
     invalid_count = 0
-    for i, entry in enumerate(entries):
-        # Handle multiple schemas
-        is_nyaya = all(field in entry for field in required_fields)
-        is_other = all(field in entry for field in ['domain', 'major_premise', 'minor_premise', 'conclusion'])
-        if is_nyaya or is_other:
-             valid_entries.append(entry)
+    for i, entry in enumerate(schema_migrations.migrate_stream(entries, errors='keep')):
+        if schema_migrations.is_canonical(entry):
+            valid_entries.append(entry)
         else:
             invalid_count += 1
-            missing = []
-            if isinstance(entry, dict):
-                if not is_nyaya and not is_other:
-                    missing = required_fields
-            print(f"⚠️ Entry {i+1} invalid or missing fields: {missing}")
+            print(f"⚠️ Entry {i+1} invalid or missing fields: {list(schema_migrations.REQUIRED_FIELDS)}")
+
+    # Classify entries that are missing the field
+    for entry in valid_entries:
+        if 'cultural_tradition' not in entry or entry['cultural_tradition'] == 'Unknown':
+            entry['cultural_tradition'] = analyze_content(entry)
     entries = valid_entries
     print(f"📊 Valid entries: {len(entries)} (Invalid: {invalid_count})")
 except FileNotFoundError:
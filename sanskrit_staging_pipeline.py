@@ -4,10 +4,12 @@ Sanskrit Grammar Staging Pipeline
 Process Sanskrit grammar entries through 2-round approval system
 """
 
-import json
-import os
 from datetime import datetime
 
+import classify_cultural_traditions
+from src import jsonl_codec, schema_migrations, snapshot_store
+from src.instrumentation import dump_if_requested, file_size, span
+
 # Configuration
 REQUIRED_CHECKS = 2
 STAGING_FILE = r"nyaya_corpus_staging.jsonl"
@@ -16,46 +18,39 @@ STAGING_FILE = "nyaya_corpus_staging.jsonl"
 CLEAN_CORPUS = "nyaya_corpus_clean.jsonl"
 
 def load_staging_entries():
-    """Load entries from staging file"""
-    entries = []
-    with open(STAGING_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    entry = json.loads(line)
-                    entries.append(entry)
-                except json.JSONDecodeError:
-                    continue
-    return entries
+    """Load entries from staging file (written in the canonical schema at ingest)"""
+    return list(schema_migrations.require_canonical(jsonl_codec.iter_jsonl(STAGING_FILE, errors='skip'), STAGING_FILE))
 
 def validate_entry(entry):
     """Validate a generic entry"""
     checks = {}
     
-    # Schema validation
-    required_fields = ['domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority']
-    # Some entries have a different schema, so we need to handle that.
-    is_syllogism = all(field in entry for field in required_fields)
-    is_other_format = all(field in entry for field in ['domain', 'major_premise', 'minor_premise', 'conclusion'])
-
-    if is_syllogism:
-        checks['schema'] = all(entry[field] for field in required_fields)
-        # Structure validation (proper syllogism)
-        checks['structure'] = len(entry.get('upanaya', '')) > 20 and len(entry.get('nigamana', '')) > 10
-    elif is_other_format:
-        checks['schema'] = all(entry[field] for field in ['domain', 'major_premise', 'minor_premise', 'conclusion'])
-        checks['structure'] = len(entry.get('conclusion', '')) > 10
-    else:
+    # Schema validation (entries are in the canonical schema since ingest)
+    try:
+        jsonl_codec.entry_from_dict(entry)
+        checks['schema'] = True
+    except jsonl_codec.SchemaError:
         checks['schema'] = False
-        checks['structure'] = False
+    # Structure validation (proper syllogism)
+    checks['structure'] = len(entry.get('upanaya') or '') > 20 and len(entry.get('nigamana') or '') > 10
 
     passes = sum(checks.values())
     return passes, checks
 
-def process_entries():
-    """Process entries through staging pipeline"""
-    entries = load_staging_entries()
+def entry_key(i, entry):
+    """Key of the entry at position ``i`` in the round results: its id, or its position if it has none"""
+    return entry.get('id') or f'entry_{i}'
+
+def process_entries(entries=None, classify=True):
+    """Process entries through staging pipeline (loads the staging file if no entries are given)
+
+    ``classify=False`` skips the tradition classification of approved entries,
+    for callers whose entries already carry it (collaborative_workflow).
+    """
+    if entries is None:
+        entries = load_staging_entries()
+    else:
+        entries = list(schema_migrations.require_canonical(entries))
     print(f"Found {len(entries)} entries in staging")
     
     approved_entries = []
@@ -73,49 +68,32 @@ def process_entries():
             entry['staging_status'] = 'approved'
             entry['staging_round'] = 2  # Mark as completed 2 rounds
             entry['validation_date'] = datetime.now().isoformat()
-            entry['cultural_tradition'] = 'Non-Western'  # Sanskrit is non-Western
             
             approved_entries.append(entry)
             print(f"✅ APPROVED after 2 rounds")
         else:
             print(f"❌ REJECTED - only {passes}/{REQUIRED_CHECKS} checks passed")
             
-        round_results[entry.get('id', f'entry_{i}')] = {
+        round_results[entry_key(i, entry)] = {
             'passes': passes,
             'checks': checks,
             'approved': passes >= REQUIRED_CHECKS
         }
     
+    # Classify the approved entries' traditions in one batch
+    if classify:
+        for idx, fields in classify_cultural_traditions.predict_traditions(approved_entries).items():
+            approved_entries[int(idx)].update(fields)
+
     return approved_entries, round_results
 
 def _load_jsonl(filepath):
     """Load JSON lines from a file."""
-    entries = []
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-    return entries
+    return jsonl_codec.read_jsonl(filepath, errors='skip', missing_ok=True)
 
 def _write_jsonl(filepath, entries):
     """Write entries to a file as JSON lines."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        for entry in entries:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
-
-def _create_backup(filepath):
-    """Create a timestamped backup of a file."""
-    if os.path.exists(filepath):
-        backup_path = filepath + f".backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        os.rename(filepath, backup_path)
-        print(f"Backup created: {backup_path}")
-        return backup_path
-    return None
+    jsonl_codec.write_jsonl(filepath, entries)
 
 def _update_staging_file(staging_file, approved_entries):
     """Remove approved entries from staging file."""
@@ -126,8 +104,12 @@ def _update_staging_file(staging_file, approved_entries):
     print(f"✅ Updated staging file with {len(remaining_entries)} remaining entries.")
     return remaining_entries
 
-def integrate_to_corpus(approved_entries):
-    """Add approved entries to clean corpus"""
+def integrate_to_corpus(approved_entries, remaining_entries=None):
+    """Add approved entries to clean corpus.
+
+    If ``remaining_entries`` is given, the staging file is rewritten from it
+    directly instead of being re-read and filtered.
+    """
     if not approved_entries:
         print("No entries to integrate")
         return
@@ -136,16 +118,23 @@ def integrate_to_corpus(approved_entries):
     existing_entries = _load_jsonl(CLEAN_CORPUS)
     print(f"Current corpus size: {len(existing_entries)} entries")
     
-    # Create backup
-    _create_backup(CLEAN_CORPUS)
+    # Back up the current corpus in the snapshot store (no-op if unchanged since the last run)
+    store = snapshot_store.SnapshotStore()
+    parent = store.backup_file(CLEAN_CORPUS, existing_entries)
     
     # Write updated corpus
     total_entries = existing_entries + approved_entries
     _write_jsonl(CLEAN_CORPUS, total_entries)
+    snapshot = store.record_append(CLEAN_CORPUS, approved_entries, parent, meta={'pipeline': 'sanskrit'})
+    print(f"Snapshot recorded: {snapshot}")
     print(f"✅ Updated corpus: {len(existing_entries)} + {len(approved_entries)} = {len(total_entries)} entries")
 
     # Clear remaining entries from staging file
-    _update_staging_file(STAGING_FILE, approved_entries)
+    if remaining_entries is None:
+        _update_staging_file(STAGING_FILE, approved_entries)
+    else:
+        _write_jsonl(STAGING_FILE, remaining_entries)
+        print(f"✅ Updated staging file with {len(remaining_entries)} remaining entries.")
 
     return len(total_entries)
 
@@ -158,10 +147,14 @@ def main():
     
     try:
         # Process entries
-        approved_entries, results = process_entries()
+        with span('validate', bytes_read=file_size(STAGING_FILE)) as sp:
+            approved_entries, results = process_entries()
+            sp.records = len(results)
         
         # Integration
-        final_count = integrate_to_corpus(approved_entries)
+        with span('integrate', records=len(approved_entries)) as sp:
+            final_count = integrate_to_corpus(approved_entries)
+            sp.add_io(written=file_size(CLEAN_CORPUS))
         
         # Summary
         total_processed = len(results)
@@ -179,6 +172,7 @@ def main():
             print("🎯 Corpus domain representation significantly enhanced")
             print("📚 Corpus coverage expanded")
         
+        dump_if_requested('sanskrit_staging')
         return {
             'processed': total_processed,
             'approved': total_approved,
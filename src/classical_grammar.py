@@ -1,4 +1,6 @@
-from lambeq.backend.grammar import Ty
+from typing import Iterable, List, Optional
+
+from lambeq.backend.grammar import Box, Diagram, Functor, Ty, Word, grammar
 
 # Basic types
 n = Ty('n')  # Noun
@@ -43,3 +45,52 @@ def map_classical_to_sanskrit() -> dict:
     Returns the full cross-linguistic mapping.
     """
     return classical_to_sanskrit_map
+
+
+# Case map keyed by atomic type name, compiled once for the functor's ob lookups
+_sanskrit_by_name = {classical.name: sanskrit for classical, sanskrit in classical_to_sanskrit_map.items()}
+
+
+def _case_ob(_: Functor, ty: Ty) -> Ty:
+    return _sanskrit_by_name.get(ty.name, ty)
+
+
+def _case_ar(functor: Functor, box: Box) -> Diagram:
+    if isinstance(box, Word):
+        return Word(box.name, functor(box.cod))
+    return Box(box.name, functor(box.dom), functor(box.cod))
+
+
+def case_functor() -> Functor:
+    """
+    Returns a Functor rewriting every NOM/ACC/GEN/DAT/ABL/VOC wire to its vibhakti type.
+    Other types, cups, caps and swaps pass through. The functor memoizes each type and
+    box it has mapped, so reusing one instance across diagrams only rewrites new boxes.
+    """
+    return Functor(grammar, ob=_case_ob, ar=_case_ar)
+
+
+_default_functor: Optional[Functor] = None
+
+
+def _shared_functor() -> Functor:
+    global _default_functor
+    if _default_functor is None:
+        _default_functor = case_functor()
+    return _default_functor
+
+
+def rewrite_to_sanskrit(diagram: Diagram, functor: Optional[Functor] = None) -> Diagram:
+    """
+    Rewrites the classical case wires of a single diagram to Sanskrit vibhakti types.
+    """
+    return (functor or _shared_functor())(diagram)
+
+
+def rewrite_many(diagrams: Iterable[Diagram], functor: Optional[Functor] = None) -> List[Diagram]:
+    """
+    Rewrites a batch of diagrams through one functor, so each distinct type and box is
+    mapped once for the whole batch. ``None`` entries (failed parses) are kept as ``None``.
+    """
+    functor = functor or _shared_functor()
+    return [None if d is None else functor(d) for d in diagrams]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Corpus Diff
+Reports what changed between two versions of a corpus: records added,
+removed and modified, with the modified records broken down field by field.
+
+A source can be any of:
+- a JSONL file (``.jsonl``, or compressed ``.jsonl.zst``/``.jsonl.gz``)
+- a pretty round file (the JSON array written by ``round_tools.py to-pretty``)
+- a snapshot in the content-addressed store: ``snapshot:<name>``
+
+Records are matched by ``id``, falling back to a content hash for records
+without one. The first source is streamed once to build a key -> hash table
+and the second source is streamed against that table. A final pass over the
+first source fetches the old side of modified records for the field-level
+diff. Time is O(N) and memory is O(distinct keys); apart from the modified
+records, record bodies are never held.
+
+Usage:
+  python src/corpus_diff.py nyaya_corpus_clean.jsonl Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_pretty.json
+  python src/corpus_diff.py snapshot:approved_20250815_staging_round_0001 snapshot:approved_20250815_staging_round_0002 --json
+"""
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+
+SNAPSHOT_PREFIX = 'snapshot:'
+
+PathLike = Union[str, Path]
+
+
+def _digest(value: Any) -> bytes:
+    return hashlib.blake2b(jsonl_codec.canonical_bytes(value), digest_size=16).digest()
+
+
+def open_source(spec: str, store_root: Optional[PathLike] = None) -> Callable[[], Iterator[Any]]:
+    """A re-iterable record source for ``spec`` (file path or ``snapshot:<name>``)."""
+    if spec.startswith(SNAPSHOT_PREFIX):
+        from src.snapshot_store import DEFAULT_ROOT, SnapshotStore
+        store = SnapshotStore(store_root or DEFAULT_ROOT)
+        name = spec[len(SNAPSHOT_PREFIX):]
+        store.manifest(name)  # fail early on unknown snapshots
+        return lambda: store.iter_records(name)
+
+    path = Path(spec)
+    if not path.exists():
+        raise FileNotFoundError(spec)
+    if path.suffix == '.json':
+        from src.jsonl_repair import iter_objects
+
+        def pretty() -> Iterator[Any]:
+            with path.open('rb') as f:
+                yield from iter_objects(f)
+        return pretty
+    return lambda: jsonl_codec.iter_jsonl(path)
+
+
+@dataclass
+class _Seen:
+    content: bytes
+    position: int
+    matched: bool = False
+
+
+@dataclass
+class DiffReport:
+    source_a: str
+    source_b: str
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    modified: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'removed': len(self.removed),
+                'modified': len(self.modified), 'unchanged': self.unchanged}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'a': self.source_a, 'b': self.source_b, 'counts': self.counts,
+                'added': self.added, 'removed': self.removed, 'modified': self.modified}
+
+
+class _Keyer:
+    """Record key: ``<key_field>`` value (numbered on repeats) or ``sha:<content hash>``."""
+
+    def __init__(self, key_field: str):
+        self.key_field = key_field
+        self.repeats: Dict[str, int] = {}
+
+    def __call__(self, rec: Any, content: bytes) -> str:
+        rid = rec.get(self.key_field) if isinstance(rec, dict) else None
+        key = str(rid) if rid not in (None, '') else f"sha:{content.hex()}"
+        n = self.repeats.get(key, 0) + 1
+        self.repeats[key] = n
+        return key if n == 1 else f"{key}#{n}"
+
+
+def _summary(rec: Any) -> str:
+    if isinstance(rec, dict):
+        return str(rec.get('pratijna') or rec.get('domain') or '')[:120]
+    return str(rec)[:120]
+
+
+def field_diff(old: Any, new: Any) -> Dict[str, Dict[str, Any]]:
+    """``{field: {'from', 'to'}}`` for every field that differs (None when absent)."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {'<record>': {'from': old, 'to': new}}
+    out = {}
+    for k in list(old) + [k for k in new if k not in old]:
+        if old.get(k) != new.get(k) or (k in old) != (k in new):
+            out[k] = {'from': old.get(k), 'to': new.get(k)}
+    return out
+
+
+def diff_records(
+    source_a: Callable[[], Iterable[Any]],
+    source_b: Callable[[], Iterable[Any]],
+    key_field: str = 'id',
+    ignore_fields: Sequence[str] = (),
+    names: Tuple[str, str] = ('a', 'b'),
+) -> DiffReport:
+    """Diff two re-iterable record sources (``source_a`` is read twice, ``source_b`` once)."""
+    ignore = set(ignore_fields)
+
+    def strip(rec: Any) -> Any:
+        if ignore and isinstance(rec, dict):
+            return {k: v for k, v in rec.items() if k not in ignore}
+        return rec
+
+    # Pass 1: key -> content hash of A
+    seen: Dict[str, _Seen] = {}
+    keyer = _Keyer(key_field)
+    for pos, rec in enumerate(source_a()):
+        rec = strip(rec)
+        content = _digest(rec)
+        seen[keyer(rec, content)] = _Seen(content, pos)
+
+    # Pass 2: stream B against the table; only modified records are kept
+    report = DiffReport(*names)
+    pending: Dict[int, Tuple[str, int, Any]] = {}
+    keyer = _Keyer(key_field)
+    for pos, rec in enumerate(source_b()):
+        rec = strip(rec)
+        content = _digest(rec)
+        key = keyer(rec, content)
+        old = seen.get(key)
+        if old is None:
+            report.added.append({'key': key, 'position': pos, 'summary': _summary(rec)})
+        elif old.content == content:
+            old.matched = True
+            report.unchanged += 1
+        else:
+            old.matched = True
+            pending[old.position] = (key, pos, rec)
+
+    # Pass 3: fetch the old side of modified records; unmatched keys are removals
+    removed_positions = {s.position: k for k, s in seen.items() if not s.matched}
+    if removed_positions or pending:
+        for pos, rec in enumerate(source_a()):
+            if pos in pending:
+                key, pos_b, new = pending.pop(pos)
+                report.modified.append({'key': key, 'position_a': pos, 'position_b': pos_b,
+                                        'fields': field_diff(strip(rec), new)})
+            elif pos in removed_positions:
+                report.removed.append({'key': removed_positions[pos], 'position': pos,
+                                       'summary': _summary(rec)})
+    report.modified.sort(key=lambda m: m['position_b'])
+    return report
+
+
+def diff_sources(a: str, b: str, store_root: Optional[PathLike] = None, **kwargs) -> DiffReport:
+    return diff_records(open_source(a, store_root), open_source(b, store_root), names=(a, b), **kwargs)
+
+
+def _short(value: Any, width: int = 100) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def print_report(report: DiffReport, limit: int = 20) -> None:
+    c = report.counts
+    print(f"📊 {report.source_a} → {report.source_b}")
+    print(f"   +{c['added']} added, -{c['removed']} removed, ~{c['modified']} modified, {c['unchanged']} unchanged")
+    for label, rows in (('➕ Added', report.added), ('➖ Removed', report.removed)):
+        if rows:
+            print(f"\n{label}:")
+            for r in rows[:limit]:
+                print(f"  {r['key']}: {r['summary']}")
+            if len(rows) > limit:
+                print(f"  ... {len(rows) - limit} more")
+    if report.modified:
+        print("\n✏️  Modified:")
+        for m in report.modified[:limit]:
+            print(f"  {m['key']}")
+            for k, d in m['fields'].items():
+                print(f"    {k}: {_short(d['from'])}")
+                print(f"    {' ' * len(k)}→ {_short(d['to'])}")
+        if len(report.modified) > limit:
+            print(f"  ... {len(report.modified) - limit} more")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Diff two corpus versions (JSONL, pretty JSON or snapshot:<name>)')
+    ap.add_argument('a')
+    ap.add_argument('b')
+    ap.add_argument('--key', default='id', help='Field used to match records (default: id)')
+    ap.add_argument('--ignore', nargs='+', default=[], help='Fields to ignore, e.g. staging_status validation_date')
+    ap.add_argument('--store', help='Snapshot store root for snapshot:<name> sources')
+    ap.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    ap.add_argument('--limit', type=int, default=20, help='Rows per section in the text report')
+    ap.add_argument('--exit-code', action='store_true', help='Exit 1 when the sources differ')
+    args = ap.parse_args(argv)
+
+    report = diff_sources(args.a, args.b, store_root=args.store, key_field=args.key, ignore_fields=args.ignore)
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print_report(report, args.limit)
+    differs = any(report.counts[k] for k in ('added', 'removed', 'modified'))
+    return 1 if args.exit_code and differs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
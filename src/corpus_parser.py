@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Corpus Parser
+Turns the Nyāya steps of the clean corpus (pratijna, hetu, nigamana by
+default) into lambeq diagrams, in batches spread over a process pool.
+
+- Sentences are streamed from the corpus and de-duplicated by sentence hash,
+  so the corpus is never held in memory and each sentence is parsed once
+- Each worker process builds its own CPU-only parser once (``BobcatParser``
+  with ``device=-1`` by default) and parses whole batches
+- Diagrams land in the sharded store of ``src/diagram_cache.py``, so the
+  trainer notebooks and this pipeline share one cache. Sentences already in
+  the store are skipped, which makes re-runs incremental
+- Sentences that fail to parse are stored as failures and logged to
+  ``failures.jsonl`` in the store directory, together with the record id, the
+  field and the error
+
+Usage:
+  python src/corpus_parser.py --corpus nyaya_corpus_clean.jsonl --workers 4
+  python src/corpus_parser.py --fields pratijna --limit 50 --workers 0   # in-process
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.diagram_cache import (DEFAULT_ROOT, FAILED, DiagramCache, ShardedStore, is_failed,  # noqa: E402
+                               package_version, sentence_key)
+from src.instrumentation import dump_if_requested, file_size, span  # noqa: E402
+
+DEFAULT_CORPUS = Path('nyaya_corpus_clean.jsonl')
+DEFAULT_FIELDS = ('pratijna', 'hetu', 'nigamana')
+DEFAULT_PARSER = 'lambeq:BobcatParser'
+DEFAULT_PARSER_KWARGS = {'device': -1, 'verbose': 'suppress'}
+FAILURE_LOG = 'failures.jsonl'
+
+PathLike = Union[str, Path]
+Step = Tuple[str, str, str]  # (record id, field, sentence)
+
+_PARSER = None
+
+
+def iter_steps(corpus_path: PathLike, fields: Sequence[str] = DEFAULT_FIELDS) -> Iterator[Step]:
+    """``(record_id, field, sentence)`` for every non-empty step in the corpus."""
+    for pos, rec in enumerate(jsonl_codec.iter_jsonl(corpus_path)):
+        if not isinstance(rec, dict):
+            continue
+        rid = str(rec.get('id') or f"#{pos}")
+        for name in fields:
+            sentence = ' '.join(str(rec.get(name) or '').split())
+            if sentence:
+                yield rid, name, sentence
+
+
+def _batches(steps: Iterable[Step], store: ShardedStore, size: int, retry_failed: bool,
+             counts: Dict[str, int]) -> Iterator[List[Tuple[str, Step]]]:
+    """Batches of ``(key, step)`` still to parse, one entry per distinct sentence."""
+    queued = set()
+    batch: List[Tuple[str, Step]] = []
+    for step in steps:
+        counts['steps'] += 1
+        key = sentence_key(step[2])
+        if key in queued:
+            continue
+        if key in store and not (retry_failed and store.failed(key)):
+            counts['cached'] += 1
+            queued.add(key)
+            continue
+        queued.add(key)
+        batch.append((key, step))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_parser(spec: str, kwargs: Dict[str, Any]) -> Any:
+    """Instantiate ``module:Class`` with ``kwargs``."""
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr)(**kwargs)
+
+
+def _init_worker(spec: str, kwargs: Dict[str, Any]) -> None:
+    global _PARSER
+    _PARSER = load_parser(spec, kwargs)
+
+
+def parse_batch(batch: List[Tuple[str, Step]]) -> List[Tuple[str, Any, Optional[str]]]:
+    """``(key, diagram or None, error)`` per entry, parsed with the process's parser."""
+    sentences = [step[2] for _, step in batch]
+    try:
+        diagrams = _PARSER.sentences2diagrams(sentences, suppress_exceptions=True)
+    except Exception:
+        diagrams = [None] * len(batch)
+    out = []
+    for (key, step), diagram in zip(batch, diagrams):
+        error = None
+        if diagram is None:
+            # Re-parse failures one by one to recover the error message
+            try:
+                diagram = _PARSER.sentence2diagram(step[2])
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if diagram is None and error is None:
+                error = 'parser returned no diagram'
+        out.append((key, diagram, error))
+    return out
+
+
+def parser_namespace(spec: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Store configuration for a parser spec; runtime-only options are left out."""
+    config = {'parser': spec.partition(':')[2], 'lambeq': package_version('lambeq')}
+    config.update({k: v for k, v in kwargs.items() if k not in ('device', 'verbose')})
+    return config
+
+
+def parse_corpus(
+    corpus_path: PathLike = DEFAULT_CORPUS,
+    root: PathLike = DEFAULT_ROOT,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+    parser_spec: str = DEFAULT_PARSER,
+    parser_kwargs: Optional[Dict[str, Any]] = None,
+    retry_failed: bool = False,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Parse every uncached step of the corpus into the diagram store; returns a summary.
+
+    ``workers=0`` parses in-process; ``None`` uses one worker per CPU.
+    """
+    parser_kwargs = dict(DEFAULT_PARSER_KWARGS if parser_kwargs is None else parser_kwargs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    store = DiagramCache(root).diagram_store(parser_namespace(parser_spec, parser_kwargs))
+    log_path = store.directory / FAILURE_LOG
+    counts = {'steps': 0, 'cached': 0, 'parsed': 0, 'failed': 0, 'batches': 0}
+    started = time.perf_counter()
+
+    steps: Iterable[Step] = iter_steps(corpus_path, fields)
+    if limit is not None:
+        steps = itertools.islice(steps, limit)
+    batches = _batches(steps, store, batch_size, retry_failed, counts)
+    pending_steps: Dict[str, Step] = {}
+
+    def collect(results: List[Tuple[str, Any, Optional[str]]]) -> None:
+        failures = []
+        for key, diagram, error in results:
+            step = pending_steps.pop(key)
+            if error is None:
+                store.put(key, diagram)
+                counts['parsed'] += 1
+            else:
+                store.put(key, FAILED)
+                counts['failed'] += 1
+                failures.append({'key': key, 'id': step[0], 'field': step[1],
+                                 'sentence': step[2], 'error': error})
+        store.flush()
+        if failures:
+            jsonl_codec.write_jsonl(log_path, failures, append=True)
+        counts['batches'] += 1
+
+    def submit_all(submit) -> None:
+        for batch in batches:
+            pending_steps.update(batch)
+            submit(batch)
+
+    with span('parse_corpus', bytes_read=file_size(corpus_path)) as sp:
+        if workers == 0:
+            _init_worker(parser_spec, parser_kwargs)
+            submit_all(lambda batch: collect(parse_batch(batch)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(parser_spec, parser_kwargs)) as pool:
+                in_flight = set()
+
+                def submit(batch):
+                    # Bound the number of batches held in memory
+                    while len(in_flight) >= 2 * workers:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            in_flight.discard(fut)
+                            collect(fut.result())
+                    in_flight.add(pool.submit(parse_batch, batch))
+
+                submit_all(submit)
+                for fut in in_flight:
+                    collect(fut.result())
+        # Drop entries superseded by re-parsed failures
+        store.compact()
+        sp.records = counts['parsed'] + counts['failed']
+
+    return {
+        'corpus': str(corpus_path),
+        'store': str(store.directory),
+        'fields': list(fields),
+        'workers': workers,
+        'batch_size': batch_size,
+        **counts,
+        'failure_log': str(log_path) if counts['failed'] else None,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def load_diagrams(
+    corpus_path: PathLike = DEFAULT_CORPUS,
+    root: PathLike = DEFAULT_ROOT,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    parser_spec: str = DEFAULT_PARSER,
+    parser_kwargs: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[str, str, Any]]:
+    """``(record_id, field, diagram)`` for the corpus steps, from the store (None if unparsed or failed)."""
+    parser_kwargs = dict(DEFAULT_PARSER_KWARGS if parser_kwargs is None else parser_kwargs)
+    store = DiagramCache(root).diagram_store(parser_namespace(parser_spec, parser_kwargs))
+    for rid, name, sentence in iter_steps(corpus_path, fields):
+        diagram = store.get(sentence_key(sentence))
+        yield rid, name, None if is_failed(diagram) else diagram
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Parse corpus Nyāya steps into lambeq diagrams')
+    ap.add_argument('--corpus', default=str(DEFAULT_CORPUS))
+    ap.add_argument('--root', default=str(DEFAULT_ROOT), help='Diagram store root')
+    ap.add_argument('--fields', nargs='+', default=list(DEFAULT_FIELDS))
+    ap.add_argument('--workers', type=int, default=None, help='Worker processes (0 = in-process; default: CPU count)')
+    ap.add_argument('--batch-size', type=int, default=32)
+    ap.add_argument('--parser', default=DEFAULT_PARSER, help='module:Class of the parser')
+    ap.add_argument('--parser-kwargs', default=json.dumps(DEFAULT_PARSER_KWARGS), help='JSON keyword arguments')
+    ap.add_argument('--retry-failed', action='store_true', help='Re-parse sentences that failed before')
+    ap.add_argument('--limit', type=int, help='Only the first N steps')
+    args = ap.parse_args(argv)
+
+    summary = parse_corpus(args.corpus, args.root, args.fields, args.workers, args.batch_size,
+                           args.parser, json.loads(args.parser_kwargs), args.retry_failed, args.limit)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    dump_if_requested('corpus_parser')
+    return 1 if summary['failed'] and not summary['parsed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Compressed Corpus Storage
+Stores a corpus as independently decompressible frames of N records plus a
+frame offset index, so full scans read far fewer bytes and fetching a single
+record decompresses only the frame that holds it.
+
+Layout for ``approved_x.jsonl.zst``:
+- ``approved_x.jsonl.zst``: concatenated zstd frames, each holding
+  ``records_per_frame`` canonical JSONL lines (any ``zstd -d`` can read it)
+- ``approved_x.jsonl.zst.frames.json``: ``{"codec", "records", "bytes",
+  "tail", "frames": [{"offset", "length", "first", "records"}, ...]}``
+
+The index is replaced before the corpus, and a reader only trusts it if it
+matches the corpus: the file size, the frame layout and a hash of the last
+frame (``tail``). An index left behind by an interrupted write is ignored and
+the corpus is read sequentially.
+
+zstd needs the optional ``zstandard`` package. Without it the same layout is
+written with gzip members (``.jsonl.gz``), which the stdlib can read; readers
+handle both. ``src.jsonl_codec.read_jsonl`` reads these files transparently.
+"""
+
+import bisect
+import gzip
+import hashlib
+import io
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src import jsonl_codec
+
+try:
+    import zstandard  # type: ignore
+    HAVE_ZSTD = True
+except ImportError:
+    HAVE_ZSTD = False
+
+DEFAULT_RECORDS_PER_FRAME = 256
+INDEX_SUFFIX = '.frames.json'
+CODEC_SUFFIXES = {'.zst': 'zstd', '.gz': 'gzip'}
+CODEC_SUFFIX = '.zst' if HAVE_ZSTD else '.gz'
+
+PathLike = Union[str, Path]
+
+
+def default_codec() -> str:
+    return CODEC_SUFFIXES[CODEC_SUFFIX]
+
+
+def default_suffix() -> str:
+    """File suffix for new compressed corpora (``.jsonl.zst`` or ``.jsonl.gz``)."""
+    return '.jsonl' + CODEC_SUFFIX
+
+
+def is_compressed(path: PathLike) -> bool:
+    return Path(path).suffix in CODEC_SUFFIXES
+
+
+def codec_for(path: PathLike) -> str:
+    try:
+        return CODEC_SUFFIXES[Path(path).suffix]
+    except KeyError:
+        raise ValueError(f"Not a compressed corpus path: {path}")
+
+
+def index_path(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _compressor(codec: str, level: Optional[int]):
+    if codec == 'zstd':
+        if not HAVE_ZSTD:
+            raise RuntimeError('zstd output requires the zstandard package')
+        cctx = zstandard.ZstdCompressor(level=level if level is not None else 3)
+        return cctx.compress
+    lvl = level if level is not None else 6
+    return lambda data: gzip.compress(data, compresslevel=lvl, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        if not HAVE_ZSTD:
+            raise RuntimeError('Reading .zst corpora requires the zstandard package')
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data, wbits=16 + zlib.MAX_WBITS)
+
+
+def compress_frame(codec: str, lines: Iterable[bytes], level: Optional[int] = None) -> bytes:
+    """One independently decompressible frame holding ``lines`` (newline-terminated)."""
+    return _compressor(codec, level)(b''.join(lines))
+
+
+def decompress_frame(codec: str, blob: bytes) -> List[bytes]:
+    """Non-blank raw lines of one frame written by ``compress_frame``."""
+    return [line for line in _decompress(codec, blob).splitlines(keepends=True) if line.strip()]
+
+
+def split_frames(codec: str, data: bytes) -> Iterator[Tuple[int, int, List[bytes]]]:
+    """``(offset, length, lines)`` of each complete frame in concatenated ``data``.
+
+    Stops at the first truncated or corrupt frame (e.g. an interrupted append).
+    """
+    pos = 0
+    while pos < len(data):
+        if codec == 'zstd':
+            if not HAVE_ZSTD:
+                raise RuntimeError('Reading .zst corpora requires the zstandard package')
+            d = zstandard.ZstdDecompressor().decompressobj()
+            error = zstandard.ZstdError
+        else:
+            d = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            error = zlib.error
+        try:
+            out = d.decompress(data[pos:])
+        except error:
+            return
+        if not d.eof:
+            return
+        length = len(data) - pos - len(d.unused_data)
+        yield pos, length, [line for line in out.splitlines(keepends=True) if line.strip()]
+        pos += length
+
+
+def write_compressed(
+    path: PathLike,
+    records: Iterable[Any],
+    records_per_frame: int = DEFAULT_RECORDS_PER_FRAME,
+    level: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Write ``records`` as compressed frames plus the frame index; returns the index."""
+    path = Path(path)
+    codec = codec_for(path)
+    compress = _compressor(codec, level)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+
+    frames: List[Dict[str, int]] = []
+    total = 0
+    offset = 0
+    with tmp.open('wb') as f:
+        batch: List[bytes] = []
+
+        def flush():
+            nonlocal offset
+            blob = compress(b''.join(batch))
+            f.write(blob)
+            frames.append({'offset': offset, 'length': len(blob), 'first': total - len(batch), 'records': len(batch)})
+            offset += len(blob)
+            batch.clear()
+
+        for rec in records:
+            if hasattr(rec, 'to_dict'):
+                rec = rec.to_dict()
+            batch.append(jsonl_codec.dumps(rec).encode('utf-8') + b'\n')
+            total += 1
+            if len(batch) >= records_per_frame:
+                flush()
+        if batch:
+            flush()
+
+    index = {'version': 2, 'codec': codec, 'records_per_frame': records_per_frame,
+             'records': total, 'bytes': offset, 'tail': _tail_hash(tmp, frames), 'frames': frames}
+    idx = index_path(path)
+    idx_tmp = idx.with_name(idx.name + '.tmp')
+    idx_tmp.write_text(json.dumps(index), encoding='utf-8')
+    os.replace(idx_tmp, idx)
+    os.replace(tmp, path)
+    return index
+
+
+def _tail_hash(path: Path, frames: List[Dict[str, int]]) -> Optional[str]:
+    """Hash of the last frame's compressed bytes."""
+    if not frames:
+        return None
+    with path.open('rb') as f:
+        f.seek(frames[-1]['offset'])
+        return hashlib.blake2b(f.read(frames[-1]['length']), digest_size=16).hexdigest()
+
+
+def load_index(path: PathLike) -> Optional[Dict[str, Any]]:
+    """The frame index of ``path``, or ``None`` if it is missing or does not describe the file."""
+    path = Path(path)
+    try:
+        index = json.loads(index_path(path).read_text(encoding='utf-8'))
+        size = path.stat().st_size
+    except (OSError, ValueError):
+        return None
+    try:
+        frames = index['frames']
+        if index['codec'] != codec_for(path) or index['bytes'] != size:
+            return None
+        if sum(fr['records'] for fr in frames) != index['records']:
+            return None
+        if (frames[-1]['offset'] + frames[-1]['length'] if frames else 0) != size:
+            return None
+    except (KeyError, TypeError, IndexError):
+        return None
+    if 'tail' in index and _tail_hash(path, frames) != index['tail']:
+        return None
+    return index
+
+
+class CompressedCorpus:
+    """Random-access reader over a compressed corpus and its frame index."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.codec = codec_for(self.path)
+        self.index = load_index(self.path)
+        self._firsts = [fr['first'] for fr in self.index['frames']] if self.index else []
+        self._cache_frame: Optional[int] = None
+        self._cache_lines: List[bytes] = []
+
+    def __len__(self) -> int:
+        if self.index is None:
+            return sum(1 for _ in self)
+        return self.index['records']
+
+    def _frame_lines(self, n: int) -> List[bytes]:
+        """Raw lines of frame ``n``; the last frame read is kept for nearby lookups."""
+        if self._cache_frame == n:
+            return self._cache_lines
+        frame = self.index['frames'][n]
+        with self.path.open('rb') as f:
+            f.seek(frame['offset'])
+            blob = f.read(frame['length'])
+        self._cache_lines = [line for line in _decompress(self.codec, blob).splitlines() if line.strip()]
+        self._cache_frame = n
+        return self._cache_lines
+
+    def get(self, i: int) -> Any:
+        """Record ``i`` (0-based); decompresses only the frame that holds it."""
+        if self.index is None:
+            raise LookupError(f"No frame index for {self.path}; rebuild with write_compressed")
+        n_records = self.index['records']
+        if i < 0:
+            i += n_records
+        if not 0 <= i < n_records:
+            raise IndexError(f"Record {i} out of range (0..{n_records - 1})")
+        n = bisect.bisect_right(self._firsts, i) - 1
+        return jsonl_codec.loads(self._frame_lines(n)[i - self._firsts[n]])
+
+    def iter_frames(self) -> Iterator[List[Any]]:
+        for n in range(len(self.index['frames'])):
+            yield [jsonl_codec.loads(line) for line in self._frame_lines(n)]
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.index is not None:
+            for frame in self.iter_frames():
+                yield from frame
+            return
+        for line in iter_raw_lines(self.path):
+            yield jsonl_codec.loads(line)
+
+
+def iter_raw_lines(path: PathLike) -> Iterator[bytes]:
+    """Non-blank raw JSONL lines of a compressed corpus, streamed frame by frame.
+
+    Works without the frame index (e.g. a file produced by ``zstd``/``gzip``).
+    """
+    path = Path(path)
+    if codec_for(path) == 'zstd':
+        if not HAVE_ZSTD:
+            raise RuntimeError('Reading .zst corpora requires the zstandard package')
+        with path.open('rb') as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            for line in io.BufferedReader(reader):
+                if line.strip():
+                    yield line
+    else:
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def read_compressed(path: PathLike) -> List[Any]:
+    return list(CompressedCorpus(path))
+
+
+def compress_jsonl(src: PathLike, dst: Optional[PathLike] = None, **kwargs) -> Path:
+    """Convert a plain JSONL file to a compressed corpus next to it (or at ``dst``)."""
+    src = Path(src)
+    if dst is None:
+        dst = src.with_name(src.name[:-len('.jsonl')] if src.name.endswith('.jsonl') else src.name)
+        dst = dst.with_name(dst.name + default_suffix())
+    write_compressed(dst, jsonl_codec.iter_jsonl(src), **kwargs)
+    return Path(dst)
@@ -0,0 +1,374 @@
+"""
+Diagram Cache
+Persists lambeq parse diagrams and ansatz circuits on disk, keyed by sentence
+hash and by the parser/ansatz configuration, so re-running an experiment on
+unchanged data skips parsing entirely and only new sentences reach the parser.
+
+Layout under the cache root (``.diagram_cache`` by default):
+- ``diagrams/<parser config hash>/shard_<xx>.log``
+- ``circuits/<parser + ansatz config hash>/shard_<xx>.log``
+- ``<namespace>/config.json``: the configuration the hash was computed from
+
+Shards are append-only logs of ``sentence hash -> pickled object`` frames
+(lambeq diagrams and their sympy symbols pickle as-is); a flush appends only
+the new entries and only an index of keys stays in memory. Sentences the
+parser failed on (``suppress_exceptions=True``) are remembered as failures
+and come back as ``None``, unless ``retry_failed`` is set.
+``LazyParser`` defers building the parser until a sentence actually misses the
+cache.
+
+lambeq is only needed by the caller; this module never imports it.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_ROOT = Path('.diagram_cache')
+FAILED = '__parse_failed__'
+SHARD_PREFIX_CHARS = 2
+
+PathLike = Union[str, Path]
+# Offset of the pickled value in the log, its length, and whether it is FAILED
+Slot = Tuple[int, int, bool]
+
+# Log frame header: key length, value length
+_FRAME = struct.Struct('>HI')
+_FAILED_BLOB = pickle.dumps(FAILED, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def is_failed(value: Any) -> bool:
+    """Whether a stored value is the parse-failure marker (never compares diagrams structurally)."""
+    return isinstance(value, str) and value == FAILED
+
+
+def sentence_key(sentence: str) -> str:
+    """Hash of the whitespace-normalized sentence."""
+    return hashlib.sha256(' '.join(sentence.split()).encode('utf-8')).hexdigest()
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    blob = json.dumps(config, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
+def package_version(module_name: str) -> Optional[str]:
+    try:
+        module = __import__(module_name)
+    except ImportError:
+        return None
+    return getattr(module, '__version__', None)
+
+
+def parser_config(parser: Any, **extra: Any) -> Dict[str, Any]:
+    """Configuration identifying a parser's output: class, model and lambeq version."""
+    config = {'parser': type(parser).__name__, 'lambeq': package_version('lambeq')}
+    for attr in ('model_name_or_path', 'root_cats', 'split_sentences', 'verbose_parse'):
+        if hasattr(parser, attr):
+            config[attr] = getattr(parser, attr)
+    config.update(extra)
+    return config
+
+
+def ansatz_config(ansatz: Any, **extra: Any) -> Dict[str, Any]:
+    """Configuration identifying an ansatz's output: class, type map and layer settings."""
+    config: Dict[str, Any] = {'ansatz': type(ansatz).__name__}
+    ob_map = getattr(ansatz, 'ob_map', None)
+    if ob_map is not None:
+        config['ob_map'] = sorted((str(k), str(v)) for k, v in dict(ob_map).items())
+    for attr in ('n_layers', 'n_single_qubit_params', 'max_order', 'discard', 'bond_dim'):
+        if hasattr(ansatz, attr):
+            config[attr] = getattr(ansatz, attr)
+    config.update(extra)
+    return config
+
+
+class LazyParser:
+    """A parser built by ``factory()`` on first use, so fully cached runs never load the model."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._parser: Any = None
+
+    @property
+    def parser(self) -> Any:
+        if self._parser is None:
+            self._parser = self.factory()
+        return self._parser
+
+    def sentences2diagrams(self, sentences: Sequence[str], **kwargs: Any) -> List[Any]:
+        return self.parser.sentences2diagrams(sentences, **kwargs)
+
+    def sentence2diagram(self, sentence: str, **kwargs: Any) -> Any:
+        return self.parser.sentence2diagram(sentence, **kwargs)
+
+
+class ShardedStore:
+    """Append-only ``key -> object`` logs under one directory, one per hash prefix.
+
+    Only an index of ``key -> (offset, length, failed)`` is held in memory;
+    values are read back from the log on ``get``. ``put`` buffers entries and
+    ``flush`` appends just those, so a flush costs O(new entries) however
+    large the store is. A later entry for a key supersedes earlier ones until
+    ``compact`` rewrites the log. A torn frame at the end of a log (an
+    interrupted flush) is ignored and overwritten by the next flush.
+    """
+
+    def __init__(self, directory: PathLike, config: Optional[Dict[str, Any]] = None):
+        self.directory = Path(directory)
+        self.config = config
+        self._index: Dict[str, Dict[str, Slot]] = {}
+        self._ends: Dict[str, int] = {}
+        self._dead: Dict[str, int] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def _shard_id(self, key: str) -> str:
+        return key[:SHARD_PREFIX_CHARS]
+
+    def _shard_path(self, shard_id: str) -> Path:
+        return self.directory / f"shard_{shard_id}.log"
+
+    def _shard(self, shard_id: str) -> Dict[str, Slot]:
+        index = self._index.get(shard_id)
+        if index is None:
+            index = self._index[shard_id] = {}
+            self._scan(shard_id)
+        return index
+
+    def _scan(self, shard_id: str) -> None:
+        index = self._index[shard_id]
+        path = self._shard_path(shard_id)
+        offset = dead = 0
+        if path.exists():
+            size = path.stat().st_size
+            with path.open('rb') as f:
+                while offset + _FRAME.size <= size:
+                    f.seek(offset)
+                    key_len, length = _FRAME.unpack(f.read(_FRAME.size))
+                    start = offset + _FRAME.size + key_len
+                    if start + length > size:
+                        break
+                    key = f.read(key_len).decode('ascii')
+                    failed = length == len(_FAILED_BLOB) and f.read(length) == _FAILED_BLOB
+                    dead += key in index
+                    index[key] = (start, length, failed)
+                    offset = start + length
+        self._ends[shard_id] = offset
+        self._dead[shard_id] = dead
+
+    def _append(self, shard_id: str, entries: Dict[str, Any]) -> None:
+        if not entries:
+            return
+        index = self._index[shard_id]
+        frames = []
+        slots = {}
+        offset = self._ends[shard_id]
+        for key, value in entries.items():
+            failed = is_failed(value)
+            blob = _FAILED_BLOB if failed else pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            raw_key = key.encode('ascii')
+            frames.append(_FRAME.pack(len(raw_key), len(blob)) + raw_key + blob)
+            slots[key] = (offset + _FRAME.size + len(raw_key), len(blob), failed)
+            offset = slots[key][0] + len(blob)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._shard_path(shard_id).open('ab') as f:
+            f.truncate(self._ends[shard_id])
+            f.write(b''.join(frames))
+        self._dead[shard_id] += sum(key in index for key in slots)
+        index.update(slots)
+        self._ends[shard_id] = offset
+
+    def __contains__(self, key: str) -> bool:
+        shard_id = self._shard_id(key)
+        return key in self._pending.get(shard_id, ()) or key in self._shard(shard_id)
+
+    def failed(self, key: str) -> bool:
+        """Whether ``key`` is stored as a parse failure, without reading its value."""
+        shard_id = self._shard_id(key)
+        pending = self._pending.get(shard_id, {})
+        if key in pending:
+            return is_failed(pending[key])
+        slot = self._shard(shard_id).get(key)
+        return slot is not None and slot[2]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        shard_id = self._shard_id(key)
+        pending = self._pending.get(shard_id, {})
+        if key in pending:
+            return pending[key]
+        slot = self._shard(shard_id).get(key)
+        if slot is None:
+            return default
+        if slot[2]:
+            return FAILED
+        with self._shard_path(shard_id).open('rb') as f:
+            f.seek(slot[0])
+            return pickle.loads(f.read(slot[1]))
+
+    def put(self, key: str, value: Any) -> None:
+        self._pending.setdefault(self._shard_id(key), {})[key] = value
+
+    def shard_ids(self) -> List[str]:
+        ids = {p.stem[len('shard_'):] for p in self.directory.glob('shard_*.log')}
+        return sorted(ids | set(self._pending))
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for shard_id in self.shard_ids():
+            index = self._shard(shard_id)
+            pending = self._pending.get(shard_id, {})
+            if index:
+                with self._shard_path(shard_id).open('rb') as f:
+                    for key, (offset, length, failed) in index.items():
+                        if key in pending:
+                            continue
+                        if failed:
+                            yield key, FAILED
+                            continue
+                        f.seek(offset)
+                        yield key, pickle.loads(f.read(length))
+            yield from pending.items()
+
+    def __len__(self) -> int:
+        return sum(len(self._shard(s).keys() | self._pending.get(s, {}).keys()) for s in self.shard_ids())
+
+    def flush(self) -> int:
+        """Append buffered entries to their shard logs; returns how many shards were written."""
+        if not self._pending:
+            return 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.config is not None:
+            (self.directory / 'config.json').write_text(
+                json.dumps(self.config, indent=2, default=str, ensure_ascii=False), encoding='utf-8')
+        for shard_id in sorted(self._pending):
+            self._shard(shard_id)
+            self._append(shard_id, self._pending[shard_id])
+        written = len(self._pending)
+        self._pending.clear()
+        return written
+
+    def compact(self) -> int:
+        """Rewrite the logs holding superseded entries; returns how many were rewritten."""
+        self.flush()
+        rewritten = 0
+        for shard_id in self.shard_ids():
+            index = self._shard(shard_id)
+            if not self._dead[shard_id]:
+                continue
+            path = self._shard_path(shard_id)
+            tmp = path.with_name(path.name + '.tmp')
+            slots = {}
+            offset = 0
+            with path.open('rb') as src, tmp.open('wb') as dst:
+                for key, (start, length, failed) in index.items():
+                    src.seek(start)
+                    raw_key = key.encode('ascii')
+                    dst.write(_FRAME.pack(len(raw_key), length) + raw_key + src.read(length))
+                    slots[key] = (offset + _FRAME.size + len(raw_key), length, failed)
+                    offset = slots[key][0] + length
+            os.replace(tmp, path)
+            self._index[shard_id] = slots
+            self._ends[shard_id] = offset
+            self._dead[shard_id] = 0
+            rewritten += 1
+        return rewritten
+
+
+class DiagramCache:
+    """Parse/ansatz results cached per sentence and configuration."""
+
+    def __init__(self, root: PathLike = DEFAULT_ROOT):
+        self.root = Path(root)
+        self.stats = {'diagram_hits': 0, 'diagram_misses': 0, 'circuit_hits': 0, 'circuit_misses': 0}
+
+    def diagram_store(self, config: Dict[str, Any]) -> ShardedStore:
+        return ShardedStore(self.root / 'diagrams' / config_hash(config), config)
+
+    def circuit_store(self, p_config: Dict[str, Any], a_config: Dict[str, Any]) -> ShardedStore:
+        config = {'parser': p_config, 'ansatz': a_config}
+        return ShardedStore(self.root / 'circuits' / config_hash(config), config)
+
+    def diagrams(
+        self,
+        sentences: Sequence[str],
+        parser: Any,
+        config: Optional[Dict[str, Any]] = None,
+        retry_failed: bool = False,
+        **parse_kwargs: Any,
+    ) -> List[Any]:
+        """``parser.sentences2diagrams`` for ``sentences``, parsing only uncached ones.
+
+        With ``suppress_exceptions=True`` failed parses come back as ``None``
+        and are remembered, so they are not re-parsed on the next run.
+        """
+        store = self.diagram_store(config or parser_config(parser))
+        keys = [sentence_key(s) for s in sentences]
+        todo: Dict[str, str] = {}
+        for key, sentence in zip(keys, sentences):
+            if key not in store or (retry_failed and store.failed(key)):
+                todo.setdefault(key, sentence)
+        self.stats['diagram_hits'] += len(keys) - len(todo)
+        self.stats['diagram_misses'] += len(todo)
+
+        if todo:
+            parsed = parser.sentences2diagrams(list(todo.values()), **parse_kwargs)
+            for key, diagram in zip(todo, parsed):
+                store.put(key, FAILED if diagram is None else diagram)
+            store.flush()
+
+        out = []
+        for key in keys:
+            value = store.get(key)
+            out.append(None if is_failed(value) else value)
+        return out
+
+    def circuits(
+        self,
+        sentences: Sequence[str],
+        diagrams: Sequence[Any],
+        ansatz: Callable[[Any], Any],
+        p_config: Dict[str, Any],
+        a_config: Optional[Dict[str, Any]] = None,
+    ) -> List[Any]:
+        """``ansatz(diagram)`` per sentence, computing only uncached circuits.
+
+        ``p_config`` must be the parser configuration the diagrams came from.
+        """
+        store = self.circuit_store(p_config, a_config or ansatz_config(ansatz))
+        out = []
+        for sentence, diagram in zip(sentences, diagrams):
+            if diagram is None:
+                out.append(None)
+                continue
+            key = sentence_key(sentence)
+            circuit = store.get(key)
+            if circuit is None:
+                circuit = ansatz(diagram)
+                store.put(key, circuit)
+                self.stats['circuit_misses'] += 1
+            else:
+                self.stats['circuit_hits'] += 1
+            out.append(circuit)
+        store.flush()
+        return out
+
+    def parse_and_apply(
+        self,
+        sentences: Sequence[str],
+        parser: Any,
+        ansatz: Callable[[Any], Any],
+        p_config: Optional[Dict[str, Any]] = None,
+        a_config: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Any], List[Any]]:
+        """Cached diagrams and circuits for ``sentences`` in one call."""
+        p_config = p_config or parser_config(parser)
+        diagrams = self.diagrams(sentences, parser, p_config)
+        return diagrams, self.circuits(sentences, diagrams, ansatz, p_config, a_config)
+
+
+def drop_failed(items: Iterable[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """Filter ``zip(circuits, labels, ...)`` rows whose first element failed to parse."""
+    return [row for row in items if row[0] is not None]
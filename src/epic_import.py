@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Epic Import
+Bulk-loads a book (or a whole epic) into ``data/processed/epic_lines.jsonl``
+from a plain-text or TEI XML edition.
+
+Line numbers:
+- plain text: lines are counted from ``--start-line``. A leading number
+  ("12 ἣ μυρί᾽ …") or an editor's trailing marker every few lines ("… ἔθηκε  5")
+  re-aligns the count. Headings such as "BOOK II" or "Liber II" start a new
+  book at line 1
+- TEI: ``<l n="…">`` gives the line number and the enclosing
+  ``<div type="book|textpart" n="…">`` the book. Notes are left out of the text
+
+Meter is scanned with ``src/hexameter.py`` across a process pool in chunks.
+Records are written in batches, one buffered append per batch.
+
+Usage:
+  python src/epic_import.py iliad_01.txt --work Iliad --book 1
+  python src/epic_import.py aeneid.xml --work Aeneid --workers 4 --skip-existing
+"""
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.epic_lines import DEFAULT_PATH, EpicLines  # noqa: E402
+from src.hexameter import detect_language, scan_lines  # noqa: E402
+
+PathLike = Union[str, Path]
+
+TEXT_FIELD = {'greek': 'ancient_greek_text', 'latin': 'latin_text'}
+METER_FIELD = {'greek': 'greek_meter', 'latin': 'latin_meter'}
+WRITE_BATCH = 5000
+SCAN_CHUNK = 1000
+
+_HEADING = re.compile(r'^\s*(?:book|liber|rhapsody|ῥαψῳδία)\s+([ivxlcdm]+|\d+)\b\.?\s*$', re.IGNORECASE)
+_LEADING_NUMBER = re.compile(r'^\s*(\d+)[.)]?\s+(?=\S)')
+_TRAILING_NUMBER = re.compile(r'\s{2,}(\d+)\s*$')
+_ROMAN = {'i': 1, 'v': 5, 'x': 10, 'l': 50, 'c': 100, 'd': 500, 'm': 1000}
+
+
+@dataclass
+class EpicLine:
+    book: Optional[str]
+    line: int
+    text: str
+
+
+def _book_number(token: str) -> str:
+    if token.isdigit():
+        return token
+    total, prev = 0, 0
+    for ch in reversed(token.lower()):
+        value = _ROMAN[ch]
+        total += -value if value < prev else value
+        prev = max(prev, value)
+    return str(total)
+
+
+def read_plain(text: str, book: Optional[str] = None, start_line: int = 1) -> Iterator[EpicLine]:
+    """Numbered verse lines of a plain-text edition."""
+    number = start_line
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        heading = _HEADING.match(raw)
+        if heading:
+            book, number = _book_number(heading.group(1)), 1
+            continue
+        line = raw
+        lead = _LEADING_NUMBER.match(line)
+        if lead:
+            number = int(lead.group(1))
+            line = line[lead.end():]
+        trail = _TRAILING_NUMBER.search(line)
+        if trail:
+            number = int(trail.group(1))  # editor's marker: re-align on this line
+            line = line[:trail.start()]
+        yield EpicLine(book, number, ' '.join(line.split()))
+        number += 1
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _line_text(elem: ET.Element) -> str:
+    parts = [elem.text or '']
+    for child in elem:
+        if _local(child.tag) not in ('note', 'bibl', 'app'):
+            parts.append(_line_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def read_tei(xml: Union[str, bytes], book: Optional[str] = None, start_line: int = 1) -> Iterator[EpicLine]:
+    """Verse lines (``<l>``) of a TEI document, numbered from their ``n`` attributes."""
+    root = ET.fromstring(xml)
+    number = start_line
+
+    def walk(elem: ET.Element, current_book: Optional[str]) -> Iterator[EpicLine]:
+        nonlocal number
+        for child in elem:
+            tag = _local(child.tag)
+            if tag == 'div' and child.get('type') in ('book', 'textpart') and child.get('n'):
+                number = 1
+                yield from walk(child, child.get('n'))
+            elif tag == 'l':
+                n = child.get('n')
+                if n and n.isdigit():
+                    number = int(n)
+                text = ' '.join(_line_text(child).split())
+                if text:
+                    yield EpicLine(current_book, number, text)
+                number += 1
+            elif tag not in ('teiHeader', 'note'):
+                yield from walk(child, current_book)
+
+    yield from walk(root, book)
+
+
+def read_edition(text: str, fmt: str = 'auto', book: Optional[str] = None, start_line: int = 1) -> List[EpicLine]:
+    if fmt == 'auto':
+        head = text.lstrip()[:512]
+        fmt = 'tei' if head.startswith('<') and ('<TEI' in head or '<tei' in head or '<?xml' in head) else 'text'
+    reader = read_tei if fmt == 'tei' else read_plain
+    return list(reader(text, book, start_line))
+
+
+def _scan_chunk(args: Tuple[List[str], str]) -> List[str]:
+    lines, language = args
+    return [r.describe() for r in scan_lines(lines, language)]
+
+
+def scan_meters(texts: List[str], language: str, workers: Optional[int] = None) -> List[str]:
+    """Meter descriptions for ``texts``, scanned in chunks across a process pool (``workers=0``: in-process)."""
+    chunks = [(texts[i:i + SCAN_CHUNK], language) for i in range(0, len(texts), SCAN_CHUNK)]
+    if workers == 0 or len(chunks) <= 1:
+        results = map(_scan_chunk, chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_chunk, chunks))
+    return [meter for chunk in results for meter in chunk]
+
+
+def build_records(lines: List[EpicLine], work: str, language: str, meters: Optional[List[str]]) -> Iterator[Dict[str, Any]]:
+    for i, ln in enumerate(lines):
+        rec: Dict[str, Any] = {'work': work}
+        if ln.book is not None:
+            rec['book'] = ln.book
+        rec['line'] = ln.line
+        rec[TEXT_FIELD[language]] = ln.text
+        if meters is not None:
+            rec[METER_FIELD[language]] = meters[i]
+        yield rec
+
+
+def line_key(rec: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    return rec.get('work'), str(rec.get('book')) if rec.get('book') is not None else None, rec.get('line')
+
+
+def append_batched(path: PathLike, records: Iterable[Dict[str, Any]], batch_size: int = WRITE_BATCH) -> int:
+    """Append records with one buffered write per ``batch_size`` records."""
+    written = 0
+    batch: List[Dict[str, Any]] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            written += jsonl_codec.write_jsonl(path, batch, append=True)
+            batch = []
+    if batch:
+        written += jsonl_codec.write_jsonl(path, batch, append=True)
+    return written
+
+
+def import_text(
+    text: str,
+    work: str,
+    output: PathLike = DEFAULT_PATH,
+    fmt: str = 'auto',
+    language: Optional[str] = None,
+    book: Optional[str] = None,
+    start_line: int = 1,
+    workers: Optional[int] = None,
+    scan: bool = True,
+    skip_existing: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Import an edition's text; returns a summary."""
+    started = time.perf_counter()
+    lines = read_edition(text, fmt, book, start_line)
+    language = language or detect_language(' '.join(ln.text for ln in lines[:20]))
+    skipped = 0
+    if skip_existing and Path(output).exists():
+        store = EpicLines(output)
+        store.refresh()
+        existing = {line_key(r) for r in store.records}
+        before = len(lines)
+        lines = [ln for ln in lines if (work, ln.book, ln.line) not in existing]
+        skipped = before - len(lines)
+    meters = scan_meters([ln.text for ln in lines], language, workers) if scan else None
+    records = build_records(lines, work, language, meters)
+    written = 0 if dry_run else append_batched(output, records)
+    scanned = sum(1 for m in meters if m.startswith('Meter:')) if meters else 0
+    return {
+        'work': work,
+        'language': language,
+        'lines': len(lines),
+        'skipped_existing': skipped,
+        'written': written,
+        'scanned_ok': scanned,
+        'books': sorted({ln.book for ln in lines if ln.book is not None}, key=lambda b: (len(b), b)),
+        'output': str(output),
+        'dry_run': dry_run,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Bulk import an epic edition (plain text or TEI) into epic_lines.jsonl')
+    ap.add_argument('input', help='Plain-text or TEI XML file')
+    ap.add_argument('--work', required=True, help='Work title, e.g. Iliad')
+    ap.add_argument('--format', choices=['auto', 'text', 'tei'], default='auto')
+    ap.add_argument('--language', choices=['greek', 'latin'], help='Detected from the text if omitted')
+    ap.add_argument('--book', help='Book number when the file has no book headings')
+    ap.add_argument('--start-line', type=int, default=1)
+    ap.add_argument('--output', default=str(DEFAULT_PATH))
+    ap.add_argument('--workers', type=int, default=None, help='Meter-scan processes (0 = in-process)')
+    ap.add_argument('--no-scan', action='store_true', help='Skip meter analysis')
+    ap.add_argument('--skip-existing', action='store_true', help='Skip lines already imported (same work/book/line)')
+    ap.add_argument('--dry-run', action='store_true')
+    args = ap.parse_args(argv)
+
+    text = Path(args.input).read_text(encoding='utf-8-sig')
+    summary = import_text(text, args.work, args.output, args.format, args.language, args.book,
+                          args.start_line, args.workers, not args.no_scan, args.skip_existing, args.dry_run)
+    print(f"✅ {summary['work']}: {summary['lines']} lines ({summary['language']}), "
+          f"{summary['written']} written, {summary['scanned_ok']} scanned, "
+          f"{summary['skipped_existing']} skipped in {summary['seconds']}s → {summary['output']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
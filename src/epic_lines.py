@@ -0,0 +1,172 @@
+"""
+Epic Lines Store
+Data layer for ``data/processed/epic_lines.jsonl``, the file behind the Homeric
+Epics Reader.
+
+- ``EpicLines.refresh()`` reads only the bytes appended since the last call,
+  tracking the byte offset of the last complete line. A file that shrank or
+  was replaced is reloaded from the start, and so is one rewritten in place:
+  hashes of the first bytes and of the last line read are checked before the
+  offset is trusted
+- each record's searchable text is folded once, when it is loaded: case and
+  Greek/Latin diacritics are removed, so "μηνιν" finds "μῆνιν"
+- ``filter()`` returns matching record positions and ``page()`` slices
+  them, so a UI renders one page instead of the whole file
+
+The Streamlit app caches one ``EpicLines`` per file (``st.cache_resource``) and
+the filtered positions per ``(size, mtime)`` fingerprint (``st.cache_data``).
+"""
+
+import hashlib
+import os
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src import jsonl_codec
+
+DEFAULT_PATH = Path('data') / 'processed' / 'epic_lines.jsonl'
+TEXT_FIELDS = ('ancient_greek_text', 'latin_text', 'english_translation', 'morpheme_breakdown')
+HEAD_BYTES = 4096
+
+PathLike = Union[str, Path]
+
+
+def fold(text: str) -> str:
+    """Lower-case ``text`` and strip combining marks (accents, breathings, macrons)."""
+    decomposed = unicodedata.normalize('NFD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def file_fingerprint(path: PathLike) -> Tuple[int, int]:
+    """``(size, mtime_ns)``, or ``(0, 0)`` for a missing file; used as a cache key."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+
+class EpicLines:
+    """Records of an epic-lines JSONL file, loaded incrementally."""
+
+    def __init__(self, path: PathLike = DEFAULT_PATH, text_fields: Sequence[str] = TEXT_FIELDS):
+        self.path = Path(path)
+        self.text_fields = tuple(text_fields)
+        self.records: List[Dict[str, Any]] = []
+        self.search_text: List[str] = []
+        self.malformed = 0
+        self.offset = 0
+        self.generation = 0  # bumped on every reload from the start, so derived indexes can rebuild
+        self._inode: Optional[int] = None
+        self._mtime_ns: Optional[int] = None
+        self._last_start = 0  # offset of the last complete line read
+        self._covered: Optional[Tuple[bytes, bytes]] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _reset(self) -> None:
+        self.records, self.search_text = [], []
+        self.malformed = 0
+        self.offset = 0
+        self._last_start = 0
+        self._covered = None
+        self.generation += 1
+
+    def _covered_hashes(self, f) -> Tuple[bytes, bytes]:
+        """Hashes of the file's first bytes and of the last line read, up to ``offset``."""
+        f.seek(0)
+        head = hashlib.sha256(f.read(min(self.offset, HEAD_BYTES))).digest()
+        f.seek(self._last_start)
+        return head, hashlib.sha256(f.read(self.offset - self._last_start)).digest()
+
+    def refresh(self) -> int:
+        """Load lines appended since the last refresh; returns how many records were added."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset()
+                self._inode = None
+            return 0
+        if st.st_ino != self._inode or st.st_size < self.offset:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size == self.offset and st.st_mtime_ns == self._mtime_ns:
+            return 0
+
+        with self.path.open('rb') as f:
+            if self.offset and self._covered_hashes(f) != self._covered:
+                self._reset()  # rewritten in place
+            before = len(self.records)
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial line still being written; picked up next time
+                self._last_start = self.offset
+                self.offset += len(line)
+                if line.strip():
+                    self._add_line(line)
+            if self.offset:
+                self._covered = self._covered_hashes(f)
+        self._mtime_ns = st.st_mtime_ns
+        return len(self.records) - before
+
+    def _add_line(self, line: bytes) -> None:
+        try:
+            rec = jsonl_codec.loads(line)
+        except ValueError:
+            self.malformed += 1
+            return
+        if not isinstance(rec, dict):
+            self.malformed += 1
+            return
+        self.records.append(rec)
+        self.search_text.append(fold(' '.join(str(rec.get(k) or '') for k in self.text_fields)))
+
+    def append(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Append entries to the file and load them; returns the position of the first one."""
+        self.refresh()
+        start = len(self.records)
+        jsonl_codec.write_jsonl(self.path, list(entries), append=True)
+        self.refresh()
+        return start
+
+    def filter(self, query: str = '', where: Optional[Dict[str, Any]] = None,
+               has: Sequence[str] = ()) -> List[int]:
+        """Positions of records matching every criterion.
+
+        ``query``: all words occur in the folded text fields; ``where``: field
+        equals value; ``has``: fields that must be non-empty.
+        """
+        terms = fold(query).split()
+        out = []
+        for i, rec in enumerate(self.records):
+            if terms:
+                text = self.search_text[i]
+                if not all(t in text for t in terms):
+                    continue
+            if where and any(rec.get(k) != v for k, v in where.items()):
+                continue
+            if has and not all(rec.get(k) for k in has):
+                continue
+            out.append(i)
+        return out
+
+    def values(self, field: str) -> List[Any]:
+        """Distinct non-empty values of ``field``, in first-seen order (for filter widgets)."""
+        seen: Dict[Any, None] = {}
+        for rec in self.records:
+            v = rec.get(field)
+            if v not in (None, '') and not isinstance(v, (dict, list)):
+                seen.setdefault(v, None)
+        return list(seen)
+
+    def page(self, positions: Sequence[int], number: int, size: int) -> List[Dict[str, Any]]:
+        """Records on 0-based page ``number`` of ``positions``."""
+        return [self.records[i] for i in positions[number * size:(number + 1) * size]]
+
+
+def page_count(total: int, size: int) -> int:
+    return max(1, -(-total // size))
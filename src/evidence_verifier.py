@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Evidence Verifier
+Scores how well each entry's hetu (reason) and udaharana (example) are
+supported by the passages of the source notes it cites, offline, using the
+notes indexed by ``src/source_notes.py``.
+
+- passages are scored with BM25 (idf over all indexed passages, length
+  normalized by the average passage length). Each note's passage weight
+  vectors are computed once and cached per note fingerprint, so a round
+  citing the same few sources pays for them once
+- a step's support is its best passage score divided by the score of an
+  average-length passage containing every query term once, capped at 1
+- verdicts: ``unresolved`` (no cited URL matches a local note), ``generic``
+  (only bare-domain URLs such as ``https://en.wikipedia.org/``), otherwise
+  ``supported`` (both steps reach the threshold), ``partial`` (one does)
+  or ``unsupported``
+
+Usage:
+  python src/evidence_verifier.py Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl
+  python src/evidence_verifier.py round.jsonl --sources Datasets/sources --threshold 0.25 --output report.jsonl
+"""
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.source_notes import DEFAULT_SOURCES, Note, SourceNotesIndex, terms, urls_in  # noqa: E402
+
+STEP_FIELDS = ('hetu', 'udaharana')
+THRESHOLD = 0.2
+K1, B = 1.5, 0.75
+
+Vector = Dict[str, float]
+
+
+@dataclass
+class Verdict:
+    verdict: str
+    support: Dict[str, float]                 # step field -> support in [0, 1]
+    evidence: Dict[str, Optional[str]]        # step field -> best passage id
+    notes: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def is_generic_url(url: str) -> bool:
+    """A bare domain (no path), e.g. the default Wikipedia link ``enrich_round`` inserts."""
+    return urlparse(url).path.strip('/') == ''
+
+
+class EvidenceVerifier:
+    """BM25 support scores for entries against the notes of a ``SourceNotesIndex``.
+
+    The weight cache assumes the index does not change underneath it; call
+    ``clear()`` after refreshing the index.
+    """
+
+    def __init__(self, index: SourceNotesIndex, fields: Sequence[str] = STEP_FIELDS,
+                 threshold: float = THRESHOLD, k1: float = K1, b: float = B):
+        self.index = index
+        self.fields = tuple(fields)
+        self.threshold = threshold
+        self.k1, self.b = k1, b
+        self._vectors: Dict[str, Tuple[Tuple[int, int], List[Tuple[str, Vector]]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._avg_len = 0.0
+        self.clear()
+
+    def clear(self) -> None:
+        self._vectors.clear()
+        self._idf.clear()
+        lengths = [sum(p.counts.values()) for p in self.index.passages.values()]
+        self._avg_len = (sum(lengths) / len(lengths)) if lengths else 1.0
+
+    def idf(self, term: str) -> float:
+        w = self._idf.get(term)
+        if w is None:
+            n = len(self.index.postings.get(term, ()))
+            w = self._idf[term] = math.log(1 + (len(self.index.passages) - n + 0.5) / (n + 0.5))
+        return w
+
+    def note_vectors(self, note: Note) -> List[Tuple[str, Vector]]:
+        """``(passage id, term -> BM25 weight)`` for each passage of ``note``, cached per fingerprint."""
+        cached = self._vectors.get(note.path)
+        if cached and cached[0] == note.fingerprint:
+            return cached[1]
+        vectors = []
+        for p in note.passages:
+            norm = self.k1 * (1 - self.b + self.b * sum(p.counts.values()) / self._avg_len)
+            vectors.append((p.id, {t: self.idf(t) * tf * (self.k1 + 1) / (tf + norm)
+                                   for t, tf in p.counts.items()}))
+        self._vectors[note.path] = (note.fingerprint, vectors)
+        return vectors
+
+    def support(self, text: str, notes: Sequence[Note]) -> Tuple[float, Optional[str]]:
+        """Best normalized BM25 score of ``text`` over the passages of ``notes``, and that passage."""
+        query = set(terms(text))
+        if not query:
+            return 0.0, None
+        ceiling = sum(self.idf(t) for t in query)
+        best, best_id = 0.0, None
+        for note in notes:
+            for pid, vec in self.note_vectors(note):
+                score = sum(vec.get(t, 0.0) for t in query)
+                if score > best:
+                    best, best_id = score, pid
+        return round(min(best / ceiling, 1.0), 4), best_id
+
+    def verify(self, entry: Dict[str, Any]) -> Verdict:
+        ga = str(entry.get('grounding_authority') or '')
+        urls = urls_in(ga)
+        notes = self.index.resolve(ga)
+        if not notes:
+            generic = bool(urls) and all(is_generic_url(u) for u in urls)
+            return Verdict('generic' if generic else 'unresolved', {}, {}, [])
+
+        support, evidence = {}, {}
+        for f in self.fields:
+            support[f], evidence[f] = self.support(str(entry.get(f) or ''), notes)
+        passed = sum(s >= self.threshold for s in support.values())
+        verdict = 'supported' if passed == len(self.fields) else 'partial' if passed else 'unsupported'
+        return Verdict(verdict, support, evidence, [n.path for n in notes])
+
+    def verify_all(self, entries: Iterable[Dict[str, Any]]) -> List[Verdict]:
+        return [self.verify(e) for e in entries]
+
+
+def summarize(verdicts: Sequence[Verdict]) -> Dict[str, Any]:
+    counts = Counter(v.verdict for v in verdicts)
+    total = len(verdicts)
+    return {
+        'total': total,
+        'verdicts': dict(sorted(counts.items())),
+        'supported_share': round(counts['supported'] / total, 3) if total else 0.0,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('input', help='round or corpus JSONL')
+    p.add_argument('--sources', default=str(DEFAULT_SOURCES))
+    p.add_argument('--threshold', type=float, default=THRESHOLD)
+    p.add_argument('--output', help='write one verdict per entry as JSONL')
+    args = p.parse_args(argv)
+
+    start = time.perf_counter()
+    verifier = EvidenceVerifier(SourceNotesIndex.open(args.sources), threshold=args.threshold)
+    verdicts = verifier.verify_all(jsonl_codec.iter_jsonl(args.input))
+    elapsed = time.perf_counter() - start
+    if args.output:
+        jsonl_codec.write_jsonl(args.output, (v.to_dict() for v in verdicts))
+    summary = summarize(verdicts)
+    print(f"{summary['total']} entries in {elapsed:.2f}s: "
+          + ', '.join(f"{k} {v}" for k, v in summary['verdicts'].items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
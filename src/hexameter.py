@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Hexameter Scanner
+Scans Greek and Latin dactylic hexameter lines.
+
+Each word is analysed once and the analysis is memoized; a line is then
+assembled from its words' analyses. A word's analysis covers its vowel nuclei,
+their quantity by nature, and the consonant clusters between them. From that:
+
+- quantity by nature:
+  - Greek: η/ω and diphthongs are long; ε/ο are short; α/ι/υ are long under
+    a circumflex or iota subscript, or with a macron
+  - Latin: diphthongs (ae, au, oe) are long, as are vowels with a macron. So
+    are open final -o/-i/-u and final -as/-es/-os, apart from a few common
+    exceptions. Everything else is anceps
+- quantity by position: a vowel followed by two consonants, counted across word
+  boundaries, is long. Double consonants (ζ ξ ψ, x z) and Latin intervocalic
+  i count as two. A mute followed by a liquid lengthens optionally
+- Greek correption: a long vowel or diphthong before another vowel may scan
+  short, inside a word or at a word end
+- elision: Latin final vowels and -m before a vowel or h are elided. Greek
+  elision is written (ἀλλ’), so the word simply has no final vowel
+- synizesis: two vowels in hiatus may merge into one long syllable (Greek
+  ε + vowel as in Πηληϊάδεω; Latin e/i/u + vowel as in deinde, abiete)
+
+The line is matched against the 32 dactyl/spondee combinations of the first
+five feet followed by the final – x foot. Readings needing fewer synizeses are
+preferred, then a dactylic fifth foot.
+
+Usage:
+  python src/hexameter.py "Arma virumque cano, Troiae qui primus ab oris"
+  python src/hexameter.py --file data/processed/epic_lines.jsonl --in-place
+"""
+import argparse
+import itertools
+import os
+import sys
+import unicodedata
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+
+PathLike = Union[str, Path]
+
+LONG, SHORT = 'L', 'S'
+ANCEPS: FrozenSet[str] = frozenset((LONG, SHORT))
+IS_LONG: FrozenSet[str] = frozenset((LONG,))
+IS_SHORT: FrozenSet[str] = frozenset((SHORT,))
+
+# Combining marks after NFD decomposition
+CIRCUMFLEX, IOTA_SUBSCRIPT = '͂', 'ͅ'
+MACRON, BREVE, DIAERESIS = '̄', '̆', '̈'
+
+GREEK_VOWELS = set('αεηιουω')
+GREEK_DIPHTHONGS = {'αι', 'αυ', 'ει', 'ευ', 'ηυ', 'οι', 'ου', 'υι', 'ωυ'}
+GREEK_DOUBLE = set('ζξψ')
+GREEK_MUTES, GREEK_LIQUIDS = set('πβφκγχτδθ'), set('λρμν')
+
+LATIN_VOWELS = set('aeiouy')
+LATIN_DIPHTHONGS = {'ae', 'au', 'oe'}
+LATIN_EU_WORDS = {'ceu', 'heu', 'neu', 'seu', 'eheu'}
+LATIN_DOUBLE = set('xz')
+LATIN_MUTES, LATIN_LIQUIDS = set('pbtdcgf'), set('lr')
+LATIN_SHORT_FINALS = {'mihi', 'tibi', 'sibi', 'ibi', 'ubi', 'nisi', 'quasi', 'ego', 'modo', 'cito', 'duo', 'es', 'penes'}
+
+FOOT_SLOTS = {'D': (IS_LONG, IS_SHORT, IS_SHORT), 'S': (IS_LONG, IS_LONG)}
+FOOT_MARKS = {'D': '- u u', 'S': '- -'}
+MAX_SYNIZESES = 2
+
+
+@dataclass(frozen=True)
+class Nucleus:
+    nature: FrozenSet[str]   # quantity by nature
+    after: int               # consonant weight up to the next nucleus / word end
+    mute_liquid: bool        # that cluster is mute + liquid
+    hiatus: bool             # the next nucleus follows with no consonant between
+    merges: bool             # may merge with the next nucleus (synizesis)
+
+
+@dataclass(frozen=True)
+class WordShape:
+    lead: int                # consonant weight before the first nucleus
+    lead_mute_liquid: bool
+    nuclei: Tuple[Nucleus, ...]
+    elidable: bool           # Latin: ends in a vowel or vowel + m
+    vowel_initial: bool      # begins with a vowel (h and breathings ignored)
+
+
+@dataclass
+class ScanResult:
+    text: str
+    language: str
+    feet: Optional[str]      # e.g. 'DDSSD' for the first five feet; None if unscannable
+    syllables: int
+    synizeses: int = 0
+    readings: int = 0        # number of metrically valid readings found
+
+    @property
+    def ok(self) -> bool:
+        return self.feet is not None
+
+    @property
+    def pattern(self) -> Optional[str]:
+        if self.feet is None:
+            return None
+        return ' | '.join([FOOT_MARKS[f] for f in self.feet] + ['- x'])
+
+    def describe(self) -> str:
+        if not self.ok:
+            return f"No hexameter scansion found ({self.syllables} syllables)."
+        extra = f", {self.synizeses} synizesis" if self.synizeses else ''
+        alt = f", {self.readings - 1} alternative reading(s)" if self.readings > 1 else ''
+        return f"Meter: {self.pattern}  ({self.feet}{extra}{alt})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out['pattern'] = self.pattern
+        return out
+
+
+# --- Words -------------------------------------------------------------------
+
+def detect_language(text: str) -> str:
+    for ch in text:
+        if 'Ͱ' <= ch <= 'Ͽ' or 'ἀ' <= ch <= '῿':
+            return 'greek'
+    return 'latin'
+
+
+@lru_cache(maxsize=262144)
+def _letters(word: str) -> Tuple[Tuple[str, str], ...]:
+    """``(base letter, combining marks)`` pairs of a word, lower-cased and decomposed."""
+    out: List[List[str]] = []
+    for ch in unicodedata.normalize('NFD', word.casefold()):
+        if unicodedata.combining(ch):
+            if out:
+                out[-1][1] += ch
+        elif ch.isalpha():
+            out.append([ch, ''])
+    return tuple((b, m) for b, m in out)
+
+
+def _greek_units(letters: Sequence[Tuple[str, str]]) -> List[Tuple]:
+    units: List[Tuple] = []
+    i = 0
+    while i < len(letters):
+        ch, marks = letters[i]
+        if ch in GREEK_VOWELS:
+            nxt = letters[i + 1] if i + 1 < len(letters) else None
+            if nxt and ch + nxt[0] in GREEK_DIPHTHONGS and DIAERESIS not in nxt[1]:
+                units.append(('V', IS_LONG, ch, nxt[1]))
+                i += 2
+                continue
+            if ch in 'ηω' or any(m in marks for m in (CIRCUMFLEX, IOTA_SUBSCRIPT, MACRON)):
+                nature = IS_LONG
+            elif ch in 'εο' or BREVE in marks:
+                nature = IS_SHORT
+            else:
+                nature = ANCEPS
+            units.append(('V', nature, ch, marks))
+        else:
+            units.append(('C', 2 if ch in GREEK_DOUBLE else 1, ch))
+        i += 1
+    return units
+
+
+def _latin_units(letters: Sequence[Tuple[str, str]], word: str) -> List[Tuple]:
+    units: List[Tuple] = []
+    bases = [b for b, _ in letters]
+    i = 0
+    while i < len(letters):
+        ch, marks = letters[i]
+        prev = bases[i - 1] if i else ''
+        nxt = bases[i + 1] if i + 1 < len(bases) else ''
+        nxt_vowel = nxt in LATIN_VOWELS and DIAERESIS not in letters[i + 1][1] if nxt else False
+        if ch == 'u' and (prev == 'q' or (prev == 'g' and i >= 2 and bases[i - 2] == 'n' and nxt_vowel)):
+            i += 1  # qu / ngu: consonantal u, part of the preceding consonant
+            continue
+        if ch in 'ij' and nxt_vowel and (i == 0 or (units and units[-1][0] == 'V')):
+            units.append(('C', 2 if i else 1, 'j'))  # consonantal i: iam, maior
+            i += 1
+            continue
+        if ch in 'uv' and i == 0 and nxt_vowel:
+            units.append(('C', 1, 'v'))
+            i += 1
+            continue
+        if ch == 'v':
+            units.append(('C', 1, 'v'))
+        elif ch in LATIN_VOWELS:
+            pair = ch + nxt
+            if nxt and DIAERESIS not in letters[i + 1][1] and (
+                    pair in LATIN_DIPHTHONGS or (pair == 'eu' and word in LATIN_EU_WORDS)):
+                units.append(('V', IS_LONG, ch, ''))
+                i += 2
+                continue
+            if MACRON in marks:
+                nature = IS_LONG
+            elif BREVE in marks:
+                nature = IS_SHORT
+            else:
+                nature = ANCEPS
+            units.append(('V', nature, ch, marks))
+        elif ch == 'h':
+            pass
+        else:
+            units.append(('C', 2 if ch in LATIN_DOUBLE else 1, ch))
+        i += 1
+    return units
+
+
+def _latin_final_nature(word: str, units: List[Tuple], nature: FrozenSet[str]) -> FrozenSet[str]:
+    if nature is not ANCEPS or word in LATIN_SHORT_FINALS or len([u for u in units if u[0] == 'V']) < 1:
+        return nature
+    last = units[-1]
+    if last[0] == 'V' and last[2] in 'oiu':
+        return IS_LONG
+    if len(units) >= 2 and last[0] == 'C' and last[2] == 's' and units[-2][0] == 'V' and units[-2][2] in 'aeo':
+        return IS_LONG
+    return nature
+
+
+def _is_mute_liquid(cluster: List[str], language: str) -> bool:
+    mutes, liquids = (GREEK_MUTES, GREEK_LIQUIDS) if language == 'greek' else (LATIN_MUTES, LATIN_LIQUIDS)
+    return len(cluster) == 2 and cluster[0] in mutes and cluster[1] in liquids
+
+
+@lru_cache(maxsize=262144)
+def word_shape(word: str, language: str) -> WordShape:
+    """Syllable structure of one word (memoized per word and language)."""
+    letters = _letters(word)
+    plain = ''.join(b for b, _ in letters)
+    units = _greek_units(letters) if language == 'greek' else _latin_units(letters, plain)
+
+    lead_cluster: List[str] = []
+    lead = 0
+    idx = 0
+    while idx < len(units) and units[idx][0] == 'C':
+        lead += units[idx][1]
+        lead_cluster.append(units[idx][2])
+        idx += 1
+
+    vowel_positions = [i for i, u in enumerate(units) if u[0] == 'V']
+    nuclei: List[Nucleus] = []
+    for k, pos in enumerate(vowel_positions):
+        end = vowel_positions[k + 1] if k + 1 < len(vowel_positions) else len(units)
+        cluster = [u[2] for u in units[pos + 1:end]]
+        after = sum(u[1] for u in units[pos + 1:end])
+        nature = units[pos][1]
+        is_last = k + 1 == len(vowel_positions)
+        if language == 'latin' and is_last:
+            nature = _latin_final_nature(plain, units, nature)
+        hiatus = not is_last and end == pos + 1
+        merges = False
+        if hiatus:
+            nxt_marks = units[end][3]
+            vowel = units[pos][2]
+            allowed = 'ε' if language == 'greek' else 'eiu'
+            merges = vowel in allowed and DIAERESIS not in nxt_marks and units[pos][1] is not IS_LONG
+        nuclei.append(Nucleus(nature, after, _is_mute_liquid(cluster, language), hiatus, merges))
+
+    elidable = False
+    if language == 'latin' and units:
+        last = units[-1]
+        elidable = last[0] == 'V' or (last[2] == 'm' and len(units) > 1 and units[-2][0] == 'V')
+    return WordShape(lead, _is_mute_liquid(lead_cluster, language), tuple(nuclei),
+                     elidable, bool(units) and units[0][0] == 'V')
+
+
+@lru_cache(maxsize=262144)
+def _clean_token(raw: str) -> Tuple[str, bool]:
+    """Letters of a whitespace token (punctuation and elision marks dropped) and whether it has a vowel."""
+    word = ''.join(ch for ch in raw if ch.isalpha() or unicodedata.combining(ch))
+    vowels = GREEK_VOWELS | LATIN_VOWELS
+    return word, any(b in vowels for b, _ in _letters(word))
+
+
+def _tokens(text: str) -> List[str]:
+    """Words of a line; vowel-less tokens (δ’, elided clitics) are joined to the next word."""
+    out: List[str] = []
+    carry = ''
+    for raw in text.split():
+        word, has_vowel = _clean_token(raw)
+        if not word:
+            continue
+        if not has_vowel:
+            carry += word
+            continue
+        out.append(carry + word)
+        carry = ''
+    if carry:
+        if out:
+            out[-1] += carry
+        else:
+            out.append(carry)
+    return out
+
+
+# --- Lines -------------------------------------------------------------------
+
+def _syllables(shapes: List[WordShape], language: str) -> Tuple[List[FrozenSet[str]], List[int]]:
+    """Per-syllable quantity options and synizesis merge points for a line."""
+    options: List[FrozenSet[str]] = []
+    merge_points: List[int] = []
+    for w, shape in enumerate(shapes):
+        nxt = shapes[w + 1] if w + 1 < len(shapes) else None
+        nuclei = list(shape.nuclei)
+        if language == 'latin' and nxt is not None and shape.elidable and nxt.vowel_initial and nuclei:
+            nuclei = nuclei[:-1]
+            if not nuclei:
+                continue
+        for k, nuc in enumerate(nuclei):
+            last = k + 1 == len(nuclei)
+            after = nuc.after
+            mute_liquid = nuc.mute_liquid
+            before_vowel = nuc.hiatus
+            if last and nxt is not None:
+                if k + 1 < len(shape.nuclei):  # elided successor: its consonants do not count
+                    after = nuc.after
+                else:
+                    mute_liquid = (nuc.after == 0 and nxt.lead_mute_liquid) or (nuc.mute_liquid and nxt.lead == 0)
+                    after = nuc.after + nxt.lead
+                    before_vowel = nxt.lead == 0
+            if nuc.nature is IS_LONG:
+                q = ANCEPS if language == 'greek' and before_vowel else IS_LONG
+            elif after >= 2:
+                q = ANCEPS if mute_liquid else IS_LONG
+            else:
+                q = nuc.nature
+            if nuc.merges and not last:
+                merge_points.append(len(options))
+            options.append(q)
+    return options, merge_points
+
+
+def _merge(options: List[FrozenSet[str]], points: Sequence[int]) -> List[FrozenSet[str]]:
+    out = list(options)
+    for p in sorted(points, reverse=True):
+        out[p:p + 2] = [IS_LONG]
+    return out
+
+
+@lru_cache(maxsize=None)
+def _patterns(dactyls: int) -> Tuple[str, ...]:
+    """First-five-feet patterns with the given number of dactyls, dactylic fifth foot first."""
+    pats = [''.join(p) for p in itertools.product('DS', repeat=5) if p.count('D') == dactyls]
+    return tuple(sorted(pats, key=lambda p: (p[4] != 'D', p)))
+
+
+def _fits(options: List[FrozenSet[str]], feet: str) -> bool:
+    i = 0
+    for foot in feet:
+        for slot in FOOT_SLOTS[foot]:
+            if not (options[i] & slot):
+                return False
+            i += 1
+    return LONG in options[i]
+
+
+def _match(options: List[FrozenSet[str]]) -> List[str]:
+    dactyls = len(options) - 12
+    if not 0 <= dactyls <= 5:
+        return []
+    return [p for p in _patterns(dactyls) if _fits(options, p)]
+
+
+def scan_line(text: str, language: Optional[str] = None) -> ScanResult:
+    """Scan one hexameter line; ``language`` is 'greek' or 'latin' (detected if omitted)."""
+    language = language or detect_language(text)
+    shapes = [word_shape(w, language) for w in _tokens(text)]
+    options, merge_points = _syllables(shapes, language)
+    for n in range(min(MAX_SYNIZESES, len(merge_points)) + 1):
+        readings = []
+        for points in itertools.combinations(merge_points, n):
+            if any(b - a < 2 for a, b in zip(points, points[1:])):
+                continue  # overlapping merges
+            readings.extend(_match(_merge(options, points)))
+            if readings and n:
+                break
+        if readings:
+            return ScanResult(text, language, readings[0], len(options) - n, n, len(readings))
+    return ScanResult(text, language, None, len(options))
+
+
+def scan_lines(lines: Iterable[str], language: Optional[str] = None) -> List[ScanResult]:
+    """Scan many lines; word analyses are shared through the memo table."""
+    return [scan_line(line, language) for line in lines]
+
+
+# --- Epic-lines records ------------------------------------------------------
+
+TEXT_METER_FIELDS = (('ancient_greek_text', 'greek', 'greek_meter'),
+                     ('latin_text', 'latin', 'latin_meter'))
+
+
+def annotate_record(rec: Dict[str, Any], overwrite: bool = False) -> Dict[str, Any]:
+    """Fill ``greek_meter``/``latin_meter`` of an epic-lines record from its text fields."""
+    for text_field, language, meter_field in TEXT_METER_FIELDS:
+        text = rec.get(text_field)
+        if text and (overwrite or not rec.get(meter_field)):
+            rec[meter_field] = scan_line(text, language).describe()
+    return rec
+
+
+def annotate_records(records: Iterable[Dict[str, Any]], overwrite: bool = False) -> Iterator[Dict[str, Any]]:
+    for rec in records:
+        yield annotate_record(rec, overwrite) if isinstance(rec, dict) else rec
+
+
+def scan_file(path: PathLike, output: Optional[PathLike] = None, overwrite: bool = False) -> Dict[str, Any]:
+    """Annotate every record of an epic-lines JSONL file (in place when ``output`` is None)."""
+    path = Path(path)
+    target = Path(output) if output else path.with_name(path.name + '.tmp')
+    count = jsonl_codec.write_jsonl(target, annotate_records(jsonl_codec.iter_jsonl(path), overwrite))
+    if output is None:
+        os.replace(target, path)
+        target = path
+    info = word_shape.cache_info()
+    return {'records': count, 'output': str(target), 'distinct_words': info.currsize}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Scan Greek/Latin dactylic hexameter')
+    ap.add_argument('line', nargs='*', help='Line(s) to scan')
+    ap.add_argument('--language', choices=['greek', 'latin'])
+    ap.add_argument('--file', help='Epic-lines JSONL to annotate')
+    ap.add_argument('--output', help='Write the annotated file here instead of in place')
+    ap.add_argument('--in-place', action='store_true', help='Rewrite --file in place')
+    ap.add_argument('--overwrite', action='store_true', help='Re-scan records that already have a meter')
+    args = ap.parse_args(argv)
+
+    if args.file:
+        if not (args.output or args.in_place):
+            ap.error('--file needs --output or --in-place')
+        summary = scan_file(args.file, args.output, args.overwrite)
+        print(f"✅ Scanned {summary['records']} records → {summary['output']}")
+        return 0
+    if not args.line:
+        ap.error('give a line to scan or --file')
+    for result in scan_lines(args.line, args.language):
+        print(f"{result.text}\n  {result.describe()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
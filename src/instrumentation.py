@@ -0,0 +1,224 @@
+"""
+Pipeline Instrumentation
+Lightweight spans recording wall time, CPU time, peak RSS, records processed
+and bytes read/written per pipeline stage.
+
+Usage:
+    from src.instrumentation import TRACER, span, traced
+
+    with span('load_corpus', bytes_read=path.stat().st_size) as sp:
+        entries = load(path)
+        sp.records = len(entries)
+
+    @traced('classify')
+    def classify(entries): ...
+
+    TRACER.write_json('trace.json')          # flat span list
+    TRACER.write_chrome_trace('chrome_trace.json')  # chrome://tracing / Perfetto
+
+CPU time is per-thread (``time.thread_time``) so concurrent stages do not count
+each other's work. Peak RSS is the process high-water mark when the span ends;
+it is ``None`` on platforms without ``resource`` or ``psutil``.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource  # type: ignore
+    HAVE_RESOURCE = True
+except ImportError:  # Windows
+    HAVE_RESOURCE = False
+
+try:
+    import psutil  # type: ignore
+    HAVE_PSUTIL = True
+except ImportError:
+    HAVE_PSUTIL = False
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Process peak resident set size in KiB, if the platform exposes it."""
+    if HAVE_RESOURCE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux reports KiB
+        return int(peak / 1024) if sys.platform == 'darwin' else int(peak)
+    if HAVE_PSUTIL:
+        info = psutil.Process().memory_info()
+        return int(getattr(info, 'peak_wset', info.rss) / 1024)
+    return None
+
+
+def file_size(path) -> int:
+    """Size of ``path`` in bytes, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+@dataclass
+class Span:
+    name: str
+    parent: Optional[str] = None
+    start_ts: float = 0.0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_kb: Optional[int] = None
+    records: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    thread_id: int = 0
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def add_records(self, n: int) -> None:
+        self.records += n
+
+    def add_io(self, read: int = 0, written: int = 0) -> None:
+        self.bytes_read += read
+        self.bytes_written += written
+
+
+class Tracer:
+    """Collects finished spans; safe to use from several threads."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.time()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, records: int = 0, bytes_read: int = 0, bytes_written: int = 0, **meta) -> Iterator[Span]:
+        stack = self._stack()
+        sp = Span(
+            name=name,
+            parent=stack[-1].name if stack else None,
+            start_ts=time.time(),
+            records=records,
+            bytes_read=bytes_read,
+            bytes_written=bytes_written,
+            thread_id=threading.get_ident(),
+            meta=dict(meta),
+        )
+        stack.append(sp)
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        try:
+            yield sp
+        except BaseException as e:
+            sp.meta['error'] = repr(e)
+            raise
+        finally:
+            sp.wall_s = time.perf_counter() - wall0
+            sp.cpu_s = time.thread_time() - cpu0
+            sp.peak_rss_kb = peak_rss_kb()
+            stack.pop()
+            with self._lock:
+                self.spans.append(sp)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator form of :meth:`span`; records ``len(result)`` when sized."""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name) as sp:
+                    result = func(*args, **kwargs)
+                    if not sp.records and hasattr(result, '__len__') and not isinstance(result, (str, bytes, dict)):
+                        sp.records = len(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+            self._origin = time.time()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-span profile rows ordered by start time (JSON-serializable)."""
+        with self._lock:
+            spans = list(self.spans)
+        rows = []
+        for sp in sorted(spans, key=lambda s: s.start_ts):
+            row = asdict(sp)
+            row['start_offset_s'] = round(sp.start_ts - self._origin, 6)
+            row['wall_s'] = round(sp.wall_s, 6)
+            row['cpu_s'] = round(sp.cpu_s, 6)
+            del row['start_ts']
+            del row['thread_id']
+            if not row['meta']:
+                del row['meta']
+            rows.append(row)
+        return rows
+
+    def write_json(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'spans': self.summary()}
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding='utf-8')
+        return path
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event format ("X" complete events, microseconds)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for sp in spans:
+            args = {
+                'cpu_s': round(sp.cpu_s, 6),
+                'peak_rss_kb': sp.peak_rss_kb,
+                'records': sp.records,
+                'bytes_read': sp.bytes_read,
+                'bytes_written': sp.bytes_written,
+            }
+            args.update(sp.meta)
+            events.append({
+                'name': sp.name,
+                'cat': 'pipeline',
+                'ph': 'X',
+                'ts': int((sp.start_ts - self._origin) * 1e6),
+                'dur': int(sp.wall_s * 1e6),
+                'pid': pid,
+                'tid': sp.thread_id,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace(), default=str), encoding='utf-8')
+        return path
+
+
+# Process-wide default tracer shared by the pipelines
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
+
+
+def dump_if_requested(prefix: str, tracer: Tracer = TRACER) -> Optional[Path]:
+    """Write ``<prefix>_trace.json`` (and a Chrome trace) into $NYAYA_TRACE_DIR if set."""
+    out_dir = os.environ.get('NYAYA_TRACE_DIR')
+    if not out_dir:
+        return None
+    out = tracer.write_json(Path(out_dir) / f"{prefix}_trace.json")
+    tracer.write_chrome_trace(Path(out_dir) / f"{prefix}_chrome_trace.json")
+    return out
@@ -0,0 +1,306 @@
+"""
+Shared JSONL Codec
+Fast-path JSON Lines reading/writing for every corpus file in the project.
+
+Backends, in order of preference:
+- msgspec: dict decoding plus typed ``NyayaEntry`` decoding with the schema
+  checked inside the decoder
+- orjson: fast dict decoding/encoding
+- json (stdlib): always available
+
+All backends write the same canonical line format: compact separators,
+UTF-8 (no ASCII escaping), one object per line. Force a backend for testing or
+debugging with ``NYAYA_JSON_BACKEND=json|orjson|msgspec``.
+
+Typed records (``read_entries``/``decode_entry``, ``entry_from_dict`` for
+records already decoded) carry the canonical Nyāya schema fields only; use
+``read_jsonl`` when arbitrary metadata must survive a read/write round trip.
+The staging validators check the schema through them, catching
+``SchemaError``.
+"""
+
+import json
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union, get_args, get_origin, get_type_hints
+
+try:
+    import orjson  # type: ignore
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+try:
+    import msgspec  # type: ignore
+    HAVE_MSGSPEC = True
+except ImportError:
+    HAVE_MSGSPEC = False
+
+REQUIRED_FIELDS = ('domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority')
+_BOM = b'\xef\xbb\xbf'
+
+PathLike = Union[str, Path]
+
+
+class SchemaError(ValueError):
+    """A record decoded but does not satisfy the Nyāya entry schema."""
+
+
+def _select_backend() -> str:
+    forced = os.environ.get('NYAYA_JSON_BACKEND', '').strip().lower()
+    available = {'json': True, 'orjson': HAVE_ORJSON, 'msgspec': HAVE_MSGSPEC}
+    if forced:
+        if not available.get(forced):
+            raise RuntimeError(f"NYAYA_JSON_BACKEND={forced} requested but not installed")
+        return forced
+    if HAVE_MSGSPEC:
+        return 'msgspec'
+    if HAVE_ORJSON:
+        return 'orjson'
+    return 'json'
+
+
+BACKEND = _select_backend()
+
+if BACKEND == 'msgspec':
+    _dict_decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+    DecodeError = (msgspec.DecodeError, msgspec.ValidationError)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        return _dict_decoder.decode(data)
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return _encoder.encode(obj)
+elif BACKEND == 'orjson':
+    DecodeError = (orjson.JSONDecodeError,)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+else:
+    DecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    """Compact stdlib JSON with sorted keys, for hashing records.
+
+    Always the stdlib encoder, so a hash does not depend on key order or on the
+    installed backend (msgspec and orjson format floats differently).
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def dumps(obj: Any) -> str:
+    """Canonical single-line JSON text (no trailing newline)."""
+    return _dumps_bytes(obj).decode('utf-8')
+
+
+# --- Typed records ---------------------------------------------------------
+
+if HAVE_MSGSPEC:
+    from typing import Annotated
+
+    NonEmpty = Annotated[str, msgspec.Meta(min_length=1)]
+
+    class NyayaEntry(msgspec.Struct, omit_defaults=True):
+        domain: NonEmpty
+        pratijna: NonEmpty
+        hetu: NonEmpty
+        udaharana: NonEmpty
+        upanaya: NonEmpty
+        nigamana: NonEmpty
+        grounding_authority: NonEmpty
+        id: Optional[str] = None
+        cultural_tradition: Optional[str] = None
+        cultural_traditions: Optional[List[str]] = None
+        label_source: Optional[str] = None
+        batch_id: Optional[str] = None
+        batch_metadata: Optional[Dict[str, Any]] = None
+        staging_status: Optional[str] = None
+        staging_round: Optional[int] = None
+        validation_date: Optional[str] = None
+        dewey_code: Optional[str] = None
+        schema_version: Optional[int] = None
+        complexity_indicators: Any = None
+        cross_references: Any = None
+        notes: Any = None
+        source: Any = None
+
+        def to_dict(self) -> Dict[str, Any]:
+            return {k: v for k, v in msgspec.structs.asdict(self).items() if v is not None}
+
+    _entry_decoder = msgspec.json.Decoder(NyayaEntry)
+
+    def decode_entry(data: Union[str, bytes]) -> 'NyayaEntry':
+        try:
+            return _entry_decoder.decode(data)
+        except msgspec.ValidationError as e:
+            raise SchemaError(str(e)) from e
+
+    def entry_from_dict(obj: Any) -> 'NyayaEntry':
+        try:
+            return msgspec.convert(obj, NyayaEntry)
+        except msgspec.ValidationError as e:
+            raise SchemaError(str(e)) from e
+else:
+    @dataclass
+    class NyayaEntry:  # type: ignore[no-redef]
+        domain: str
+        pratijna: str
+        hetu: str
+        udaharana: str
+        upanaya: str
+        nigamana: str
+        grounding_authority: str
+        id: Optional[str] = None
+        cultural_tradition: Optional[str] = None
+        cultural_traditions: Optional[List[str]] = None
+        label_source: Optional[str] = None
+        batch_id: Optional[str] = None
+        batch_metadata: Optional[Dict[str, Any]] = None
+        staging_status: Optional[str] = None
+        staging_round: Optional[int] = None
+        validation_date: Optional[str] = None
+        dewey_code: Optional[str] = None
+        schema_version: Optional[int] = None
+        complexity_indicators: Any = None
+        cross_references: Any = None
+        notes: Any = None
+        source: Any = None
+
+        def to_dict(self) -> Dict[str, Any]:
+            return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name) is not None}
+
+    _ENTRY_FIELDS = {f.name for f in fields(NyayaEntry)}
+
+    def _matches(value: Any, hint: Any) -> bool:
+        """``value`` has type ``hint`` as msgspec would check it (bool is not an int)."""
+        if hint is Any:
+            return True
+        args = get_args(hint)
+        if type(None) in args:  # Optional[X]
+            return value is None or _matches(value, next(a for a in args if a is not type(None)))
+        origin = get_origin(hint) or hint
+        if origin is int:
+            return isinstance(value, int) and not isinstance(value, bool)
+        if not isinstance(value, origin):
+            return False
+        if origin is list:
+            return all(_matches(v, args[0]) for v in value)
+        if origin is dict:
+            return all(isinstance(k, str) for k in value)
+        return True
+
+    _ENTRY_TYPES = get_type_hints(NyayaEntry)
+
+    def entry_from_dict(obj: Any) -> 'NyayaEntry':
+        if not isinstance(obj, dict):
+            raise SchemaError(f"Expected an object, got {type(obj).__name__}")
+        bad = [k for k in REQUIRED_FIELDS if not isinstance(obj.get(k), str) or not obj[k]]
+        if bad:
+            raise SchemaError(f"Missing or empty required fields: {bad}")
+        # Same field types as the msgspec Struct, so {"id": 123} fails with either backend
+        for k, v in obj.items():
+            if k in _ENTRY_FIELDS and not _matches(v, _ENTRY_TYPES[k]):
+                raise SchemaError(f"Expected `{_ENTRY_TYPES[k]}` for `$.{k}`, got {type(v).__name__}")
+        return NyayaEntry(**{k: v for k, v in obj.items() if k in _ENTRY_FIELDS})
+
+    def decode_entry(data: Union[str, bytes]) -> 'NyayaEntry':
+        return entry_from_dict(loads(data))
+
+
+# --- Files ------------------------------------------------------------------
+
+def _is_compressed(path: PathLike) -> bool:
+    return Path(path).suffix in ('.zst', '.gz')
+
+
+def iter_lines(path: PathLike) -> Iterator[bytes]:
+    """Non-blank raw lines of a JSONL file (BOM stripped).
+
+    ``.jsonl.zst``/``.jsonl.gz`` corpora (see ``src.corpus_store``) are
+    decompressed transparently.
+    """
+    if _is_compressed(path):
+        from src import corpus_store
+        yield from corpus_store.iter_raw_lines(path)
+        return
+    with open(path, 'rb') as f:
+        first = True
+        for raw in f:
+            if first:
+                first = False
+                if raw.startswith(_BOM):
+                    raw = raw[len(_BOM):]
+            if raw.strip():
+                yield raw
+
+
+def iter_jsonl(path: PathLike, errors: str = 'raise') -> Iterator[Any]:
+    """Decode each line; ``errors='skip'`` drops undecodable lines."""
+    for raw in iter_lines(path):
+        try:
+            yield loads(raw)
+        except DecodeError:
+            if errors != 'skip':
+                raise
+
+
+def read_jsonl(path: PathLike, errors: str = 'raise', missing_ok: bool = False) -> List[Any]:
+    if missing_ok and not os.path.exists(path):
+        return []
+    return list(iter_jsonl(path, errors=errors))
+
+
+def read_entries(path: PathLike, errors: str = 'raise', missing_ok: bool = False) -> List[NyayaEntry]:
+    """Typed, schema-validated records; ``errors='skip'`` drops invalid lines."""
+    if missing_ok and not os.path.exists(path):
+        return []
+    entries = []
+    for raw in iter_lines(path):
+        try:
+            entries.append(decode_entry(raw))
+        except ValueError:  # SchemaError and every backend's decode error
+            if errors != 'skip':
+                raise
+    return entries
+
+
+def write_jsonl(path: PathLike, records: Iterable[Any], append: bool = False) -> int:
+    """Write records one per line; returns the number written.
+
+    A ``.zst``/``.gz`` path is written as a framed compressed corpus. A
+    sidecar ``.idx`` line index, if present, is extended or rebuilt.
+    """
+    path = Path(path)
+    if _is_compressed(path):
+        if append:
+            raise ValueError(f"Cannot append to compressed corpus {path}; rewrite it instead")
+        from src import corpus_store
+        return corpus_store.write_compressed(path, records)['records']
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open('ab' if append else 'wb') as f:
+        for rec in records:
+            if hasattr(rec, 'to_dict'):
+                rec = rec.to_dict()
+            f.write(_dumps_bytes(rec) + b'\n')
+            count += 1
+    # Keep an existing line-offset index (src/jsonl_index.py) current
+    if path.with_name(path.name + '.idx').exists():
+        from src import jsonl_index
+        if append:
+            jsonl_index.extend_index(path)
+        else:
+            jsonl_index.build_index(path)
+    return count
@@ -0,0 +1,245 @@
+"""
+JSONL Line-Offset Index
+A sidecar ``<file>.idx`` holding the byte offset, length and ``id`` of every
+record in a JSONL file. With it, record *i* or the record with a given id is
+read straight from an mmap of the file, with no parsing of the lines before it.
+
+Maintenance:
+- ``jsonl_codec.write_jsonl`` keeps an existing index current: appends extend
+  it (O(batch)) and rewrites rebuild it
+- ``JsonlIndex`` builds a missing index on first use, and extends one that
+  falls short of the file (lines appended by other writers). It rebuilds one
+  that no longer matches the file.
+
+Index format: a fixed-width ``# jsonl-index v2`` header recording the file's
+size, mtime_ns and a hash of the last indexed line, then
+``offset<TAB>length<TAB>id`` per non-blank line. A file whose size and mtime
+match the header is current. One that only grew, with the last indexed line
+unchanged, is extended. Anything else (e.g. a rewrite by a writer that
+bypasses the index, even with same-length lines) is rebuilt.
+"""
+
+import hashlib
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src import jsonl_codec
+
+HEADER_PREFIX = '# jsonl-index v2'
+HEADER_LEN = len(f"{HEADER_PREFIX} size={0:020d} mtime={0:020d} last={'0' * 32}\n")
+
+PathLike = Union[str, Path]
+
+
+def index_path(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + '.idx')
+
+
+def _record_id(line: bytes) -> str:
+    try:
+        rec = jsonl_codec.loads(line)
+    except ValueError:
+        return ''
+    rid = rec.get('id') if isinstance(rec, dict) else None
+    if rid in (None, ''):
+        return ''
+    return str(rid).replace('\t', ' ').replace('\n', ' ')
+
+
+def _scan(path: Path, start: int) -> Iterator[Tuple[int, int, str]]:
+    """``(offset, length, id)`` for each non-blank line from byte ``start``."""
+    with path.open('rb') as f:
+        f.seek(start)
+        off = start
+        for line in f:
+            if line.strip():
+                if off == 0 and line.startswith(b'\xef\xbb\xbf'):
+                    yield 3, len(line) - 3, _record_id(line[3:])
+                else:
+                    yield off, len(line), _record_id(line)
+            off += len(line)
+
+
+def _line_hash(path: Path, off: int, length: int) -> str:
+    with path.open('rb') as f:
+        f.seek(off)
+        return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+def _header(path: Path, last: Optional[Tuple[int, int]]) -> str:
+    st = path.stat()
+    digest = _line_hash(path, *last) if last else '0' * 32
+    return f"{HEADER_PREFIX} size={st.st_size:020d} mtime={st.st_mtime_ns:020d} last={digest}\n"
+
+
+def _read_header(idx: Path) -> Optional[Dict[str, Any]]:
+    with idx.open('rb') as f:
+        line = f.readline().decode('utf-8', 'replace')
+    if len(line) != HEADER_LEN or not line.startswith(HEADER_PREFIX + ' '):
+        return None
+    fields = dict(part.split('=', 1) for part in line.split()[3:])
+    try:
+        return {'size': int(fields['size']), 'mtime': int(fields['mtime']), 'last': fields['last']}
+    except (KeyError, ValueError):
+        return None
+
+
+def build_index(path: PathLike) -> int:
+    """(Re)build the sidecar index for ``path``; returns the record count."""
+    path = Path(path)
+    idx = index_path(path)
+    tmp = idx.with_name(idx.name + '.tmp')
+    count = 0
+    last = None
+    with tmp.open('w', encoding='utf-8', newline='\n') as out:
+        out.write(_header(path, None))
+        for off, length, rid in _scan(path, 0):
+            out.write(f"{off}\t{length}\t{rid}\n")
+            last = (off, length)
+            count += 1
+    if last:
+        with tmp.open('r+', encoding='utf-8', newline='\n') as out:
+            out.write(_header(path, last))
+    os.replace(tmp, idx)
+    return count
+
+
+def _last_indexed(idx: Path) -> Optional[Tuple[int, int]]:
+    """``(offset, length)`` of the last record covered by the index."""
+    with idx.open('rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 4096))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        parts = line.split(b'\t')
+        if len(parts) == 3 and parts[0].isdigit():
+            return int(parts[0]), int(parts[1])
+    return None
+
+
+def extend_index(path: PathLike) -> int:
+    """Index lines appended since the index was written; returns how many were added.
+
+    Falls back to a full rebuild when the index does not describe a prefix of the file.
+    """
+    path = Path(path)
+    idx = index_path(path)
+    if not idx.exists():
+        return build_index(path)
+    header = _read_header(idx)
+    st = path.stat()
+    if header and header['size'] == st.st_size and header['mtime'] == st.st_mtime_ns:
+        return 0
+    last = _last_indexed(idx)
+    if (header is None or st.st_size <= header['size']
+            or (header['size'] and not _ends_line(path, header['size']))
+            or (last and _line_hash(path, *last) != header['last'])
+            or (not last and header['last'] != '0' * 32)):
+        return build_index(path)
+    added = 0
+    with idx.open('a', encoding='utf-8', newline='\n') as out:
+        for off, length, rid in _scan(path, header['size']):
+            out.write(f"{off}\t{length}\t{rid}\n")
+            last = (off, length)
+            added += 1
+    with idx.open('r+b') as out:
+        out.write(_header(path, last).encode('utf-8'))
+    return added
+
+
+def _ends_line(path: Path, end: int) -> bool:
+    with path.open('rb') as f:
+        f.seek(end - 1)
+        return f.read(1) == b'\n'
+
+
+class JsonlIndex:
+    """Random access into a JSONL file: ``get(i)``, ``get_by_id(id)``, ``idx[a:b]``."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.idx_path = index_path(self.path)
+        self.offsets = array('q')
+        self.lengths = array('q')
+        self.ids: List[str] = []
+        self._by_id: Optional[Dict[str, int]] = None
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self.refresh()
+
+    def refresh(self) -> 'JsonlIndex':
+        """Bring the index up to date with the file and reload it."""
+        self.close()
+        if not self.idx_path.exists():
+            build_index(self.path)
+        else:
+            extend_index(self.path)
+        offsets, lengths, ids = array('q'), array('q'), []
+        with self.idx_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                off, length, rid = line.rstrip('\n').split('\t', 2)
+                offsets.append(int(off))
+                lengths.append(int(length))
+                ids.append(rid)
+        self.offsets, self.lengths, self.ids = offsets, lengths, ids
+        self._by_id = None
+        return self
+
+    def _map(self) -> Optional[mmap.mmap]:
+        if self._mm is None and self.path.stat().st_size:
+            self._fh = self.path.open('rb')
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self) -> 'JsonlIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def raw(self, i: int) -> bytes:
+        off = self.offsets[i]
+        return self._map()[off:off + self.lengths[i]]
+
+    def get(self, i: int) -> Any:
+        """Record ``i`` (0-based, negative from the end)."""
+        return jsonl_codec.loads(self.raw(i))
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        if isinstance(key, slice):
+            return [self.get(i) for i in range(*key.indices(len(self)))]
+        return self.get(key)
+
+    def position_of(self, rid: str) -> int:
+        """Index of the first record whose ``id`` is ``rid``; KeyError if none."""
+        if self._by_id is None:
+            by_id: Dict[str, int] = {}
+            for i, r in enumerate(self.ids):
+                if r and r not in by_id:
+                    by_id[r] = i
+            self._by_id = by_id
+        return self._by_id[str(rid)]
+
+    def get_by_id(self, rid: str) -> Any:
+        return self.get(self.position_of(rid))
+
+    def page(self, number: int, size: int) -> List[Any]:
+        """Records of 0-based page ``number``."""
+        return self[number * size:(number + 1) * size]
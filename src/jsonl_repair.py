@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL Repair
+Rewrites concatenated / pretty-printed JSON objects (e.g. nyaya_corpus.jsonl,
+or a JSON array export) as canonical one-object-per-line JSONL.
+
+The input is read in fixed-size byte chunks through an incremental UTF-8
+decoder, so memory stays bounded by the chunk size plus the largest object.
+Objects that cannot be parsed are reported with their byte offset; with
+``resync`` enabled the scan skips ahead to the next line starting with ``{``
+and carries on, otherwise it stops at the first broken object.
+
+Usage:
+  python src/jsonl_repair.py nyaya_corpus.jsonl nyaya_corpus_clean.jsonl --resync
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+
+DEFAULT_CHUNK_SIZE = 1 << 20           # 1 MiB
+DEFAULT_MAX_OBJECT_CHARS = 64 << 20    # give up on a single object past 64M chars
+
+_SKIP = re.compile(r'[\s,\[\]]*')      # whitespace, array brackets and separators between objects
+_TOKEN = re.compile(r'[{}"]')
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_RESYNC = re.compile(r'\n(?=\{)')
+
+
+@dataclass
+class BrokenObject:
+    byte_offset: int
+    reason: str
+    snippet: str
+
+
+@dataclass
+class RepairReport:
+    objects_written: int = 0
+    bytes_read: int = 0
+    broken: List[BrokenObject] = field(default_factory=list)
+    stopped_early: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.broken
+
+
+class RepairError(ValueError):
+    """Raised by :func:`iter_objects` in strict mode at the first broken object."""
+
+    def __init__(self, broken: BrokenObject):
+        super().__init__(f"Broken JSON object at byte {broken.byte_offset}: {broken.reason}")
+        self.broken = broken
+
+
+def _object_end(buf: str, pos: int) -> Optional[int]:
+    """Index just past the top-level object starting at ``buf[pos]``, or None if incomplete."""
+    depth = 0
+    i = pos
+    while True:
+        m = _TOKEN.search(buf, i)
+        if not m:
+            return None
+        i = m.end()
+        c = m.group()
+        if c == '"':
+            s = _STRING_TAIL.match(buf, i)
+            if not s:
+                return None
+            i = s.end()
+        elif c == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return i
+
+
+class _ChunkedText:
+    """Text buffer fed from a byte stream, tracking the byte offset of ``buf[0]``."""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+        self.buf = ''
+        self.base_byte = 0
+        self.bytes_read = 0
+        self.eof = False
+        self._head = b''
+
+    def fill(self) -> bool:
+        """Append another chunk; False once the stream is exhausted."""
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        self.bytes_read += len(data)
+        if len(self._head) < len(codecs.BOM_UTF8):
+            # The decoder drops a BOM, so the text starts after it
+            self._head += data[:len(codecs.BOM_UTF8) - len(self._head)]
+            if self._head == codecs.BOM_UTF8:
+                self.base_byte += len(codecs.BOM_UTF8)
+        if not data:
+            self.buf += self.decoder.decode(b'', final=True)
+            self.eof = True
+            return False
+        self.buf += self.decoder.decode(data)
+        return True
+
+    def byte_offset(self, pos: int) -> int:
+        return self.base_byte + len(self.buf[:pos].encode('utf-8'))
+
+    def compact(self, pos: int) -> int:
+        """Drop consumed text once it dominates the buffer; returns the new position."""
+        if pos > self.chunk_size and pos * 2 > len(self.buf):
+            self.base_byte += len(self.buf[:pos].encode('utf-8'))
+            self.buf = self.buf[pos:]
+            return 0
+        return pos
+
+
+def iter_objects(
+    stream: BinaryIO,
+    resync: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_object_chars: int = DEFAULT_MAX_OBJECT_CHARS,
+    report: Optional[RepairReport] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield JSON objects from a concatenated-JSON byte stream.
+
+    Broken objects are appended to ``report.broken``. Without ``resync`` the
+    first one raises :class:`RepairError`.
+    """
+    report = report if report is not None else RepairReport()
+    decoder = json.JSONDecoder()
+    text = _ChunkedText(stream, chunk_size)
+    text.fill()
+    pos = 0
+
+    def broken(at: int, reason: str) -> None:
+        item = BrokenObject(text.byte_offset(at), reason, text.buf[at:at + 120])
+        report.broken.append(item)
+        if not resync:
+            report.stopped_early = True
+            raise RepairError(item)
+
+    def resync_from(at: int) -> Optional[int]:
+        """Position of the next line starting with '{' after ``at`` (reading ahead as needed)."""
+        search_from = at + 1
+        while True:
+            m = _RESYNC.search(text.buf, search_from)
+            if m:
+                return m.end()
+            search_from = max(len(text.buf) - 1, search_from)
+            if not text.fill():
+                return None
+
+    try:
+        while True:
+            pos = text.compact(pos)
+            pos = _SKIP.match(text.buf, pos).end()
+            if pos >= len(text.buf):
+                if text.fill():
+                    continue
+                break
+
+            if text.buf[pos] != '{':
+                broken(pos, 'unexpected data between objects')
+                nxt = resync_from(pos)
+                if nxt is None:
+                    break
+                pos = nxt
+                continue
+
+            # Fast path: a complete, valid object decodes in one C pass
+            try:
+                obj, end = decoder.raw_decode(text.buf, pos)
+            except json.JSONDecodeError as e:
+                end = _object_end(text.buf, pos)
+                if end is None:
+                    # Another object already starts at column 0: this one was never closed
+                    if _RESYNC.search(text.buf, pos + 1):
+                        broken(pos, f'unterminated object: {e.msg}')
+                    elif len(text.buf) - pos > max_object_chars:
+                        broken(pos, f'object exceeds {max_object_chars} characters')
+                    elif text.fill():
+                        continue
+                    else:
+                        broken(pos, 'truncated object at end of input')
+                        break
+                else:
+                    broken(pos, f'invalid JSON: {e.msg}')
+                nxt = resync_from(pos)
+                if nxt is None:
+                    break
+                pos = nxt
+                continue
+
+            pos = end
+            yield obj
+    finally:
+        report.bytes_read = text.bytes_read
+
+
+def repair_file(
+    src: Path,
+    dst: Path,
+    resync: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> RepairReport:
+    """Stream ``src`` into canonical JSONL at ``dst`` (written atomically)."""
+    src, dst = Path(src), Path(dst)
+    report = RepairReport()
+    tmp = dst.with_name(dst.name + '.tmp')
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with src.open('rb') as fin, tmp.open('w', encoding='utf-8', newline='\n') as fout:
+            for obj in iter_objects(fin, resync=resync, chunk_size=chunk_size, report=report):
+                fout.write(jsonl_codec.dumps(obj) + '\n')
+                report.objects_written += 1
+    except RepairError:
+        tmp.unlink(missing_ok=True)
+        return report
+    os.replace(tmp, dst)
+    return report
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Repair concatenated/pretty JSON into strict JSONL')
+    ap.add_argument('input')
+    ap.add_argument('output')
+    ap.add_argument('--resync', action='store_true', help='Skip broken objects and continue at the next "{" line')
+    ap.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = ap.parse_args(argv)
+
+    report = repair_file(Path(args.input), Path(args.output), resync=args.resync, chunk_size=args.chunk_size)
+    print(json.dumps({
+        'input': args.input,
+        'output': args.output if not report.stopped_early else None,
+        'objects_written': report.objects_written,
+        'bytes_read': report.bytes_read,
+        'broken': [b.__dict__ for b in report.broken],
+    }, ensure_ascii=False, indent=2))
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
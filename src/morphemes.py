@@ -0,0 +1,202 @@
+"""
+Morpheme Breakdowns
+Parses the ``morpheme_breakdown`` field of epic-lines records and indexes it.
+
+Format: one entry per word, ``word:morpheme1-morpheme2|translation``. Entries
+are separated by ``;``, newlines or whitespace; a translation runs up to the
+next entry. A morpheme after the first written in uppercase as a case name
+(``NOM``, ``ACC``, ``GEN``, ``DAT``, ``ABL``, ``VOC``) tags the word's case
+explicitly, and ``NOUN``, ``ADJ``, ``PRON`` or ``VERB`` tags its part of
+speech. Otherwise the case is read off the final morpheme with a table of
+Greek and Latin endings, for tokens tagged as nominal or whose final morpheme
+is not also a present-tense verb ending (``cano:can-o`` gets no case;
+``viro:vir-o-NOUN`` gets DAT/ABL). Endings with an iota subscript are read
+before accents are folded, so the dative ``-ῳ`` is not taken for ``-ω``.
+Verbs never get a case. Ambiguous endings give several candidate cases. Case
+names are those of the ``Ty`` wires in ``src/classical_grammar.py`` (see
+``case_type``).
+
+``MorphemeIndex`` is an inverted index from word, lemma (the first morpheme),
+morpheme and case to ``(record position, token position)``. ``update(store)``
+indexes only the records an ``EpicLines`` store loaded since the last update.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.epic_lines import EpicLines, fold
+from src.hexameter import detect_language
+
+CASES = ('NOM', 'ACC', 'GEN', 'DAT', 'ABL', 'VOC')
+NOMINAL_TAGS = ('NOUN', 'ADJ', 'PRON')
+VERBAL_TAGS = ('VERB',)
+
+GREEK_ENDINGS: Dict[str, Tuple[str, ...]] = {
+    'ος': ('NOM', 'GEN'), 'ου': ('GEN',), 'ω': ('DAT',), 'ον': ('ACC', 'NOM'),
+    'ης': ('GEN', 'NOM'), 'ην': ('ACC',), 'αν': ('ACC',), 'ας': ('ACC', 'GEN', 'NOM'), 'α': ('NOM', 'ACC'),
+    'οι': ('NOM',), 'αι': ('NOM',), 'ους': ('ACC',), 'ων': ('GEN',), 'οις': ('DAT',), 'αις': ('DAT',),
+    'ι': ('DAT',), 'ν': ('ACC',), 'ες': ('NOM',), 'σι': ('DAT',), 'σιν': ('DAT',), 'εσσι': ('DAT',),
+    'οιο': ('GEN',), 'φι': ('DAT',),
+}
+LATIN_ENDINGS: Dict[str, Tuple[str, ...]] = {
+    'us': ('NOM',), 'um': ('ACC', 'GEN'), 'i': ('GEN', 'DAT', 'NOM'), 'o': ('DAT', 'ABL'), 'a': ('NOM', 'ABL'),
+    'am': ('ACC',), 'ae': ('GEN', 'DAT', 'NOM'), 'em': ('ACC',), 'is': ('GEN', 'DAT', 'ABL'), 'e': ('ABL', 'VOC'),
+    'orum': ('GEN',), 'arum': ('GEN',), 'ibus': ('DAT', 'ABL'), 'os': ('ACC',), 'as': ('ACC',),
+    'es': ('NOM', 'ACC'), 'ei': ('GEN', 'DAT'), 'u': ('ABL',), 'ium': ('GEN',),
+}
+
+# fold() turns an iota subscript into a full iota (ῳ -> ωι), so endings that
+# carry one are looked up before folding
+SUBSCRIPT_ENDINGS: Dict[str, Tuple[str, ...]] = {'ᾳ': ('DAT',), 'ῃ': ('DAT',), 'ῳ': ('DAT',)}
+
+# Present indicative active singular endings (and the subjunctive -ῃ): a token
+# ending in one of these is only given a case when it is tagged as nominal
+VERBAL_ENDINGS: Dict[str, Tuple[str, ...]] = {
+    'greek': ('ω', 'εις', 'ει', 'ῃ'),
+    'latin': ('o', 'as', 'at', 'es', 'et', 'is', 'it'),
+}
+
+_YPOGEGRAMMENI = '\u0345'
+_ENTRY = re.compile(r'([^\s:;|]+):([^\s:;|]+)(?:\|(.*?))?(?=\s+[^\s:;|]+:|\s*;|\s*\n|\s*$)', re.DOTALL)
+
+
+@dataclass
+class MorphToken:
+    position: int
+    word: str
+    morphemes: List[str]
+    translation: str = ''
+    cases: Tuple[str, ...] = ()
+
+    @property
+    def lemma(self) -> str:
+        return self.morphemes[0] if self.morphemes else self.word
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'position': self.position, 'word': self.word, 'lemma': self.lemma,
+                'morphemes': self.morphemes, 'translation': self.translation, 'cases': list(self.cases)}
+
+
+def _subscript_form(ending: str) -> str:
+    """Lower-case ``ending`` without accents or breathings, keeping an iota subscript."""
+    decomposed = unicodedata.normalize('NFD', ending.lower())
+    kept = ''.join(c for c in decomposed if c == _YPOGEGRAMMENI or not unicodedata.combining(c))
+    return unicodedata.normalize('NFC', kept)
+
+
+def ending_cases(ending: str, language: str) -> Tuple[str, ...]:
+    if language == 'greek' and _subscript_form(ending) in SUBSCRIPT_ENDINGS:
+        return SUBSCRIPT_ENDINGS[_subscript_form(ending)]
+    table = GREEK_ENDINGS if language == 'greek' else LATIN_ENDINGS
+    return table.get(fold(ending), ())
+
+
+def is_verbal_ending(ending: str, language: str) -> bool:
+    endings = VERBAL_ENDINGS['greek' if language == 'greek' else 'latin']
+    if _YPOGEGRAMMENI in unicodedata.normalize('NFD', ending):
+        # The dative -ῳ is not the verb ending -ω
+        return _subscript_form(ending) in endings
+    return fold(ending) in endings
+
+
+def parse_breakdown(text: Optional[str]) -> List[MorphToken]:
+    """Structured tokens of a ``word:m1-m2|translation`` breakdown."""
+    tokens: List[MorphToken] = []
+    if not text:
+        return tokens
+    for m in _ENTRY.finditer(text):
+        word, morph, translation = m.group(1), m.group(2), (m.group(3) or '').strip()
+        parts = [p for p in morph.split('-') if p]
+        # Tags are uppercase and never the first morpheme (gen-us is not a genitive)
+        tagged = [p for p in parts[1:] if p in CASES + NOMINAL_TAGS + VERBAL_TAGS]
+        tags = tuple(p for p in tagged if p in CASES)
+        pos = set(tagged) - set(CASES)
+        morphemes = parts[:1] + [p for p in parts[1:] if p not in tagged]
+        cases: Tuple[str, ...] = ()
+        if tags:
+            cases = tags
+        elif len(morphemes) > 1 and not pos & set(VERBAL_TAGS):
+            language = detect_language(word)
+            if pos & set(NOMINAL_TAGS) or not is_verbal_ending(morphemes[-1], language):
+                cases = ending_cases(morphemes[-1], language)
+        tokens.append(MorphToken(len(tokens), word, morphemes, translation, cases))
+    return tokens
+
+
+def case_type(case: str) -> Any:
+    """The ``classical_grammar`` Ty for a case name (needs lambeq)."""
+    from src import classical_grammar
+    return {
+        'NOM': classical_grammar.Nominative, 'ACC': classical_grammar.Accusative,
+        'GEN': classical_grammar.Genitive, 'DAT': classical_grammar.Dative,
+        'ABL': classical_grammar.Ablative, 'VOC': classical_grammar.Vocative,
+    }[case]
+
+
+Posting = Tuple[int, int]  # (record position, token position)
+
+
+class MorphemeIndex:
+    """Inverted index over the morpheme breakdowns of an epic-lines store."""
+
+    KINDS = ('word', 'lemma', 'morpheme', 'case')
+
+    def __init__(self, field: str = 'morpheme_breakdown'):
+        self.field = field
+        self.postings: Dict[str, Dict[str, List[Posting]]] = {k: defaultdict(list) for k in self.KINDS}
+        self.indexed = 0
+        self.generation: Optional[int] = None
+
+    def clear(self) -> None:
+        self.postings = {k: defaultdict(list) for k in self.KINDS}
+        self.indexed = 0
+
+    def add(self, position: int, record: Dict[str, Any]) -> List[MorphToken]:
+        tokens = parse_breakdown(record.get(self.field))
+        for tok in tokens:
+            posting = (position, tok.position)
+            self.postings['word'][fold(tok.word)].append(posting)
+            self.postings['lemma'][fold(tok.lemma)].append(posting)
+            for morpheme in dict.fromkeys(fold(m) for m in tok.morphemes):
+                self.postings['morpheme'][morpheme].append(posting)
+            for case in tok.cases:
+                self.postings['case'][case].append(posting)
+        return tokens
+
+    def update(self, store: EpicLines) -> int:
+        """Index records loaded since the last update (everything, if the store was reloaded)."""
+        if store.generation != self.generation or len(store.records) < self.indexed:
+            self.clear()
+            self.generation = store.generation
+        start = self.indexed
+        for position in range(start, len(store.records)):
+            self.add(position, store.records[position])
+        self.indexed = len(store.records)
+        return self.indexed - start
+
+    def lookup(self, key: str, kind: str = 'any') -> List[Posting]:
+        """Postings for ``key`` in one index (``word``, ``lemma``, ``morpheme``, ``case``) or all of them."""
+        kinds = self.KINDS if kind == 'any' else (kind,)
+        norm = {k: (key.upper() if k == 'case' else fold(key.strip())) for k in kinds}
+        found: Set[Posting] = set()
+        for k in kinds:
+            found.update(self.postings[k].get(norm[k], ()))
+        return sorted(found)
+
+    def lines_with(self, key: str, kind: str = 'any') -> List[int]:
+        """Record positions containing ``key``."""
+        return sorted({pos for pos, _ in self.lookup(key, kind)})
+
+    def keys(self, kind: str) -> List[str]:
+        return sorted(self.postings[kind])
+
+
+def build_index(records: Iterable[Dict[str, Any]], field: str = 'morpheme_breakdown') -> MorphemeIndex:
+    index = MorphemeIndex(field)
+    for position, rec in enumerate(records):
+        index.add(position, rec)
+        index.indexed = position + 1
+    return index
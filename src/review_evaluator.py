@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Review Evaluator
+The evaluator hook of ``Nyaya_Review_Staging.ipynb``, with a batch interface so
+a whole round is scored before review starts instead of one record per click.
+
+- a scorer is any picklable ``record -> {'score': float, 'feedback': str}``
+  callable. ``length_score`` is the notebook's original placeholder
+- ``RoundEvaluator.stream(records)`` yields ``(record id, result)`` as results
+  complete. Records are scored in chunks across a process pool, or a thread
+  pool for scorers that wait on an external API. The scorer is sent to each
+  worker once
+- results are cached by a hash of the record's content fields plus the
+  scorer's name, in an append-only JSONL file. Unchanged records are never
+  rescored, across sessions too
+- with a ``ledger_path``, each result is appended to the review ledger
+  (``src/review_ledger.py``) as an ``evaluated`` row as it arrives, unless
+  the replayed ledger already holds that evaluation for the record (re-running
+  a round does not re-log cached scores)
+
+Usage:
+  python src/review_evaluator.py Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.review_ledger import ReviewLedger, evaluation_row  # noqa: E402
+
+PathLike = Union[str, Path]
+Scorer = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+REQUIRED_FIELDS = ('domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority')
+IMPROVEMENT_THRESHOLD = 0.5
+IMPROVEMENT_INSTRUCTION = ('Improve the argument; add specificity to grounding_authority; '
+                           'strengthen hetu and examples.')
+CHUNK_SIZE = 64
+
+
+def length_score(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Placeholder evaluator: total length of the required fields, saturating at 2000 characters."""
+    score = min(1.0, sum(len(str(record.get(k, ''))) for k in REQUIRED_FIELDS) / 2000.0)
+    feedback = 'OK' if score >= IMPROVEMENT_THRESHOLD else 'Needs elaboration or authority specificity.'
+    return {'score': score, 'feedback': feedback}
+
+
+def scorer_name(scorer: Scorer) -> str:
+    """Cache namespace of a scorer: its qualified name, plus a ``version`` attribute if it has one."""
+    name = getattr(scorer, '__qualname__', None) or type(scorer).__qualname__
+    version = getattr(scorer, 'version', None)
+    return f"{name}@{version}" if version is not None else name
+
+
+def content_hash(record: Dict[str, Any], fields: Sequence[str] = REQUIRED_FIELDS) -> str:
+    """Hash of the fields a scorer reads; review metadata (status, notes, history) is ignored."""
+    content = {k: ' '.join(str(record.get(k) or '').split()) for k in fields}
+    return hashlib.sha256(jsonl_codec.canonical_bytes(content)).hexdigest()
+
+
+# Worker-side scorer, installed once per worker by the pool initializer
+_worker_scorer: Optional[Scorer] = None
+
+
+def _init_worker(scorer: Scorer) -> None:
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _score_chunk(chunk: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    out = []
+    for key, record in chunk:
+        try:
+            out.append((key, _worker_scorer(record)))
+        except Exception as e:
+            out.append((key, {'score': None, 'feedback': f'Evaluator error: {e}', 'error': True}))
+    return out
+
+
+class ScoreCache:
+    """``content hash -> result`` per scorer, persisted as append-only JSONL."""
+
+    def __init__(self, path: Optional[PathLike] = None):
+        self.path = Path(path) if path else None
+        self.results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if self.path:
+            for row in jsonl_codec.read_jsonl(self.path, errors='skip', missing_ok=True):
+                self.results[(row['scorer'], row['hash'])] = row['result']
+
+    def get(self, scorer: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.results.get((scorer, key))
+
+    def put_many(self, scorer: str, items: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        fresh = [(k, r) for k, r in items if not r.get('error')]
+        for key, result in fresh:
+            self.results[(scorer, key)] = result
+        if self.path and fresh:
+            jsonl_codec.write_jsonl(self.path, ({'scorer': scorer, 'hash': k, 'result': r} for k, r in fresh),
+                                    append=True)
+
+
+class RoundEvaluator:
+    """Scores records with ``scorer`` across a worker pool, through a content-hash cache."""
+
+    def __init__(self, scorer: Scorer = length_score, cache_path: Optional[PathLike] = None,
+                 workers: int = 0, executor: str = 'process', chunk_size: int = CHUNK_SIZE):
+        self.scorer = scorer
+        self.name = scorer_name(scorer)
+        self.cache = ScoreCache(cache_path)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def evaluate(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Score one record in this process (e.g. after an edit)."""
+        key = content_hash(record)
+        cached = self.cache.get(self.name, key)
+        if cached is not None:
+            return cached
+        _init_worker(self.scorer)
+        result = _score_chunk([(key, record)])
+        self.cache.put_many(self.name, result)
+        return result[0][1]
+
+    def _pool(self) -> Executor:
+        if self.executor == 'thread':
+            return ThreadPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.scorer,))
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.scorer,))
+
+    def stream(self, records: Iterable[Dict[str, Any]],
+               ledger_path: Optional[PathLike] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """``(record id, result)`` for every record: cache hits first, then scored chunks as they finish."""
+        ids_by_key: Dict[str, List[str]] = {}
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        hits: List[Tuple[str, Dict[str, Any]]] = []
+        for i, record in enumerate(records):
+            rid = str(record.get('id') or i)
+            key = content_hash(record)
+            cached = self.cache.get(self.name, key)
+            if cached is not None:
+                hits.append((rid, cached))
+            elif key in ids_by_key:
+                ids_by_key[key].append(rid)
+            else:
+                ids_by_key[key] = [rid]
+                pending.append((key, record))
+
+        logged = self._logged_evals(ledger_path)
+        yield from self._emit(hits, ledger_path, logged)
+        if not pending:
+            return
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+        if len(chunks) == 1 or self.workers == 1:
+            _init_worker(self.scorer)
+            for chunk in chunks:
+                yield from self._finish(_score_chunk(chunk), ids_by_key, ledger_path, logged)
+            return
+        with self._pool() as pool:
+            running = {pool.submit(_score_chunk, c) for c in chunks}
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from self._finish(future.result(), ids_by_key, ledger_path, logged)
+
+    def _finish(self, scored, ids_by_key, ledger_path, logged) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        self.cache.put_many(self.name, scored)
+        results = [(rid, result) for key, result in scored for rid in ids_by_key[key]]
+        yield from self._emit(results, ledger_path, logged)
+
+    @staticmethod
+    def _logged_evals(ledger_path: Optional[PathLike]) -> Dict[str, Any]:
+        """``id -> latest evaluation`` already in the ledger."""
+        if not ledger_path:
+            return {}
+        return {rid: e['eval'] for rid, e in ReviewLedger(ledger_path).replay().items()}
+
+    @staticmethod
+    def _emit(results: List[Tuple[str, Dict[str, Any]]], ledger_path,
+              logged: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = [evaluation_row(rid, r) for rid, r in results if logged.get(rid) != r]
+        if ledger_path and rows:
+            jsonl_codec.write_jsonl(ledger_path, rows, append=True)
+        yield from results
+
+    def evaluate_round(self, records: List[Dict[str, Any]],
+                       ledger_path: Optional[PathLike] = None) -> Dict[str, Dict[str, Any]]:
+        """Score every record and store the result under ``record['eval']``; returns ``id -> result``."""
+        results = dict(self.stream(records, ledger_path))
+        for i, record in enumerate(records):
+            record['eval'] = results[str(record.get('id') or i)]
+        return results
+
+
+def needs_improvement(record: Dict[str, Any], threshold: float = IMPROVEMENT_THRESHOLD) -> bool:
+    score = (record.get('eval') or {}).get('score')
+    return record.get('status') == 'disapproved' or score is None or score < threshold
+
+
+def improvement_prompt(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'instruction': IMPROVEMENT_INSTRUCTION,
+        'record': {k: record.get(k) for k in REQUIRED_FIELDS},
+        'feedback': (record.get('eval') or {}).get('feedback', ''),
+        'context_hint': record.get('notes', ''),
+    }
+
+
+def improvement_queue(records: Iterable[Dict[str, Any]],
+                      threshold: float = IMPROVEMENT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Prompts for disapproved or low-scoring records (scores already in ``record['eval']``)."""
+    return [improvement_prompt(r) for r in records if needs_improvement(r, threshold)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('input', help='round JSONL')
+    p.add_argument('--cache', help='score cache JSONL (default: <input dir>/.eval_cache.jsonl)')
+    p.add_argument('--ledger', help='append evaluated rows to this review ledger')
+    p.add_argument('--workers', type=int, default=0)
+    p.add_argument('--executor', choices=('process', 'thread'), default='process')
+    args = p.parse_args(argv)
+
+    records = jsonl_codec.read_jsonl(args.input)
+    cache = args.cache or Path(args.input).parent / '.eval_cache.jsonl'
+    start = time.perf_counter()
+    evaluator = RoundEvaluator(cache_path=cache, workers=args.workers, executor=args.executor)
+    evaluator.evaluate_round(records, args.ledger)
+    queue = improvement_queue(records)
+    print(json.dumps({'records': len(records), 'improvement_queue': len(queue),
+                      'seconds': round(time.perf_counter() - start, 3)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
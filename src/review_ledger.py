@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Review Ledger
+The append-only decision log of ``Nyaya_Review_Staging.ipynb``, with a
+compacted checkpoint so a session resumes without re-reading the whole log.
+
+Ledger rows (one JSON object per line):
+- decisions: ``{id, decision, timestamp, before, after, user}``, where
+  ``decision`` is ``approved``, ``disapproved`` or ``edited`` and ``after`` is
+  the record as it stands after the decision
+- evaluations: ``{id, decision: "evaluated", timestamp, eval, user}``, written
+  by ``src/review_evaluator.py``
+
+Replaying the ledger gives, per id, the latest record, its status (the latest
+decision, ``queued`` if only evaluated) and the latest evaluation.
+
+``<ledger>.checkpoint.jsonl`` holds that state: a header with the ledger
+byte offset it covers, then one ``{id, status, record, eval, timestamp}`` line
+per id in first-seen order. The header also records the ledger's inode and
+mtime and hashes of its first bytes and of the last line the checkpoint
+covers, so a replaced or rewritten ledger is noticed and replayed in full.
+``replay()`` reads the checkpoint and only the ledger bytes after it.
+``compact()`` merges those bytes into the checkpoint, streaming the old
+checkpoint. ``write_approved()`` streams the compacted checkpoint. ``seed()``
+carries a resumed session's replayed state into the new session's ledger.
+
+Usage:
+  python src/review_ledger.py nyaya/runs/review_<ts>/ledger.jsonl --compact
+  python src/review_ledger.py ledger.jsonl --approved Datasets/rounds/staging_round_0001/approved_snapshot_clean.jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+
+PathLike = Union[str, Path]
+
+REQUIRED_FIELDS = ('domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority')
+DECISIONS = ('approved', 'disapproved', 'edited')
+EVALUATED = 'evaluated'
+APPROVED_STATUSES = frozenset(('approved', 'edited'))
+CHECKPOINT_VERSION = 2
+HEAD_BYTES = 4096
+
+
+def decision_row(decision: str, before: Dict[str, Any], after: Optional[Dict[str, Any]] = None,
+                 user: str = 'reviewer') -> Dict[str, Any]:
+    if decision not in DECISIONS:
+        raise ValueError(f"Unknown decision {decision!r}; expected one of {DECISIONS}")
+    rec = after or before
+    return {'id': rec['id'], 'decision': decision, 'timestamp': datetime.utcnow().isoformat(),
+            'before': before, 'after': rec, 'user': user}
+
+
+def evaluation_row(record_id: str, result: Dict[str, Any], user: str = 'evaluator') -> Dict[str, Any]:
+    return {'id': record_id, 'decision': EVALUATED, 'timestamp': datetime.utcnow().isoformat(),
+            'eval': result, 'user': user}
+
+
+def checkpoint_path(ledger: PathLike) -> Path:
+    ledger = Path(ledger)
+    return ledger.with_name(ledger.stem + '.checkpoint.jsonl')
+
+
+def _covered_hashes(path: Path, offset: int) -> Tuple[str, str]:
+    """Hashes of the ledger's first bytes and of the line ending at ``offset``."""
+    with path.open('rb') as f:
+        head = hashlib.sha256(f.read(min(offset, HEAD_BYTES))).hexdigest()
+        start = pos = max(offset - 1, 0)
+        while pos > 0:
+            step = min(HEAD_BYTES, pos)
+            pos -= step
+            f.seek(pos)
+            cut = f.read(step).rfind(b'\n')
+            if cut >= 0:
+                start = pos + cut + 1
+                break
+            start = pos
+        f.seek(start)
+        last = hashlib.sha256(f.read(offset - start)).hexdigest()
+    return head, last
+
+
+def _apply(state: Dict[str, Dict[str, Any]], row: Dict[str, Any]) -> None:
+    """Fold one ledger row into ``id -> {id, status, record, eval, timestamp}``."""
+    rid = row.get('id')
+    decision = row.get('decision')
+    if rid is None or (decision not in DECISIONS and decision != EVALUATED):
+        return
+    entry = state.get(rid)
+    if entry is None:
+        entry = state[rid] = {'id': rid, 'status': 'queued', 'record': None, 'eval': None, 'timestamp': None}
+    entry['timestamp'] = row.get('timestamp')
+    if decision == EVALUATED:
+        entry['eval'] = row.get('eval')
+    else:
+        entry['status'] = decision
+        entry['record'] = row.get('after') or row.get('before')
+
+
+class ReviewLedger:
+    """An append-only review ledger and its compacted checkpoint."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.checkpoint = checkpoint_path(self.path)
+
+    # --- writing -----------------------------------------------------------
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        return jsonl_codec.write_jsonl(self.path, rows, append=True)
+
+    def record_decision(self, decision: str, before: Dict[str, Any],
+                        after: Optional[Dict[str, Any]] = None, user: str = 'reviewer') -> Dict[str, Any]:
+        row = decision_row(decision, before, after, user)
+        self.append([row])
+        return row
+
+    def seed(self, state: Dict[str, Dict[str, Any]], user: str = 'resume') -> int:
+        """Append rows reproducing a replayed ``state`` (e.g. an earlier session's ledger).
+
+        Only fills in what this ledger lacks: an id's decision is seeded if it is
+        still ``queued`` here, its evaluation if it has none. Returns how many
+        rows were appended.
+        """
+        current = self.replay()
+        rows = []
+        for rid, entry in state.items():
+            mine = current.get(rid, {'status': 'queued', 'eval': None})
+            if entry.get('eval') is not None and mine['eval'] is None:
+                rows.append(dict(evaluation_row(rid, entry['eval'], user), timestamp=entry['timestamp']))
+            if entry['status'] in DECISIONS and entry.get('record') and mine['status'] == 'queued':
+                rows.append({'id': rid, 'decision': entry['status'], 'timestamp': entry['timestamp'],
+                             'before': entry['record'], 'after': entry['record'], 'user': user})
+        return self.append(rows) if rows else 0
+
+    # --- reading -----------------------------------------------------------
+
+    def _checkpoint_header(self) -> Optional[Dict[str, Any]]:
+        """The checkpoint header if it still describes a prefix of the ledger."""
+        try:
+            with self.checkpoint.open('rb') as f:
+                header = jsonl_codec.loads(f.readline())
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(header, dict) or header.get('checkpoint') != CHECKPOINT_VERSION:
+            return None
+        offset = header.get('offset', 0)
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_size < offset or st.st_ino != header.get('inode'):
+            return None
+        if st.st_size == offset and st.st_mtime_ns == header.get('mtime_ns'):
+            return header  # untouched since compaction
+        if list(_covered_hashes(self.path, offset)) != [header.get('head'), header.get('last')]:
+            return None
+        return header
+
+    def _iter_checkpoint(self) -> Iterator[Dict[str, Any]]:
+        with self.checkpoint.open('rb') as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield jsonl_codec.loads(line)
+
+    def _tail(self, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows after byte ``offset`` and the offset of the end of the last complete line."""
+        rows = []
+        if not self.path.exists():
+            return rows, offset
+        with self.path.open('rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial line still being written
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    row = jsonl_codec.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(row, dict):
+                    rows.append(row)
+        return rows, offset
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """``id -> {id, status, record, eval, timestamp}``: the checkpoint plus the ledger tail after it."""
+        header = self._checkpoint_header()
+        state: Dict[str, Dict[str, Any]] = {}
+        if header:
+            for entry in self._iter_checkpoint():
+                state[entry['id']] = entry
+        rows, _ = self._tail(header['offset'] if header else 0)
+        for row in rows:
+            _apply(state, row)
+        return state
+
+    def status_index(self) -> Dict[str, str]:
+        return {rid: e['status'] for rid, e in self.replay().items()}
+
+    def status_counts(self) -> Dict[str, int]:
+        return dict(Counter(self.status_index().values()))
+
+    # --- compaction --------------------------------------------------------
+
+    def compact(self) -> Dict[str, int]:
+        """Fold the ledger tail into the checkpoint, streaming the old checkpoint rather than loading it."""
+        header = self._checkpoint_header()
+        start = header['offset'] if header else 0
+        rows, end = self._tail(start)
+        if not self.path.exists() or (header and end == start):
+            return {'applied': 0, 'offset': end}
+
+        # Ids touched by the tail start from their checkpointed state
+        updates: Dict[str, Dict[str, Any]] = {}
+        if header:
+            touched = {r.get('id') for r in rows}
+            for entry in self._iter_checkpoint():
+                if entry['id'] in touched:
+                    updates[entry['id']] = entry
+        for row in rows:
+            _apply(updates, row)
+
+        tmp = self.checkpoint.with_name(self.checkpoint.name + '.tmp')
+        with tmp.open('wb') as f:
+            st = self.path.stat()
+            head, last = _covered_hashes(self.path, end)
+            head = {'checkpoint': CHECKPOINT_VERSION, 'offset': end, 'head': head, 'last': last,
+                    'inode': st.st_ino, 'mtime_ns': st.st_mtime_ns}
+            f.write(jsonl_codec.dumps(head).encode('utf-8') + b'\n')
+            if header:
+                for entry in self._iter_checkpoint():
+                    entry = updates.pop(entry['id'], entry)
+                    f.write(jsonl_codec.dumps(entry).encode('utf-8') + b'\n')
+            for entry in updates.values():
+                f.write(jsonl_codec.dumps(entry).encode('utf-8') + b'\n')
+        os.replace(tmp, self.checkpoint)
+        return {'applied': len(rows), 'offset': end}
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Every entry of the compacted state, streamed from the checkpoint."""
+        self.compact()
+        if self._checkpoint_header():
+            yield from self._iter_checkpoint()
+
+    def write_approved(self, out_path: PathLike, fields: Sequence[str] = REQUIRED_FIELDS) -> int:
+        """Write the approved and edited records' ``fields`` as clean JSONL; returns how many."""
+        approved = (
+            {k: e['record'].get(k) for k in fields}
+            for e in self.iter_entries()
+            if e['status'] in APPROVED_STATUSES and e.get('record')
+        )
+        return jsonl_codec.write_jsonl(out_path, approved)
+
+
+def apply_state(records: List[Dict[str, Any]], state: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace records (matched by id) with their replayed version; evaluations go under ``eval``."""
+    for i, r in enumerate(records):
+        entry = state.get(r.get('id'))
+        if entry is None:
+            continue
+        if entry['record'] is not None:
+            records[i] = r = dict(entry['record'])
+        if entry['eval'] is not None:
+            r['eval'] = entry['eval']
+    return records
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('ledger')
+    p.add_argument('--compact', action='store_true', help='fold the ledger tail into the checkpoint')
+    p.add_argument('--approved', metavar='OUT', help='write the approved snapshot (clean JSONL)')
+    args = p.parse_args(argv)
+
+    ledger = ReviewLedger(args.ledger)
+    if args.compact:
+        print(json.dumps(ledger.compact()))
+    if args.approved:
+        print(f"Wrote {ledger.write_approved(args.approved)} approved record(s) to {args.approved}")
+    print(json.dumps(ledger.status_counts()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
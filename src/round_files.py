@@ -0,0 +1,162 @@
+"""
+Round Files
+The clean JSONL of a staging round is the single source of truth. The pretty
+JSON array next to it is a view generated on demand, or extended in place
+when a batch is appended to a round whose view is already up to date.
+
+The pretty writer produces byte-for-byte the same layout as
+``json.dumps(records, ensure_ascii=False, indent=2)``. This lets a batch be
+appended by rewriting only the closing bracket, so a paste costs O(batch)
+rather than O(round).
+
+Whenever the view is written or extended, ``<pretty>.source.json`` records the
+clean file's size and a hash of its last line. The view is fresh while both
+still match; modification times are not trusted.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src import jsonl_codec
+
+PathLike = Union[str, Path]
+
+_INDENT = '  '
+_TAIL_SCAN = 64
+_LINE_SCAN = 4096
+SOURCE_SUFFIX = '.source.json'
+
+
+def round_paths(rounds_dir: PathLike, round_id: str) -> Tuple[Path, Path]:
+    """``(pretty_path, clean_path)`` for a round."""
+    round_dir = Path(rounds_dir) / round_id
+    return (round_dir / f"nyaya_corpus_{round_id}_pretty.json",
+            round_dir / f"nyaya_corpus_{round_id}_clean.jsonl")
+
+
+def _pretty_item(obj: Any) -> str:
+    text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return _INDENT + text.replace('\n', '\n' + _INDENT)
+
+
+def write_pretty(path: PathLike, records: Iterable[Any]) -> int:
+    """Stream ``records`` into a pretty JSON array (written atomically); returns the count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    count = 0
+    with tmp.open('w', encoding='utf-8', newline='\n') as f:
+        f.write('[')
+        for rec in records:
+            f.write(',\n' if count else '\n')
+            f.write(_pretty_item(rec))
+            count += 1
+        f.write('\n]' if count else ']')
+    os.replace(tmp, path)
+    return count
+
+
+def append_pretty(path: PathLike, records: List[Any]) -> int:
+    """Append ``records`` to an existing pretty array by rewriting only its closing bracket."""
+    path = Path(path)
+    if not records:
+        return 0
+    if not path.exists() or path.stat().st_size == 0:
+        return write_pretty(path, records)
+    with path.open('r+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - _TAIL_SCAN))
+        tail = f.read()
+        stripped = tail.rstrip()
+        if not stripped.endswith(b']'):
+            raise ValueError(f"{path} does not end with a JSON array")
+        body = stripped[:-1].rstrip()
+        empty = body.endswith(b'[')
+        f.seek(size - len(tail) + len(body))
+        f.truncate()
+        items = ',\n'.join(_pretty_item(r) for r in records)
+        f.write((('\n' if empty else ',\n') + items + '\n]').encode('utf-8'))
+    return len(records)
+
+
+def source_path(pretty_path: PathLike) -> Path:
+    pretty_path = Path(pretty_path)
+    return pretty_path.with_name(pretty_path.name + SOURCE_SUFFIX)
+
+
+def clean_fingerprint(clean_path: PathLike) -> Optional[Dict[str, Any]]:
+    """``{size, last}`` of the clean file (``last`` hashes its final line), or ``None`` if it is missing."""
+    try:
+        f = open(clean_path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        start = pos = max(size - 1, 0)  # skip the final newline
+        while pos > 0:
+            step = min(_LINE_SCAN, pos)
+            pos -= step
+            f.seek(pos)
+            cut = f.read(step).rfind(b'\n')
+            if cut >= 0:
+                start = pos + cut + 1
+                break
+            start = pos
+        f.seek(start)
+        return {'size': size, 'last': hashlib.sha256(f.read(size - start)).hexdigest()}
+
+
+def mark_pretty_fresh(pretty_path: PathLike, clean_path: PathLike) -> None:
+    """Record that the pretty view now matches the clean file."""
+    path = source_path(pretty_path)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(clean_fingerprint(clean_path)), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def is_pretty_fresh(pretty_path: PathLike, clean_path: PathLike) -> bool:
+    """True when the clean file still has the size and last line recorded when the view was written."""
+    if not Path(pretty_path).exists():
+        return False
+    try:
+        recorded = json.loads(source_path(pretty_path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return False
+    return recorded is not None and recorded == clean_fingerprint(clean_path)
+
+
+def render_pretty(clean_path: PathLike, pretty_path: PathLike) -> int:
+    count = write_pretty(pretty_path, jsonl_codec.iter_jsonl(clean_path))
+    mark_pretty_fresh(pretty_path, clean_path)
+    return count
+
+
+def ensure_pretty(clean_path: PathLike, pretty_path: PathLike) -> Path:
+    """Regenerate the pretty view only if it is missing or out of date with the clean file."""
+    if not is_pretty_fresh(pretty_path, clean_path):
+        render_pretty(clean_path, pretty_path)
+    return Path(pretty_path)
+
+
+def append_round(pretty_path: PathLike, clean_path: PathLike, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Append a batch to a round: the clean JSONL always, the pretty view when it can stay in sync.
+
+    A view that was already stale (the clean file was edited since it was
+    generated) is left alone and regenerated on demand by ``ensure_pretty``.
+    """
+    new_round = not Path(clean_path).exists()
+    pretty_fresh = is_pretty_fresh(pretty_path, clean_path)
+    jsonl_codec.write_jsonl(clean_path, records, append=True)
+    if new_round:
+        write_pretty(pretty_path, records)
+        pretty_state = 'written'
+    elif pretty_fresh:
+        append_pretty(pretty_path, records)
+        pretty_state = 'appended'
+    else:
+        return {'appended': len(records), 'pretty': 'stale'}
+    mark_pretty_fresh(pretty_path, clean_path)
+    return {'appended': len(records), 'pretty': pretty_state}
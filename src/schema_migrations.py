@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Schema Migrations
+Normalizes corpus records into the canonical Nyāya five-step schema once, at
+ingest, and stamps each record with ``schema_version``.
+
+Record types are registered with a name, a version and a detector. Migrations
+are registered between ``(name, version)`` pairs. A record is migrated along
+the registered chain until it reaches ``CANONICAL``:
+
+- ``syllogism`` v0: ``major_premise``/``minor_premise``/``conclusion`` records
+  (e.g. the Philosophy of Religion batch). They become Nyāya records: the
+  conclusion is the pratijñā and the nigamana, the premises give the hetu.
+  The original premise fields are kept under ``migrated_from``
+- ``nyaya`` v0: five-step records without a ``schema_version``. They are
+  stamped as is
+- ``nyaya`` v1: canonical. Records already carrying
+  ``schema_version == CURRENT_VERSION`` skip detection entirely
+
+``migrate_stream`` works record by record, so files of any size are migrated
+in one pass. Records that match no registered type raise ``SchemaError``, or
+are kept unchanged or dropped with ``errors='keep'``/``'skip'``.
+
+Ingest writers (``paste_to_staging``, ``finalize_round``, the corpus
+importers) migrate before writing, so readers of the staging file and the
+corpus only check ``require_canonical``; a file written before that is
+migrated once with ``--in-place``.
+
+Usage:
+  python src/schema_migrations.py nyaya_corpus_staging.jsonl --in-place
+  python src/schema_migrations.py batch.jsonl --output migrated.jsonl --errors keep
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.jsonl_codec import REQUIRED_FIELDS, SchemaError  # noqa: E402
+
+PathLike = Union[str, Path]
+Record = Dict[str, Any]
+SchemaKey = Tuple[str, int]
+
+VERSION_FIELD = 'schema_version'
+CURRENT_VERSION = 1
+CANONICAL: SchemaKey = ('nyaya', CURRENT_VERSION)
+SYLLOGISM_FIELDS = ('domain', 'major_premise', 'minor_premise', 'conclusion')
+
+NON_WESTERN_CONTEXTS = ('Hindu', 'Buddhist', 'Jain', 'Dharmic', 'Sufi', 'Islamic', 'Chinese')
+
+
+@dataclass(frozen=True)
+class RecordType:
+    name: str
+    version: int
+    detect: Callable[[Record], bool]
+
+    @property
+    def key(self) -> SchemaKey:
+        return (self.name, self.version)
+
+
+# Detection order matters: the first matching type wins
+_TYPES: List[RecordType] = []
+_MIGRATIONS: Dict[SchemaKey, Tuple[SchemaKey, Callable[[Record], Record]]] = {}
+
+
+def register_type(name: str, version: int, detect: Callable[[Record], bool]) -> RecordType:
+    rtype = RecordType(name, version, detect)
+    _TYPES.append(rtype)
+    return rtype
+
+
+def migration(source: SchemaKey, target: SchemaKey):
+    """Register ``func(record) -> record`` as the step from ``source`` to ``target``."""
+    def decorator(func: Callable[[Record], Record]) -> Callable[[Record], Record]:
+        if source in _MIGRATIONS:
+            raise ValueError(f"Migration from {source} already registered")
+        _MIGRATIONS[source] = (target, func)
+        return func
+    return decorator
+
+
+def detect(record: Record) -> Optional[SchemaKey]:
+    """``(name, version)`` of a record, or ``None`` if no registered type matches."""
+    if not isinstance(record, dict):
+        return None
+    for rtype in _TYPES:
+        if rtype.detect(record):
+            return rtype.key
+    return None
+
+
+def is_canonical(record: Any) -> bool:
+    return isinstance(record, dict) and record.get(VERSION_FIELD) == CURRENT_VERSION
+
+
+def migrate(record: Record) -> Record:
+    """The record in the canonical schema (a new dict unless it already was canonical)."""
+    if is_canonical(record):
+        return record
+    key = detect(record)
+    if key is None:
+        raise SchemaError(f"Unrecognized record schema (keys: {sorted(record)[:8] if isinstance(record, dict) else type(record).__name__})")
+    seen = set()
+    while key != CANONICAL:
+        if key in seen or key not in _MIGRATIONS:
+            raise SchemaError(f"No migration path from {key} to {CANONICAL}")
+        seen.add(key)
+        key, step = _MIGRATIONS[key]
+        record = step(record)
+    return record
+
+
+def migrate_stream(records: Iterable[Any], errors: str = 'raise',
+                   stats: Optional[Counter] = None) -> Iterator[Any]:
+    """Migrate records one at a time; ``errors``: ``raise``, ``keep`` (pass through) or ``skip``."""
+    for record in records:
+        if is_canonical(record):
+            if stats is not None:
+                stats['canonical'] += 1
+            yield record
+            continue
+        try:
+            migrated = migrate(record)
+        except SchemaError:
+            if stats is not None:
+                stats['unrecognized'] += 1
+            if errors == 'raise':
+                raise
+            if errors == 'keep':
+                yield record
+            continue
+        if stats is not None:
+            stats['migrated'] += 1
+        yield migrated
+
+
+def require_canonical(records: Iterable[Any], source: Optional[PathLike] = None) -> Iterator[Any]:
+    """Pass canonical records through; raise ``SchemaError`` at the first one that is not."""
+    for n, record in enumerate(records, 1):
+        if not is_canonical(record):
+            where = f"record {n} of {source}" if source else f"record {n}"
+            raise SchemaError(f"{where} is not at schema version {CURRENT_VERSION}; migrate it once with "
+                              f"`python src/schema_migrations.py {source or '<file>'} --in-place`")
+        yield record
+
+
+def migrate_all(records: Iterable[Any], errors: str = 'keep') -> List[Any]:
+    return list(migrate_stream(records, errors))
+
+
+def migrate_file(src: PathLike, dst: Optional[PathLike] = None, errors: str = 'raise') -> Dict[str, int]:
+    """Stream ``src`` into ``dst`` (``src`` itself when omitted, replaced atomically)."""
+    src = Path(src)
+    dst = Path(dst) if dst else src
+    tmp = dst.with_name(dst.name + '.migrating')
+    stats: Counter = Counter()
+    try:
+        jsonl_codec.write_jsonl(tmp, migrate_stream(jsonl_codec.iter_jsonl(src), errors, stats))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, dst)
+    return dict(stats)
+
+
+# --- Registered types ------------------------------------------------------
+
+def _has_all(fields: Sequence[str]) -> Callable[[Record], bool]:
+    return lambda r: all(f in r for f in fields)
+
+
+register_type('nyaya', CURRENT_VERSION, lambda r: r.get(VERSION_FIELD) == CURRENT_VERSION)
+register_type('nyaya', 0, _has_all(REQUIRED_FIELDS))
+register_type('syllogism', 0, _has_all(SYLLOGISM_FIELDS))
+
+
+@migration(('nyaya', 0), CANONICAL)
+def _stamp_nyaya(record: Record) -> Record:
+    return {**record, VERSION_FIELD: CURRENT_VERSION}
+
+
+def _first_clause(text: str, sep: str) -> str:
+    clause = str(text or '').split(sep)[0].strip()
+    return clause[:1].lower() + clause[1:]
+
+
+@migration(('syllogism', 0), ('nyaya', 0))
+def _syllogism_to_nyaya(record: Record) -> Record:
+    """Major/minor premise records as the five Nyāya steps."""
+    contexts = list(record.get('cultural_context') or [])
+    keywords = list(record.get('keywords') or [])
+    structure = str(record.get('logical_structure') or 'the stated inference').replace('_', ' ')
+    conclusion = record['conclusion']
+
+    out = {k: v for k, v in record.items()
+           if k not in SYLLOGISM_FIELDS + ('source_authority', 'logical_structure', 'keywords', 'cultural_context')}
+    out.update({
+        'domain': record['domain'],
+        'pratijna': conclusion,
+        'hetu': f"Because {_first_clause(record['minor_premise'], '.')}, and {_first_clause(record['major_premise'], ',')}.",
+        'udaharana': (f"This parallels how in philosophical discourse, {keywords[0]} demonstrates the relationship between "
+                      f"{keywords[1] if len(keywords) > 1 else 'experience'} and "
+                      f"{'understanding' if 'epistemic' in keywords else 'reality'}.") if keywords
+                     else record['major_premise'],
+        'upanaya': (f"Since {structure} applies here, the reasoning from {contexts[0]} tradition shows the connection."
+                    if contexts else record['minor_premise']),
+        'nigamana': conclusion,
+        'grounding_authority': record.get('source_authority') or record.get('grounding_authority') or '',
+        'migrated_from': {'schema': 'syllogism', **{k: record[k] for k in SYLLOGISM_FIELDS[1:]},
+                          **({'logical_structure': record['logical_structure']} if 'logical_structure' in record else {})},
+    })
+    if contexts and 'cultural_tradition' not in record:
+        non_western = [c for c in contexts if any(t in c for t in NON_WESTERN_CONTEXTS)]
+        out['cultural_tradition'] = 'Non-Western' if len(non_western) >= len(contexts) / 2 else 'Western'
+    if keywords:
+        out.setdefault('complexity_indicators', keywords[:3])
+        out.setdefault('cross_references',
+                       [f"{record['domain'].split('/')[0].strip()} / {kw.title()}" for kw in keywords[:2]])
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('input')
+    out = p.add_mutually_exclusive_group(required=True)
+    out.add_argument('--output')
+    out.add_argument('--in-place', action='store_true')
+    p.add_argument('--errors', choices=('raise', 'keep', 'skip'), default='raise')
+    args = p.parse_args(argv)
+
+    stats = migrate_file(args.input, None if args.in_place else args.output, args.errors)
+    print(stats)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
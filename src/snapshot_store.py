@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Snapshot Store
+Keeps every historical version of the corpus and the approved rounds cheaply.
+Each distinct record is stored once, keyed by a hash of its canonical JSON.
+A snapshot is a manifest of record hashes.
+
+Layout under the store root (``Datasets/store`` by default):
+- ``objects.jsonl.zst`` (``.gz`` without ``zstandard``): append-only pack of
+  distinct records, written as ``src.corpus_store`` frames; each batch of new
+  records is appended as one or more frames, so ``zstd -d``/``gunzip`` still
+  reads it as JSONL
+- ``objects.idx``: ``<hash> <frame offset> <frame length> <line>`` per record
+- ``manifests/<name>.json``: a snapshot, either ``full`` (every hash in order)
+  or ``append`` (parent snapshot + hashes appended after it)
+- ``refs.json``: latest snapshot per ref (e.g. ``nyaya_corpus_clean.jsonl``)
+  plus the size/mtime of the file it describes
+
+A backup of an append-only corpus is therefore an ``append`` manifest holding
+just the new batch, so it costs O(batch) in time and disk. The ref falls back
+to a full manifest whenever the file changed outside the store.
+
+Usage:
+  python src/snapshot_store.py list
+  python src/snapshot_store.py snapshot nyaya_corpus_clean.jsonl --name before_cleanup
+  python src/snapshot_store.py restore before_cleanup restored.jsonl
+  python src/snapshot_store.py diff approved_20250815_staging_round_0001 approved_20250815_staging_round_0002
+  python src/snapshot_store.py log nyaya_corpus_clean.jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import corpus_store, jsonl_codec  # noqa: E402
+
+DEFAULT_ROOT = Path('Datasets') / 'store'
+
+PathLike = Union[str, Path]
+
+
+class SnapshotError(LookupError):
+    """Unknown snapshot, ref or record hash."""
+
+
+def record_hash(record: Any) -> str:
+    """Hash of the record's stdlib JSON with sorted keys (``jsonl_codec.canonical_bytes``).
+
+    Neither key order nor the installed JSON backend changes the hash.
+    """
+    if hasattr(record, 'to_dict'):
+        record = record.to_dict()
+    return hashlib.blake2b(jsonl_codec.canonical_bytes(record), digest_size=16).hexdigest()
+
+
+def file_fingerprint(path: PathLike) -> Optional[Dict[str, Any]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text).strip('_') or 'snapshot'
+
+
+class SnapshotStore:
+    """Record objects stored once by hash; snapshots are manifests of hashes."""
+
+    def __init__(self, root: PathLike = DEFAULT_ROOT):
+        self.root = Path(root)
+        self.pack_path = self._find_pack()
+        self.codec = corpus_store.codec_for(self.pack_path)
+        self.idx_path = self.root / 'objects.idx'
+        self.manifest_dir = self.root / 'manifests'
+        self.refs_path = self.root / 'refs.json'
+        self._index: Optional[Dict[str, tuple]] = None
+        self._frame: Optional[tuple] = None
+
+    def _find_pack(self) -> Path:
+        """The existing pack, whatever codec wrote it, or a new one in the default codec."""
+        for suffix in corpus_store.CODEC_SUFFIXES:
+            path = self.root / f"objects.jsonl{suffix}"
+            if path.exists():
+                return path
+        return self.root / f"objects{corpus_store.default_suffix()}"
+
+    # --- Objects ------------------------------------------------------------
+
+    @property
+    def index(self) -> Dict[str, tuple]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self) -> Dict[str, tuple]:
+        index: Dict[str, tuple] = {}
+        indexed_end = 0
+        if self.idx_path.exists():
+            with self.idx_path.open('r', encoding='ascii') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 4:
+                        off, length, n = int(parts[1]), int(parts[2]), int(parts[3])
+                        index[parts[0]] = (off, length, n)
+                        indexed_end = max(indexed_end, off + length)
+        # Re-index frames appended to the pack after the last index write (e.g. a crash)
+        if self.pack_path.exists() and self.pack_path.stat().st_size > indexed_end:
+            with self.pack_path.open('r+b') as pack, self.idx_path.open('a', encoding='ascii') as idx:
+                pack.seek(indexed_end)
+                end = indexed_end
+                for off, length, lines in corpus_store.split_frames(self.codec, pack.read()):
+                    for n, line in enumerate(lines):
+                        h = record_hash(jsonl_codec.loads(line))
+                        index.setdefault(h, (indexed_end + off, length, n))
+                        idx.write(f"{h} {indexed_end + off} {length} {n}\n")
+                    end = indexed_end + off + length
+                pack.truncate(end)  # drop a frame cut short by an interrupted append
+        return index
+
+    def put_many(self, records: Iterable[Any]) -> List[str]:
+        """Store records not already present; returns the hash of every record in order."""
+        index = self.index
+        hashes: List[str] = []
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.pack_path.open('ab') as pack, self.idx_path.open('a', encoding='ascii') as idx:
+            batch: List[bytes] = []
+            pending: Dict[str, int] = {}
+
+            def flush():
+                off = pack.tell()
+                blob = corpus_store.compress_frame(self.codec, batch)
+                pack.write(blob)
+                pack.flush()
+                for h, n in pending.items():
+                    index[h] = (off, len(blob), n)
+                    idx.write(f"{h} {off} {len(blob)} {n}\n")
+                batch.clear()
+                pending.clear()
+
+            for rec in records:
+                if hasattr(rec, 'to_dict'):
+                    rec = rec.to_dict()
+                h = record_hash(rec)
+                hashes.append(h)
+                if h in index or h in pending:
+                    continue
+                pending[h] = len(batch)
+                batch.append(jsonl_codec._dumps_bytes(rec) + b'\n')
+                if len(batch) >= corpus_store.DEFAULT_RECORDS_PER_FRAME:
+                    flush()
+            if batch:
+                flush()
+        return hashes
+
+    def _frame_lines(self, pack, off: int, length: int) -> List[bytes]:
+        """Raw lines of the frame at ``off``; the last frame read is kept for the next lookup."""
+        if self._frame is None or self._frame[0] != off:
+            pack.seek(off)
+            self._frame = (off, corpus_store.decompress_frame(self.codec, pack.read(length)))
+        return self._frame[1]
+
+    def _locate(self, h: str) -> tuple:
+        try:
+            return self.index[h]
+        except KeyError:
+            raise SnapshotError(f"Unknown record hash {h}")
+
+    def get(self, h: str) -> Any:
+        off, length, n = self._locate(h)
+        with self.pack_path.open('rb') as pack:
+            return jsonl_codec.loads(self._frame_lines(pack, off, length)[n])
+
+    def iter_objects(self, hashes: Iterable[str]) -> Iterator[Any]:
+        with self.pack_path.open('rb') as pack:
+            for h in hashes:
+                off, length, n = self._locate(h)
+                yield jsonl_codec.loads(self._frame_lines(pack, off, length)[n])
+
+    # --- Manifests ----------------------------------------------------------
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.manifest_dir / f"{name}.json"
+
+    def manifest(self, name: str) -> Dict[str, Any]:
+        path = self._manifest_path(name)
+        if not path.exists():
+            raise SnapshotError(f"Unknown snapshot {name}")
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        path = self._manifest_path(manifest['name'])
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, path)
+        return manifest
+
+    def _new_name(self, base: str) -> str:
+        name = _safe_name(base)
+        n = 1
+        candidate = name
+        while self._manifest_path(candidate).exists():
+            n += 1
+            candidate = f"{name}_{n}"
+        return candidate
+
+    def snapshot(self, name: str, records: Iterable[Any], parent: Optional[str] = None,
+                 ref: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Store ``records`` and write a manifest.
+
+        With ``parent`` the manifest only lists the appended records.
+        """
+        if parent is not None:
+            base_count = self.manifest(parent)['count']
+        hashes = self.put_many(records)
+        manifest = {
+            'name': self._new_name(name),
+            'created': datetime.now().isoformat(),
+            'kind': 'append' if parent is not None else 'full',
+            'parent': parent,
+            'ref': ref,
+            'count': (base_count if parent is not None else 0) + len(hashes),
+            'meta': meta or {},
+            'hashes': hashes,
+        }
+        return self._write_manifest(manifest)
+
+    def hashes(self, name: str) -> List[str]:
+        """Every record hash of a snapshot, in order, resolving ``append`` chains."""
+        chain = []
+        manifest = self.manifest(name)
+        while True:
+            chain.append(manifest['hashes'])
+            if manifest['kind'] != 'append':
+                break
+            manifest = self.manifest(manifest['parent'])
+        out: List[str] = []
+        for part in reversed(chain):
+            out.extend(part)
+        return out
+
+    def iter_records(self, name: str) -> Iterator[Any]:
+        return self.iter_objects(self.hashes(name))
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        if not self.manifest_dir.exists():
+            return []
+        out = []
+        for path in self.manifest_dir.glob('*.json'):
+            m = json.loads(path.read_text(encoding='utf-8'))
+            m.pop('hashes', None)
+            out.append(m)
+        return sorted(out, key=lambda m: m['created'])
+
+    def restore(self, name: str, dst: PathLike) -> int:
+        """Write a snapshot's records to ``dst`` (plain or compressed JSONL)."""
+        dst = Path(dst)
+        if corpus_store.is_compressed(dst):  # already written atomically
+            return corpus_store.write_compressed(dst, self.iter_records(name))['records']
+        tmp = dst.with_name(dst.name + '.tmp')
+        count = jsonl_codec.write_jsonl(tmp, self.iter_records(name))
+        os.replace(tmp, dst)
+        return count
+
+    def diff(self, a: str, b: str) -> Dict[str, Any]:
+        """Records added/removed going from snapshot ``a`` to ``b``.
+
+        Records whose ``id`` appears on both sides with different content are
+        reported as modified instead.
+        """
+        ca, cb = Counter(self.hashes(a)), Counter(self.hashes(b))
+        removed = list((ca - cb).elements())
+        added = list((cb - ca).elements())
+
+        def by_id(hashes):
+            ids = {}
+            for h, rec in zip(hashes, self.iter_objects(hashes)):
+                rid = rec.get('id') if isinstance(rec, dict) else None
+                if rid:
+                    ids[str(rid)] = h
+            return ids
+
+        old_ids, new_ids = by_id(removed), by_id(added)
+        modified = sorted(set(old_ids) & set(new_ids))
+        changed = {old_ids[i] for i in modified} | {new_ids[i] for i in modified}
+        return {
+            'from': a,
+            'to': b,
+            'added': [h for h in added if h not in changed],
+            'removed': [h for h in removed if h not in changed],
+            'modified': [{'id': i, 'from': old_ids[i], 'to': new_ids[i]} for i in modified],
+            'unchanged': sum((ca & cb).values()),
+        }
+
+    # --- Refs ---------------------------------------------------------------
+
+    def _refs(self) -> Dict[str, Any]:
+        if not self.refs_path.exists():
+            return {}
+        return json.loads(self.refs_path.read_text(encoding='utf-8'))
+
+    def _set_ref(self, ref: str, name: str, source: Optional[PathLike]) -> None:
+        refs = self._refs()
+        refs[ref] = {'head': name, 'source': file_fingerprint(source) if source else None,
+                     'updated': datetime.now().isoformat()}
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.refs_path.with_name(self.refs_path.name + '.tmp')
+        tmp.write_text(json.dumps(refs, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.refs_path)
+
+    def head(self, ref: str) -> Optional[str]:
+        entry = self._refs().get(ref)
+        return entry['head'] if entry else None
+
+    def log(self, ref: str) -> List[Dict[str, Any]]:
+        """Snapshots recorded for ``ref``, oldest first."""
+        return [m for m in self.list_snapshots() if m.get('ref') == ref]
+
+    def backup_file(self, path: PathLike, records: Optional[Iterable[Any]] = None,
+                    ref: Optional[str] = None) -> str:
+        """Make sure the current contents of ``path`` are stored; returns the snapshot name.
+
+        A no-op when the ref's head already describes the file unchanged.
+        ``records`` (the file's already-loaded contents) avoids re-reading it.
+        """
+        ref = ref or Path(path).name
+        entry = self._refs().get(ref)
+        if entry and entry.get('source') == file_fingerprint(path):
+            return entry['head']
+        if records is None:
+            records = jsonl_codec.iter_jsonl(path, errors='skip') if os.path.exists(path) else []
+        manifest = self.snapshot(f"{ref}_{datetime.now().strftime('%Y%m%d_%H%M%S')}", records,
+                                 ref=ref, meta={'source': str(path)})
+        self._set_ref(ref, manifest['name'], path)
+        return manifest['name']
+
+    def record_append(self, path: PathLike, appended: Iterable[Any], parent: str,
+                      ref: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> str:
+        """Record that ``appended`` was added to ``path`` after snapshot ``parent``.
+
+        Call after the file has been written so its new size/mtime are tracked.
+        """
+        ref = ref or Path(path).name
+        manifest = self.snapshot(f"{ref}_{datetime.now().strftime('%Y%m%d_%H%M%S')}", appended,
+                                 parent=parent, ref=ref, meta=dict(meta or {}, source=str(path)))
+        self._set_ref(ref, manifest['name'], path)
+        return manifest['name']
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Content-addressed corpus snapshots')
+    ap.add_argument('--root', default=str(DEFAULT_ROOT), help='Store directory')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('list', help='List snapshots')
+    p = sub.add_parser('snapshot', help='Snapshot a JSONL file')
+    p.add_argument('file')
+    p.add_argument('--name')
+    p.add_argument('--ref', help='Track the snapshot as the head of this ref')
+    p = sub.add_parser('restore', help='Write a snapshot back out as JSONL')
+    p.add_argument('name')
+    p.add_argument('output')
+    p = sub.add_parser('diff', help='Compare two snapshots')
+    p.add_argument('a')
+    p.add_argument('b')
+    p.add_argument('--hashes', action='store_true', help='List the differing hashes')
+    p = sub.add_parser('log', help='Snapshots of a ref, oldest first')
+    p.add_argument('ref')
+    args = ap.parse_args(argv)
+
+    store = SnapshotStore(args.root)
+    try:
+        if args.cmd == 'list':
+            for m in store.list_snapshots():
+                print(f"{m['name']}\t{m['kind']}\t{m['count']}\t{m['created']}")
+        elif args.cmd == 'snapshot':
+            if args.ref:
+                name = store.backup_file(args.file, ref=args.ref)
+            else:
+                name = store.snapshot(args.name or Path(args.file).name,
+                                      jsonl_codec.iter_jsonl(args.file), meta={'source': args.file})['name']
+            print(f"📸 Snapshot: {name}")
+        elif args.cmd == 'restore':
+            count = store.restore(args.name, args.output)
+            print(f"✅ Restored {count} records from {args.name} to {args.output}")
+        elif args.cmd == 'diff':
+            d = store.diff(args.a, args.b)
+            print(f"{args.a} → {args.b}: +{len(d['added'])} -{len(d['removed'])} "
+                  f"~{len(d['modified'])} ={d['unchanged']}")
+            if args.hashes:
+                print(json.dumps(d, indent=2, ensure_ascii=False))
+        elif args.cmd == 'log':
+            for m in store.log(args.ref):
+                print(f"{m['name']}\t{m['kind']}\t{m['count']}\t{m['created']}")
+    except SnapshotError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
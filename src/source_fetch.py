@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Source Fetch
+Batch fetcher for the research notes under ``Datasets/sources/<provider>/``.
+
+- pages are fetched by a bounded thread pool over one pooled session
+  (``requests.Session`` when installed, a stdlib ``urllib`` stand-in otherwise)
+- ``HttpCache`` keeps each response body on disk with its ``ETag`` and
+  ``Last-Modified``. Later fetches send ``If-None-Match``/``If-Modified-Since``
+  and a 304 reuses the stored body. When the network fails, the stored body is
+  used and the result is marked ``stale``
+- extracted text is cached next to the body, keyed by the body's hash. Only new
+  or changed pages are extracted, in a process pool. Extraction uses
+  readability and BeautifulSoup when installed, with a stdlib ``html.parser``
+  fallback
+- a note is written only when a page changed or no note exists yet for its
+  ``(provider, slug)``. Hand-written notes are never overwritten
+
+Manifests are CSV (``url,provider,slug`` header) or JSONL rows with the same
+keys. ``--refresh`` builds the manifest from the headers of the notes already
+under a sources directory.
+
+Usage:
+  python src/source_fetch.py --manifest sources.csv --outdir Datasets/sources
+  python src/source_fetch.py --refresh Datasets/sources --workers 16
+"""
+import argparse
+import csv
+import datetime as dt
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+    HAVE_REQUESTS = True
+except ImportError:
+    HAVE_REQUESTS = False
+
+try:
+    from bs4 import BeautifulSoup  # type: ignore
+    HAVE_BS4 = True
+except ImportError:
+    HAVE_BS4 = False
+
+try:
+    from readability import Document  # type: ignore
+    HAVE_READABILITY = True
+except Exception:
+    HAVE_READABILITY = False
+
+PathLike = Union[str, Path]
+
+UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+DEFAULT_CACHE = Path('Datasets') / 'sources' / '.http_cache'
+EXTRACTED_MARKER = "--- Extracted text (best-effort) ---"
+TIMEOUT = 30
+
+_CHARSET = re.compile(r'charset=["\']?([\w.-]+)', re.IGNORECASE)
+_NOTE_NAME = re.compile(r'^(?P<slug>.+)_(?P<provider>[a-z0-9-]+)_(?P<date>\d{8})$')
+
+
+@dataclass
+class NoteData:
+    provider: str
+    slug: str
+    url: str
+    title: str
+    text: str
+
+
+@dataclass
+class ManifestRow:
+    url: str
+    provider: str
+    slug: str
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: str                   # fetched | not_modified | stale | error
+    body: Optional[bytes] = None
+    charset: str = 'utf-8'
+    changed: bool = False         # body differs from the previously cached one
+    error: Optional[str] = None
+
+    @property
+    def html(self) -> str:
+        return (self.body or b'').decode(self.charset, errors='replace')
+
+
+def sanitize_filename(name: str) -> str:
+    name = name.lower().strip()
+    name = re.sub(r"[^a-z0-9\-]+", "-", name)
+    name = re.sub(r"-+", "-", name).strip("-")
+    return name or "source"
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Sessions and the HTTP cache
+# ---------------------------------------------------------------------------
+
+class _UrllibResponse:
+    def __init__(self, status_code: int, headers: Any, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class _UrllibSession:
+    """The subset of ``requests.Session`` used here, on top of ``urllib``."""
+
+    def __init__(self):
+        self.headers: Dict[str, str] = {'User-Agent': UA}
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = TIMEOUT):
+        req = urllib.request.Request(url, headers={**self.headers, **(headers or {})})
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return _UrllibResponse(resp.status, resp.headers, resp.read())
+        except urllib.error.HTTPError as e:
+            return _UrllibResponse(e.code, e.headers, e.read() or b'')
+
+    def close(self) -> None:
+        pass
+
+
+def make_session(pool_size: int = 8) -> Any:
+    """A session whose connection pool holds ``pool_size`` connections per host."""
+    if not HAVE_REQUESTS:
+        return _UrllibSession()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = UA
+    return session
+
+
+class HttpCache:
+    """Response bodies, validators and extracted text on disk, keyed by URL hash.
+
+    Layout: ``<root>/<key[:2]>/<key>.json`` (url, ETag, Last-Modified,
+    charset, body hash), ``<key>.body`` and ``<key>.text.json``.
+    """
+
+    def __init__(self, root: PathLike = DEFAULT_CACHE):
+        self.root = Path(root)
+
+    def _path(self, url: str, suffix: str) -> Path:
+        key = url_key(url)
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(url, '.json').read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            return self._path(url, '.body').read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a cached URL."""
+        meta = self.meta(url) or {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url: str, body: bytes, headers: Any, charset: str) -> bool:
+        """Save a 200 response; returns whether the body changed."""
+        sha = hashlib.sha256(body).hexdigest()
+        previous = self.meta(url) or {}
+        self._write(self._path(url, '.body'), body)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'charset': charset,
+            'sha256': sha,
+            'fetched_at': dt.datetime.utcnow().isoformat(),
+        }
+        self._write(self._path(url, '.json'), json.dumps(meta).encode('utf-8'))
+        return previous.get('sha256') != sha
+
+    def text(self, url: str, sha: str) -> Optional[Tuple[str, str]]:
+        """Cached ``(title, text)`` extracted from the body with hash ``sha``."""
+        try:
+            data = json.loads(self._path(url, '.text.json').read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get('sha256') != sha:
+            return None
+        return data['title'], data['text']
+
+    def store_text(self, url: str, sha: str, title: str, text: str) -> None:
+        blob = json.dumps({'sha256': sha, 'title': title, 'text': text}, ensure_ascii=False)
+        self._write(self._path(url, '.text.json'), blob.encode('utf-8'))
+
+
+def fetch(session: Any, cache: HttpCache, url: str, timeout: float = TIMEOUT) -> FetchResult:
+    """Conditional GET of ``url`` through ``cache``."""
+    meta = cache.meta(url)
+    try:
+        r = session.get(url, headers=cache.validators(url) if meta else {}, timeout=timeout)
+    except Exception as e:
+        cached = cache.body(url) if meta else None
+        if cached is not None:
+            return FetchResult(url, 'stale', cached, meta.get('charset', 'utf-8'), error=str(e))
+        return FetchResult(url, 'error', error=str(e))
+
+    if r.status_code == 304 and meta:
+        cached = cache.body(url)
+        if cached is not None:
+            return FetchResult(url, 'not_modified', cached, meta.get('charset', 'utf-8'))
+    if r.status_code != 200:
+        return FetchResult(url, 'error', error=f"HTTP {r.status_code}")
+
+    m = _CHARSET.search(r.headers.get('Content-Type') or '')
+    charset = m.group(1) if m else 'utf-8'
+    changed = cache.store(url, r.content, r.headers, charset)
+    return FetchResult(url, 'fetched', r.content, charset, changed=changed)
+
+
+def fetch_all(urls: Iterable[str], cache: HttpCache, workers: int = 8,
+              session: Any = None, timeout: float = TIMEOUT) -> Dict[str, FetchResult]:
+    """Fetch distinct ``urls`` across a thread pool sharing one session."""
+    urls = list(dict.fromkeys(urls))
+    own = session is None
+    session = session or make_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = pool.map(lambda u: fetch(session, cache, u, timeout), urls)
+            return dict(zip(urls, results))
+    finally:
+        if own:
+            session.close()
+
+
+# ---------------------------------------------------------------------------
+# Text extraction
+# ---------------------------------------------------------------------------
+
+class _TextParser(HTMLParser):
+    """Stdlib fallback: the title, plus the text of the largest content container."""
+
+    CONTAINERS = {'article', 'main'}
+    CONTAINER_IDS = {'content', 'main', 'main-text', 'article-content'}
+    CONTAINER_CLASSES = {'content', 'entry-content'}
+    SKIP = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'form'}
+    BLOCKS = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'blockquote', 'section'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self._in_title = False
+        self._skip = 0
+        self._stack: List[Tuple[str, bool]] = []   # (tag, opens a container)
+        self._body: List[str] = []
+        self._containers: List[List[str]] = []     # open containers' text
+        self.blocks: List[str] = []                # closed containers' text
+
+    def _is_container(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> bool:
+        a = dict(attrs)
+        classes = set((a.get('class') or '').split())
+        return (tag in self.CONTAINERS or (a.get('id') or '') in self.CONTAINER_IDS
+                or bool(classes & self.CONTAINER_CLASSES))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('br', 'img', 'meta', 'link', 'input', 'hr'):
+            if tag == 'br':
+                self._emit('\n')
+            return
+        if tag == 'title':
+            self._in_title = True
+        if tag in self.SKIP:
+            self._skip += 1
+        container = self._is_container(tag, attrs)
+        if container:
+            self._containers.append([])
+        self._stack.append((tag, container))
+        if tag in self.BLOCKS:
+            self._emit('\n')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        if not any(t == tag for t, _ in self._stack):
+            return  # stray end tag
+        while self._stack:
+            open_tag, container = self._stack.pop()
+            if open_tag in self.SKIP:
+                self._skip -= 1
+            if container:
+                self.blocks.append(''.join(self._containers.pop()))
+            if open_tag == tag:
+                break
+        if tag in self.BLOCKS:
+            self._emit('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if not self._skip:
+            self._emit(data)
+
+    def _emit(self, text: str) -> None:
+        self._body.append(text)
+        for c in self._containers:
+            c.append(text)
+
+    def close(self):
+        super().close()
+        while self._containers:
+            self.blocks.append(''.join(self._containers.pop()))
+
+    def best_text(self) -> str:
+        text = max(self.blocks, key=lambda b: len(_tidy(b)), default='') or ''.join(self._body)
+        return _tidy(text)
+
+
+def _tidy(text: str) -> str:
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_text(html: str) -> Tuple[str, str]:
+    """``(title, readable text)`` of a page, best-effort."""
+    if not HAVE_BS4:
+        parser = _TextParser()
+        try:
+            parser.feed(html)
+            parser.close()
+        except Exception:
+            pass
+        return parser.title.strip(), parser.best_text()
+
+    title = ""
+    try:
+        soup = BeautifulSoup(html, "lxml")
+        title = (soup.title.string or "").strip() if soup.title else ""
+    except Exception:
+        pass
+
+    # Prefer readability if available
+    if HAVE_READABILITY:
+        try:
+            doc = Document(html)
+            title = doc.short_title() or title
+            content_html = doc.summary(html_partial=True)
+            soup = BeautifulSoup(content_html, "lxml")
+            text = soup.get_text("\n", strip=True)
+            return title, text
+        except Exception:
+            pass
+
+    # Fallback: heuristic main content extraction
+    try:
+        soup = BeautifulSoup(html, "lxml")
+        # Choose the largest text block among article/main/content containers
+        candidates = soup.select("article, main, #content, .content, #main, .entry-content")
+        blocks = candidates or [soup.body or soup]
+        best_text = ""
+        best_len = 0
+        for b in blocks:
+            t = b.get_text("\n", strip=True)
+            if len(t) > best_len:
+                best_text, best_len = t, len(t)
+        return title, best_text
+    except Exception:
+        return title, ""
+
+
+def extract_all(pages: Sequence[str], processes: int = 0) -> List[Tuple[str, str]]:
+    """``extract_text`` over ``pages``, across ``processes`` workers (0: in this process)."""
+    if processes <= 1 or len(pages) < 2:
+        return [extract_text(html) for html in pages]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(extract_text, pages, chunksize=max(1, len(pages) // (processes * 4))))
+
+
+# ---------------------------------------------------------------------------
+# Notes and manifests
+# ---------------------------------------------------------------------------
+
+def note_path(outdir: Path, provider: str, slug: str, date: Optional[str] = None) -> Path:
+    date = date or dt.datetime.utcnow().strftime("%Y%m%d")
+    return outdir / f"{sanitize_filename(slug)}_{sanitize_filename(provider)}_{date}.txt"
+
+
+def write_note(outdir: Path, note: NoteData) -> Path:
+    path = note_path(outdir, note.provider, note.slug)
+    header = [
+        f"URL: {note.url}",
+        f"Provider: {note.provider}",
+        f"Title: {note.title}",
+        f"Fetched-At-UTC: {dt.datetime.utcnow().isoformat()}",
+        "",
+        EXTRACTED_MARKER,
+        "",
+    ]
+    content = "\n".join(header) + (note.text or "[No text extracted]")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def read_note_header(path: PathLike) -> Dict[str, str]:
+    """``Key: value`` lines at the top of a note, up to the first blank line."""
+    header: Dict[str, str] = {}
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                break
+            key, sep, value = line.partition(':')
+            if not sep or ' ' in key.strip():
+                break
+            header[key.strip()] = value.strip()
+    return header
+
+
+def _notes(outdir: Path, provider: str, slug: str) -> List[Path]:
+    return sorted(outdir.glob(f"{sanitize_filename(slug)}_{sanitize_filename(provider)}_*.txt"))
+
+
+def provider_dir(outdir: Path, provider: str) -> Path:
+    """``outdir/<provider>`` for a sources root, ``outdir`` for a provider directory."""
+    return outdir / provider if outdir.name == 'sources' else outdir
+
+
+def read_manifest(path: PathLike) -> List[ManifestRow]:
+    path = Path(path)
+    if path.suffix in ('.jsonl', '.json'):
+        rows: Iterable[Dict[str, Any]] = jsonl_codec.read_jsonl(path)
+    else:
+        with path.open(encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    return [ManifestRow(str(r['url']).strip(), str(r['provider']).strip(), str(r['slug']).strip())
+            for r in rows if r.get('url')]
+
+
+def manifest_from_notes(sources_dir: PathLike) -> List[ManifestRow]:
+    """One row per ``(provider, slug)`` note under ``sources_dir`` that records its URL."""
+    rows: Dict[Tuple[str, str], ManifestRow] = {}
+    for path in sorted(Path(sources_dir).rglob('*.txt')):
+        m = _NOTE_NAME.match(path.stem)
+        if not m:
+            continue
+        slug, provider = m.group('slug'), m.group('provider')
+        url = read_note_header(path).get('URL', '')
+        if url.startswith(('http://', 'https://')):
+            rows[(provider, slug)] = ManifestRow(url, provider, slug)
+    return list(rows.values())
+
+
+def fetch_notes(rows: Sequence[ManifestRow], outdir: PathLike, cache: Optional[HttpCache] = None,
+                workers: int = 8, processes: int = 0, session: Any = None) -> List[Dict[str, Any]]:
+    """Fetch every manifest row and write notes for new or changed pages.
+
+    Returns one report per row: ``url``, ``provider``, ``slug``, fetch
+    ``status``, ``note`` (path written, or ``None``) and ``error``.
+    """
+    outdir = Path(outdir)
+    cache = cache or HttpCache()
+    results = fetch_all((r.url for r in rows), cache, workers, session)
+
+    # Extract each distinct new body once; unchanged bodies reuse cached text
+    texts: Dict[str, Tuple[str, str]] = {}
+    todo: List[str] = []
+    for url, res in results.items():
+        if res.body is None:
+            continue
+        hit = cache.text(url, hashlib.sha256(res.body).hexdigest())
+        if hit is not None:
+            texts[url] = hit
+        else:
+            todo.append(url)
+    for url, (title, text) in zip(todo, extract_all([results[u].html for u in todo], processes)):
+        cache.store_text(url, hashlib.sha256(results[url].body).hexdigest(), title, text)
+        texts[url] = (title, text)
+
+    reports = []
+    for row in rows:
+        res = results[row.url]
+        report = {'url': row.url, 'provider': row.provider, 'slug': row.slug,
+                  'status': res.status, 'note': None, 'error': res.error}
+        if row.url in texts:
+            directory = provider_dir(outdir, row.provider)
+            target = note_path(directory, row.provider, row.slug)
+            existing = _notes(directory, row.provider, row.slug)
+            hand_written = target.exists() and EXTRACTED_MARKER not in target.read_text(encoding='utf-8',
+                                                                                          errors='replace')
+            if (res.changed or not existing) and not hand_written:
+                title, text = texts[row.url]
+                report['note'] = str(write_note(directory, NoteData(row.provider, row.slug, row.url, title, text)))
+        reports.append(report)
+    return reports
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument('--manifest', help='CSV or JSONL with url, provider, slug')
+    src.add_argument('--refresh', metavar='SOURCES_DIR', help='re-fetch every note under this directory')
+    p.add_argument('--outdir', help='sources root or provider directory (default: --refresh dir)')
+    p.add_argument('--cache', default=None, help=f'HTTP cache directory (default: <outdir>/{DEFAULT_CACHE.name})')
+    p.add_argument('--workers', type=int, default=8, help='concurrent requests')
+    p.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='text extraction processes')
+    args = p.parse_args(argv)
+
+    rows = read_manifest(args.manifest) if args.manifest else manifest_from_notes(args.refresh)
+    outdir = Path(args.outdir or args.refresh or Path('Datasets') / 'sources')
+    cache = HttpCache(args.cache or outdir / DEFAULT_CACHE.name)
+
+    start = time.perf_counter()
+    reports = fetch_notes(rows, outdir, cache, args.workers, args.processes)
+    for r in reports:
+        line = f"{r['status']:<12} {r['provider']}/{r['slug']}"
+        if r['note']:
+            line += f" -> {r['note']}"
+        if r['error']:
+            line += f" ({r['error']})"
+        print(line)
+    failed = sum(r['status'] == 'error' for r in reports)
+    print(f"{len(reports)} source(s), {sum(bool(r['note']) for r in reports)} note(s) written, "
+          f"{failed} failed in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Source Notes Index
+Reads the research notes under ``Datasets/sources`` back and links corpus
+entries to the passages that support them.
+
+- each note's ``Key: value`` header (as written by ``source_fetch.write_note``,
+  or by hand) gives its URL, provider and title. The body is split into
+  passages: one per bullet or paragraph, tagged with the section heading
+  above it
+- ``SourceNotesIndex`` maps normalized URLs to notes and keeps a passage-level
+  inverted index of folded terms. It is saved to ``<sources>/.notes_index.json``
+  and ``refresh()`` re-parses only notes whose size or mtime changed
+- ``link(entry)`` resolves the URLs in an entry's ``grounding_authority`` to
+  notes and ranks those notes' passages against the entry's text (idf-weighted
+  term overlap). ``search(text)`` ranks passages across all notes
+
+Usage:
+  python src/source_notes.py Datasets/sources --link Datasets/rounds/staging_round_0001/nyaya_corpus_staging_round_0001_clean.jsonl
+  python src/source_notes.py Datasets/sources --search "illocutionary force"
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec  # noqa: E402
+from src.source_fetch import EXTRACTED_MARKER, read_note_header  # noqa: E402
+
+PathLike = Union[str, Path]
+
+DEFAULT_SOURCES = Path('Datasets') / 'sources'
+INDEX_NAME = '.notes_index.json'
+INDEX_VERSION = 2
+ENTRY_FIELDS = ('pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have in into is it its
+may not of on or so such than that the their then there these this those to
+via was were what when which while who will with without we our you your i
+""".split())
+
+_URL = re.compile(r'https?://[^\s,;)\]>"\']+')
+_TERM = re.compile(r'\w+')
+_NOTE_NAME = re.compile(r'^(?P<slug>.+)_(?P<provider>[a-z0-9-]+)_(?P<date>\d{8})$')
+_BULLET = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+
+
+def normalize_url(url: str) -> str:
+    """Scheme-, ``www.``-, fragment- and trailing-slash-insensitive form of a URL."""
+    url = url.strip().rstrip('.').split('#', 1)[0]
+    url = re.sub(r'^https?://', '', url, flags=re.IGNORECASE)
+    host, _, path = url.partition('/')
+    host = host.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}/{path}".rstrip('/')
+
+
+def urls_in(text: str) -> List[str]:
+    return _URL.findall(text or '')
+
+
+def terms(text: str) -> List[str]:
+    """Folded (lower-case, accent-free) word terms of ``text``, without stopwords."""
+    decomposed = unicodedata.normalize('NFD', (text or '').casefold())
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return [t for t in _TERM.findall(folded) if len(t) > 1 and t not in STOPWORDS]
+
+
+@dataclass
+class Passage:
+    note: str          # note path, relative to the sources root
+    number: int        # position in the note
+    section: str
+    text: str
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        return f"{self.note}#{self.number}"
+
+
+@dataclass
+class Note:
+    path: str          # relative to the sources root
+    url: str
+    provider: str
+    slug: str
+    title: str
+    header: Dict[str, str]
+    fingerprint: Tuple[int, int]
+    passages: List[Passage] = field(default_factory=list)
+
+
+def split_passages(body: str, note: str) -> List[Passage]:
+    """One passage per bullet or paragraph; a short line ending a block before bullets is a section."""
+    passages: List[Passage] = []
+    section = ''
+    paragraph: List[str] = []
+
+    def flush() -> None:
+        text = ' '.join(paragraph).strip()
+        paragraph.clear()
+        if text:
+            passages.append(Passage(note, len(passages), section, text, dict(Counter(terms(text)))))
+
+    for raw in body.splitlines():
+        line = raw.strip()
+        if not line or line == EXTRACTED_MARKER:
+            flush()
+        elif _BULLET.match(line):
+            flush()
+            paragraph.append(_BULLET.sub('', line))
+            flush()
+        elif not paragraph and len(line) < 60 and not line.endswith('.'):
+            section = line.rstrip(':')
+        else:
+            paragraph.append(line)
+    flush()
+    return passages
+
+
+def parse_note(path: PathLike, root: PathLike) -> Optional[Note]:
+    """A note with its header and passages, or ``None`` if it records no URL."""
+    path = Path(path)
+    header = read_note_header(path)
+    url = header.get('URL', '')
+    if not url.startswith(('http://', 'https://')):
+        return None
+    lines = path.read_text(encoding='utf-8', errors='replace').splitlines()
+    start = 0
+    while start < len(lines) and lines[start].partition(':')[0].strip() in header:
+        start += 1
+    body = '\n'.join(lines[start:])
+    m = _NOTE_NAME.match(path.stem)
+    rel = path.relative_to(root).as_posix()
+    st = path.stat()
+    return Note(
+        path=rel,
+        url=url,
+        provider=header.get('Provider') or (m.group('provider') if m else path.parent.name),
+        slug=m.group('slug') if m else path.stem,
+        title=header.get('Title', ''),
+        header=header,
+        fingerprint=(st.st_size, st.st_mtime_ns),
+        passages=split_passages(body, rel),
+    )
+
+
+@dataclass
+class Link:
+    urls: List[str]
+    notes: List[str]                          # resolved note paths
+    passages: List[Tuple[str, float]]         # (passage id, score), best first
+
+    @property
+    def resolved(self) -> bool:
+        return bool(self.notes)
+
+
+class SourceNotesIndex:
+    """URL → note map and passage-level term index over a sources directory."""
+
+    def __init__(self, root: PathLike = DEFAULT_SOURCES, index_file: Optional[PathLike] = None):
+        self.root = Path(root)
+        self.index_file = Path(index_file) if index_file else self.root / INDEX_NAME
+        self.notes: Dict[str, Note] = {}
+        self.by_url: Dict[str, List[str]] = {}
+        self.passages: Dict[str, Passage] = {}
+        self.postings: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def open(cls, root: PathLike = DEFAULT_SOURCES, save: bool = True) -> 'SourceNotesIndex':
+        """Load the saved index, bring it up to date with the notes on disk and save it if it changed."""
+        index = cls(root)
+        index.load()
+        if index.refresh() and save:
+            index.save()
+        return index
+
+    # --- persistence -------------------------------------------------------
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.index_file.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        for n in data['notes']:
+            passages = [Passage(**p) for p in n.pop('passages')]
+            n['fingerprint'] = tuple(n['fingerprint'])
+            self.notes[n['path']] = Note(**n, passages=passages)
+        self._rebuild()
+
+    def save(self) -> None:
+        data = {'version': INDEX_VERSION, 'notes': [asdict(n) for n in self.notes.values()]}
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_name(self.index_file.name + '.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.index_file)
+
+    # --- maintenance -------------------------------------------------------
+
+    def refresh(self) -> int:
+        """Re-parse new or changed notes and drop deleted ones; returns how many notes changed."""
+        seen = set()
+        changed = 0
+        for path in sorted(self.root.rglob('*.txt')):
+            rel = path.relative_to(self.root).as_posix()
+            if any(part.startswith('.') for part in path.relative_to(self.root).parts):
+                continue
+            seen.add(rel)
+            st = path.stat()
+            known = self.notes.get(rel)
+            if known and known.fingerprint == (st.st_size, st.st_mtime_ns):
+                continue
+            note = parse_note(path, self.root)
+            if note is None:
+                if self.notes.pop(rel, None):
+                    changed += 1
+                continue
+            self.notes[rel] = note
+            changed += 1
+        for rel in set(self.notes) - seen:
+            del self.notes[rel]
+            changed += 1
+        if changed:
+            self._rebuild()
+        return changed
+
+    def _rebuild(self) -> None:
+        self.by_url = defaultdict(list)
+        self.passages = {}
+        self.postings = defaultdict(set)
+        for rel, note in sorted(self.notes.items()):
+            self.by_url[normalize_url(note.url)].append(rel)
+            for p in note.passages:
+                self.passages[p.id] = p
+                for term in p.counts:
+                    self.postings[term].add(p.id)
+
+    # --- lookups -----------------------------------------------------------
+
+    def notes_for_url(self, url: str) -> List[Note]:
+        return [self.notes[rel] for rel in self.by_url.get(normalize_url(url), ())]
+
+    def resolve(self, grounding_authority: str) -> List[Note]:
+        """Notes for every URL cited in a ``grounding_authority`` string."""
+        found: Dict[str, Note] = {}
+        for url in urls_in(grounding_authority):
+            for note in self.notes_for_url(url):
+                found[note.path] = note
+        return list(found.values())
+
+    def idf(self, term: str) -> float:
+        return math.log(1 + len(self.passages) / (1 + len(self.postings.get(term, ()))))
+
+    def rank(self, text: str, candidates: Optional[Iterable[str]] = None,
+             limit: int = 5) -> List[Tuple[str, float]]:
+        """Passage ids ranked by the idf-weighted overlap of their terms with ``text``."""
+        allowed = set(candidates) if candidates is not None else None
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(terms(text)):
+            weight = self.idf(term)
+            for pid in self.postings.get(term, ()):
+                if allowed is None or pid in allowed:
+                    scores[pid] += weight
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(pid, round(score, 4)) for pid, score in ranked[:limit]]
+
+    def search(self, text: str, limit: int = 10) -> List[Tuple[str, float]]:
+        return self.rank(text, None, limit)
+
+    def link(self, entry: Dict[str, Any], fields: Sequence[str] = ENTRY_FIELDS, limit: int = 3) -> Link:
+        """The notes an entry cites and their passages that best match its reasoning steps."""
+        ga = str(entry.get('grounding_authority') or '')
+        notes = self.resolve(ga)
+        text = ' '.join(str(entry.get(k) or '') for k in fields)
+        candidates = [p.id for n in notes for p in n.passages]
+        passages = self.rank(text, candidates, limit) if candidates else []
+        return Link(urls_in(ga), [n.path for n in notes], passages)
+
+    def link_all(self, entries: Iterable[Dict[str, Any]], limit: int = 3) -> List[Link]:
+        return [self.link(e, limit=limit) for e in entries]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('sources', nargs='?', default=str(DEFAULT_SOURCES))
+    p.add_argument('--link', metavar='JSONL', help='link each entry of this file to supporting passages')
+    p.add_argument('--search', help='rank passages across all notes')
+    p.add_argument('--limit', type=int, default=3)
+    args = p.parse_args(argv)
+
+    index = SourceNotesIndex.open(args.sources)
+    print(f"{len(index.notes)} note(s), {len(index.passages)} passage(s), {len(index.by_url)} URL(s)")
+    if args.search:
+        for pid, score in index.search(args.search, args.limit):
+            print(f"{score:8.3f}  {pid}  {index.passages[pid].text}")
+    if args.link:
+        resolved = 0
+        for i, entry in enumerate(jsonl_codec.iter_jsonl(args.link)):
+            link = index.link(entry, limit=args.limit)
+            resolved += link.resolved
+            print(json.dumps({'index': i, 'notes': link.notes, 'passages': link.passages}, ensure_ascii=False))
+        print(f"{resolved} entr(y/ies) resolved to a local note", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Tradition Classifier
+A trained, multi-label cultural-tradition classifier: TF-IDF features and one
+logistic regression per label, replacing the keyword scores of
+``classify_cultural_traditions.analyze_content``.
+
+- labels come from each training entry's ``cultural_tradition`` and
+  ``cultural_traditions`` fields, closed under ``PARENTS`` so a ``Hindu`` entry
+  also counts as ``Indian`` and ``Non-Western``. Any label seen in training is
+  learned, fine-grained or coarse
+- training uses human-labelled sources only: the seed set
+  ``Datasets/tradition_seed_labels.jsonl`` (a few entries per fine-grained
+  tradition) and the reviewer-approved files under ``Datasets/approved``.
+  The clean corpus is not a training source, and entries whose
+  ``label_source`` is ``predicted`` (everything ``classify`` labels) are
+  skipped, so predictions never feed back into the model
+- features are the folded terms of the entry (and their bigrams), weighted by
+  sublinear TF-IDF and l2-normalized by scikit-learn's
+  ``TfidfVectorizer(sublinear_tf=True)``; each label is a scikit-learn
+  ``LogisticRegression``
+- the fitted model is saved as JSON (vocabulary, idf, coefficients) with a
+  fingerprint of the training files. ``TraditionClassifier.open()`` loads it
+  and only retrains when those files change
+- ``predict(entries)`` scores a whole batch at once: one sparse
+  ``(entries x features) @ (features x labels)`` product
+
+Each prediction has ``tradition`` (``Western``, ``Non-Western`` or
+``Unknown``, the value the rest of the pipeline reads), ``traditions`` (every
+label whose probability reaches the threshold, best first) and ``scores``.
+``classify`` stores the first two as ``cultural_tradition`` and
+``cultural_traditions``.
+
+Usage:
+  python src/tradition_classifier.py --train
+  python src/tradition_classifier.py nyaya_corpus_staging.jsonl --output classified.jsonl
+"""
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src import jsonl_codec, schema_migrations  # noqa: E402
+from src.source_notes import terms  # noqa: E402
+
+PathLike = Union[str, Path]
+
+DEFAULT_MODEL = Path('.tradition_model.json')
+DEFAULT_TRAINING = ('Datasets/tradition_seed_labels.jsonl', 'Datasets/approved/*.jsonl')
+PREDICTED = 'predicted'
+MODEL_VERSION = 2
+TEXT_FIELDS = ('domain', 'pratijna', 'hetu', 'udaharana', 'upanaya', 'nigamana', 'grounding_authority')
+COARSE = ('Non-Western', 'Western')
+UNKNOWN = 'Unknown'
+THRESHOLD = 0.5
+MIN_DF = 2
+
+# Every label implies its parents; coarse labels have none
+PARENTS = {
+    'Hindu': ('Indian',),
+    'Jain': ('Indian',),
+    'Indian': ('Non-Western',),
+    'Buddhist': ('Non-Western',),
+    'Chinese': ('Non-Western',),
+    'Islamic': ('Non-Western',),
+    'Persian': ('Non-Western',),
+    'Western analytic': ('Western',),
+    'Western continental': ('Western',),
+    'Western classical': ('Western',),
+}
+
+
+@dataclass
+class Prediction:
+    tradition: str                 # Western, Non-Western or Unknown
+    traditions: List[str]          # labels at or above the threshold, best first
+    scores: Dict[str, float]       # label -> probability
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def entry_fields(self) -> Dict[str, Any]:
+        """The entry fields a prediction sets, marked ``label_source: predicted``."""
+        return {'cultural_tradition': self.tradition, 'cultural_traditions': list(self.traditions),
+                'label_source': PREDICTED}
+
+
+def with_parents(labels: Iterable[str]) -> Set[str]:
+    out: Set[str] = set()
+    stack = [l for l in labels if l and l != UNKNOWN]
+    while stack:
+        label = stack.pop()
+        if label not in out:
+            out.add(label)
+            stack.extend(PARENTS.get(label, ()))
+    return out
+
+
+def entry_labels(entry: Dict[str, Any]) -> Set[str]:
+    """Known labels of an entry, with their parents (empty if it is unlabelled)."""
+    labels = list(entry.get('cultural_traditions') or [])
+    if isinstance(entry.get('cultural_tradition'), str):
+        labels.append(entry['cultural_tradition'])
+    return with_parents(labels)
+
+
+def features(text: str) -> List[str]:
+    """Folded terms of ``text`` and their bigrams."""
+    words = terms(text)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def entry_text(entry: Dict[str, Any]) -> str:
+    return ' '.join(str(entry.get(k) or '') for k in TEXT_FIELDS)
+
+
+def training_fingerprint(paths: Sequence[PathLike]) -> List[Tuple[str, int, int]]:
+    out = []
+    for p in paths:
+        st = os.stat(p)
+        out.append((str(p), st.st_size, st.st_mtime_ns))
+    return out
+
+
+def expand_training(patterns: Sequence[PathLike]) -> List[Path]:
+    paths: List[Path] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(str(pattern), recursive=True))
+        paths.extend(Path(m) for m in matches if Path(m) not in paths)
+    return paths
+
+
+def load_training(paths: Sequence[PathLike]) -> List[Dict[str, Any]]:
+    """Human-labelled entries of ``paths`` in the canonical schema, de-duplicated by content."""
+    seen = set()
+    out = []
+    for path in paths:
+        for entry in schema_migrations.migrate_stream(jsonl_codec.iter_jsonl(path, errors='skip'), errors='skip'):
+            if entry.get('label_source') == PREDICTED or not entry_labels(entry):
+                continue
+            key = hashlib.sha256(entry_text(entry).encode('utf-8')).digest()
+            if key not in seen:
+                seen.add(key)
+                out.append(entry)
+    return out
+
+
+class TraditionClassifier:
+    """TF-IDF features and one logistic regression per tradition label."""
+
+    def __init__(self, labels: Sequence[str], vocabulary: Sequence[str], idf: Sequence[float],
+                 coef: Sequence[Sequence[float]], intercept: Sequence[float],
+                 threshold: float = THRESHOLD, training: Optional[List[Tuple[str, int, int]]] = None):
+        self.labels = list(labels)
+        self.vocabulary = list(vocabulary)
+        self.index = {f: j for j, f in enumerate(self.vocabulary)}
+        self.idf = list(idf)
+        self.coef = [list(row) for row in coef]              # labels x features
+        self.intercept = list(intercept)
+        self.threshold = threshold
+        self.training = training or []
+        self._weights = np.asarray(self.coef, dtype=np.float64).reshape(len(self.labels), -1).T
+        self._bias = np.asarray(self.intercept, dtype=np.float64)
+
+    # --- features ----------------------------------------------------------
+
+    def vectorize(self, entry: Dict[str, Any]) -> List[Tuple[int, float]]:
+        """Sublinear, l2-normalized TF-IDF of an entry as sorted ``(feature index, weight)`` pairs."""
+        counts = Counter(j for j in map(self.index.get, features(entry_text(entry))) if j is not None)
+        row = [(j, (1.0 + math.log(tf)) * self.idf[j]) for j, tf in sorted(counts.items())]
+        norm = math.sqrt(sum(v * v for _, v in row)) or 1.0
+        return [(j, v / norm) for j, v in row]
+
+    # --- training ----------------------------------------------------------
+
+    @classmethod
+    def fit(cls, entries: Sequence[Dict[str, Any]], min_df: int = MIN_DF, C: float = 10.0,
+            threshold: float = THRESHOLD,
+            training: Optional[List[Tuple[str, int, int]]] = None) -> 'TraditionClassifier':
+        """Train on labelled entries; labels with no positive or no negative example are not learned."""
+        entries = [e for e in entries if entry_labels(e)]
+        targets = [entry_labels(e) for e in entries]
+        counts = Counter(l for t in targets for l in t)
+        labels = sorted(l for l, n in counts.items() if 0 < n < len(entries))
+        if not labels:
+            raise ValueError("Need labelled entries with at least two distinct traditions to train")
+        vectorizer = TfidfVectorizer(analyzer=features, sublinear_tf=True, min_df=min_df)
+        X = vectorizer.fit_transform([entry_text(e) for e in entries])
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        coef, intercept = [], []
+        for label in labels:
+            y = np.fromiter((label in t for t in targets), dtype=bool, count=len(targets))
+            model = LogisticRegression(C=C, class_weight='balanced', max_iter=1000).fit(X, y)
+            coef.append(model.coef_[0].tolist())
+            intercept.append(float(model.intercept_[0]))
+        return cls(labels, vocabulary, vectorizer.idf_.tolist(), coef, intercept, threshold, training)
+
+    # --- persistence -------------------------------------------------------
+
+    def save(self, path: PathLike = DEFAULT_MODEL) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'version': MODEL_VERSION, 'labels': self.labels, 'vocabulary': self.vocabulary, 'idf': self.idf,
+                'coef': self.coef, 'intercept': self.intercept, 'threshold': self.threshold,
+                'training': self.training}
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: PathLike = DEFAULT_MODEL) -> Optional['TraditionClassifier']:
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get('version') != MODEL_VERSION:
+            return None
+        return cls(data['labels'], data['vocabulary'], data['idf'], data['coef'], data['intercept'],
+                   data.get('threshold', THRESHOLD), [tuple(t) for t in data.get('training', [])])
+
+    @classmethod
+    def open(cls, path: PathLike = DEFAULT_MODEL, training: Sequence[PathLike] = DEFAULT_TRAINING,
+             save: bool = True) -> 'TraditionClassifier':
+        """The saved model, retrained (and saved) first if the training files changed since it was fit."""
+        paths = expand_training(training)
+        fingerprint = training_fingerprint(paths)
+        model = cls.load(path)
+        if model is not None and model.training == [tuple(t) for t in fingerprint]:
+            return model
+        model = cls.fit(load_training(paths), training=fingerprint)
+        if save:
+            model.save(path)
+        return model
+
+    # --- prediction --------------------------------------------------------
+
+    def predict_proba(self, entries: Sequence[Dict[str, Any]]) -> List[List[float]]:
+        """``entries x labels`` probabilities."""
+        rows = [self.vectorize(e) for e in entries]
+        indptr = np.cumsum([0] + [len(r) for r in rows])
+        indices = np.fromiter((j for r in rows for j, _ in r), dtype=np.int64, count=int(indptr[-1]))
+        data = np.fromiter((v for r in rows for _, v in r), dtype=np.float64, count=int(indptr[-1]))
+        X = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(self.vocabulary)))
+        z = X @ self._weights + self._bias
+        return (1.0 / (1.0 + np.exp(-z))).tolist()
+
+    def predict(self, entries: Sequence[Dict[str, Any]]) -> List[Prediction]:
+        return [self._decide(p) for p in self.predict_proba(entries)]
+
+    def _decide(self, probs: Sequence[float]) -> Prediction:
+        scores = {l: round(p, 4) for l, p in zip(self.labels, probs)}
+        traditions = sorted((l for l, p in zip(self.labels, probs) if p >= self.threshold),
+                            key=lambda l: -scores[l])
+        coarse = [l for l in traditions if l in COARSE]
+        if not coarse:
+            # Models trained without coarse labels fall back to the parents of the fine ones
+            coarse = [l for l in with_parents(traditions) if l in COARSE]
+            coarse.sort(key=lambda l: -max(scores[t] for t in traditions if l in with_parents([t])))
+        return Prediction(coarse[0] if coarse else UNKNOWN, traditions, scores)
+
+
+def classify(entries: List[Dict[str, Any]], model: TraditionClassifier, overwrite: bool = False) -> int:
+    """Set ``cultural_tradition``/``cultural_traditions`` on unclassified entries (all with ``overwrite``).
+
+    Labelled entries are marked ``label_source: predicted`` so they are never trained on.
+    """
+    todo = [e for e in entries if overwrite or e.get('cultural_tradition', UNKNOWN) == UNKNOWN]
+    for entry, pred in zip(todo, model.predict(todo) if todo else []):
+        entry.update(pred.entry_fields())
+    return len(todo)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('input', nargs='?', help='JSONL to classify')
+    p.add_argument('--model', default=str(DEFAULT_MODEL))
+    p.add_argument('--training', nargs='+', default=list(DEFAULT_TRAINING), help='training files or globs')
+    p.add_argument('--train', action='store_true', help='retrain even if the saved model is current')
+    p.add_argument('--overwrite', action='store_true', help='reclassify entries that already have a tradition')
+    p.add_argument('--output', help='write classified entries here (default: print a summary only)')
+    args = p.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.train:
+        paths = expand_training(args.training)
+        model = TraditionClassifier.fit(load_training(paths), training=training_fingerprint(paths))
+        model.save(args.model)
+    else:
+        model = TraditionClassifier.open(args.model, args.training)
+    print(f"Model: {len(model.labels)} label(s) {model.labels}, {len(model.vocabulary)} feature(s)")
+    if args.input:
+        entries = schema_migrations.migrate_all(jsonl_codec.iter_jsonl(args.input, errors='skip'))
+        n = classify(entries, model, args.overwrite)
+        if args.output:
+            jsonl_codec.write_jsonl(args.output, entries)
+        counts = Counter(e.get('cultural_tradition', UNKNOWN) for e in entries)
+        print(f"Classified {n} of {len(entries)} entries: {dict(counts)}")
+    print(f"{time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
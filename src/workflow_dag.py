@@ -0,0 +1,175 @@
+"""
+Workflow DAG Runner
+Executes in-process pipeline stages with declared inputs/outputs.
+
+Stages are plain functions that receive their declared inputs as keyword
+arguments and return a dict with their declared outputs. Dependencies are
+derived from the artifact names, so stages whose inputs are ready run
+concurrently on a thread pool. When a cache directory is given, a stage whose
+input artifacts hash to a previously seen value is skipped and its outputs are
+restored from disk. Passing a tracer from ``src.instrumentation`` records a
+span per stage.
+"""
+
+import hashlib
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[..., Dict[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    description: str = ''
+    cacheable: bool = True
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # 'ran' | 'cached' | 'failed' | 'skipped'
+    error: Optional[str] = None
+    outputs: List[str] = field(default_factory=list)
+
+
+class WorkflowError(RuntimeError):
+    """Raised when the stage graph is invalid or a stage fails."""
+
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of a JSON-serializable artifact."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def resolve_order(stages: List[Stage], initial: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each stage to the stages it depends on, validating the graph."""
+    producers: Dict[str, str] = {}
+    for stage in stages:
+        for out in stage.outputs:
+            if out in producers or out in initial:
+                raise WorkflowError(f"Artifact '{out}' is produced more than once")
+            producers[out] = stage.name
+
+    deps: Dict[str, List[str]] = {}
+    for stage in stages:
+        deps[stage.name] = []
+        for inp in stage.inputs:
+            if inp in initial:
+                continue
+            if inp not in producers:
+                raise WorkflowError(f"Stage '{stage.name}' needs unknown artifact '{inp}'")
+            deps[stage.name].append(producers[inp])
+
+    # Kahn's algorithm purely as a cycle check
+    remaining = {name: set(d) for name, d in deps.items()}
+    done = set()
+    while remaining:
+        ready = [name for name, d in remaining.items() if d <= done]
+        if not ready:
+            raise WorkflowError(f"Cycle detected among stages: {sorted(remaining)}")
+        for name in ready:
+            done.add(name)
+            del remaining[name]
+    return deps
+
+
+class WorkflowRunner:
+    """Run a list of stages over a shared artifact store."""
+
+    def __init__(self, stages: List[Stage], cache_dir: Optional[Path] = None, max_workers: int = 4, tracer=None):
+        names = [s.name for s in stages]
+        if len(names) != len(set(names)):
+            raise WorkflowError(f"Duplicate stage names: {names}")
+        self.stages = {s.name: s for s in stages}
+        self.order = names
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.tracer = tracer
+        self.results: Dict[str, StageResult] = {}
+
+    def _cache_path(self, stage: Stage, artifacts: Dict[str, Any]) -> Optional[Path]:
+        if not self.cache_dir or not stage.cacheable:
+            return None
+        key = fingerprint({
+            'stage': stage.name,
+            'inputs': {name: fingerprint(artifacts[name]) for name in stage.inputs},
+        })
+        return self.cache_dir / f"{stage.name}_{key[:16]}.json"
+
+    def _run_stage(self, stage: Stage, artifacts: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        if self.tracer is None:
+            return self._execute(stage, artifacts)
+        records = sum(len(artifacts[n]) for n in stage.inputs if isinstance(artifacts[n], list))
+        with self.tracer.span(stage.name, records=records) as sp:
+            status, produced = self._execute(stage, artifacts)
+            sp.meta['status'] = status
+            return status, produced
+
+    def _execute(self, stage: Stage, artifacts: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        cache_path = self._cache_path(stage, artifacts)
+        if cache_path and cache_path.exists():
+            try:
+                return 'cached', json.loads(cache_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        produced = stage.func(**{name: artifacts[name] for name in stage.inputs}) or {}
+        missing = [out for out in stage.outputs if out not in produced]
+        if missing:
+            raise WorkflowError(f"Stage '{stage.name}' did not produce {missing}")
+        produced = {out: produced[out] for out in stage.outputs}
+
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(produced, ensure_ascii=False, default=str), encoding='utf-8')
+        return 'ran', produced
+
+    def run(self, initial: Dict[str, Any], on_event: Optional[Callable[[str, Stage], None]] = None) -> Dict[str, Any]:
+        """Execute all stages; returns the final artifact store."""
+        artifacts = dict(initial)
+        deps = resolve_order([self.stages[n] for n in self.order], initial)
+        pending = list(self.order)
+        finished = set()
+        failed = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                if failed is None:
+                    for name in [n for n in pending if set(deps[n]) <= finished]:
+                        pending.remove(name)
+                        if on_event:
+                            on_event('start', self.stages[name])
+                        running[pool.submit(self._run_stage, self.stages[name], artifacts)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    stage = self.stages[name]
+                    try:
+                        status, produced = fut.result()
+                    except Exception as e:
+                        self.results[name] = StageResult(name, 'failed', error=str(e))
+                        failed = failed or (name, e)
+                        if on_event:
+                            on_event('failed', stage)
+                        continue
+                    artifacts.update(produced)
+                    finished.add(name)
+                    self.results[name] = StageResult(name, status, outputs=list(produced))
+                    if on_event:
+                        on_event(status, stage)
+
+        for name in pending:
+            self.results[name] = StageResult(name, 'skipped')
+        if failed:
+            name, exc = failed
+            raise WorkflowError(f"Stage '{name}' failed: {exc}") from exc
+        return artifacts
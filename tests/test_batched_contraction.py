@@ -0,0 +1,80 @@
+import unittest
+
+from src.batched_contraction import HAVE_LAMBEQ, plan_contraction
+
+if HAVE_LAMBEQ:
+    import torch
+    from lambeq import AtomicType, PytorchModel, SpiderAnsatz
+    from lambeq.backend.grammar import Cap, Cup, Id, Swap, Word
+    from lambeq.backend.tensor import Dim
+
+    from src.batched_contraction import BatchedPytorchModel
+
+N, S = (2,), (2,)
+
+
+class TestPlanContraction(unittest.TestCase):
+
+    def test_transitive_sentence(self):
+        # "a V b": n, n.r @ s @ n.l, n, then two cups
+        layers = [('box', 0, (), N, 0), ('box', 1, (), N + S + N, 0), ('box', 4, (), N, 0),
+                  ('cup', 0, N + N, (), 0), ('cup', 1, N + N, (), 0)]
+        plan = plan_contraction((), layers)
+        self.assertEqual(plan.equation, 'Za,Zabc,Zc->Zb')
+        self.assertEqual(plan.operands, [0, 1, 2])
+
+    def test_swap_and_cap(self):
+        swapped = plan_contraction((), [('box', 0, (), N, 0), ('box', 1, (), S, 0), ('swap', 0, N + S, S + N, 1)])
+        self.assertEqual(swapped.equation, 'Za,Zb->Zba')
+        transposed = plan_contraction((), [('cap', 0, (), N + N, 0), ('box', 0, N, N, 0)])
+        self.assertEqual(transposed.equation, 'Zab->Zba')
+
+    def test_spider_merges_wires(self):
+        plan = plan_contraction((), [('box', 0, (), N, 0), ('box', 1, (), N, 0), ('spider', 0, N + N, N, 0)])
+        self.assertEqual(plan.equation, 'Za,Za->Za')
+
+    def test_unsupported_wiring_falls_back(self):
+        # identity wire from domain to codomain, and a closed loop
+        self.assertIsNone(plan_contraction(N, []))
+        self.assertIsNone(plan_contraction((), [('cap', 0, (), N + N, 0), ('cup', 0, N + N, (), 0)]))
+
+
+@unittest.skipUnless(HAVE_LAMBEQ, 'lambeq is not installed')
+class TestBatchedPytorchModel(unittest.TestCase):
+
+    def setUp(self):
+        n, s = AtomicType.NOUN, AtomicType.SENTENCE
+
+        def transitive(a, v, b):
+            return Word(a, n) @ Word(v, n.r @ s @ n.l) @ Word(b, n) >> Cup(n, n.r) @ Id(s) @ Cup(n.l, n)
+
+        def intransitive(a, v):
+            return Word(a, n) @ Word(v, n.r @ s) >> Cup(n, n.r) @ Id(s)
+
+        loop = Cap(n, n.l) >> Swap(n, n.l) >> Cup(n.l, n)  # a closed loop: not compiled, falls back
+        ansatz = SpiderAnsatz({n: Dim(2), s: Dim(3)})
+        self.circuits = [ansatz(d) for d in (
+            transitive('puer', 'videt', 'canem'), intransitive('canis', 'currit'),
+            transitive('canis', 'videt', 'puerum'), intransitive('puer', 'currit') @ loop)]
+        torch.manual_seed(0)
+        self.stock = PytorchModel.from_diagrams(self.circuits)
+        self.stock.initialise_weights()
+        self.batched = BatchedPytorchModel.from_diagrams(self.circuits)
+        self.batched.weights = torch.nn.ParameterList([torch.nn.Parameter(w.detach().clone())
+                                                       for w in self.stock.weights])
+
+    def test_matches_pytorch_model(self):
+        for batch in (self.circuits, self.circuits[:3], self.circuits[3:]):
+            torch.testing.assert_close(self.batched.get_diagram_output(batch),
+                                       self.stock.get_diagram_output(batch))
+        self.assertEqual(sum(plan is None for plan in self.batched.plans.values()), 1)
+
+    def test_gradients_match(self):
+        self.stock.get_diagram_output(self.circuits).sum().backward()
+        self.batched.get_diagram_output(self.circuits).sum().backward()
+        for a, b in zip(self.stock.weights, self.batched.weights):
+            torch.testing.assert_close(b.grad, a.grad)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import pytest
-from lambeq.backend.grammar import Ty
+from lambeq.backend.grammar import Cup, Id, Ty, Word
 from src import classical_grammar
 
 def test_classical_cases():
@@ -35,3 +35,26 @@ def test_classical_to_sanskrit_map():
     assert classical_grammar.get_sanskrit_morpheme(classical_grammar.Dative) == classical_grammar.Sanskrit_Caturthi
     assert classical_grammar.get_sanskrit_morpheme(classical_grammar.Ablative) == classical_grammar.Sanskrit_Pancami
     assert classical_grammar.get_sanskrit_morpheme(classical_grammar.Vocative) == classical_grammar.Sanskrit_Sambodhana
+
+def test_case_functor_rewrites_case_wires():
+    """Test that the functor maps case wires and leaves other types alone."""
+    cg = classical_grammar
+    verb = Word('videt', cg.Nominative.r @ cg.s @ cg.Accusative.l)
+    diagram = (Word('puer', cg.Nominative) @ verb @ Word('canem', cg.Accusative)
+               >> Cup(cg.Nominative, cg.Nominative.r) @ Id(cg.s) @ Cup(cg.Accusative.l, cg.Accusative))
+
+    rewritten = cg.rewrite_to_sanskrit(diagram)
+    assert rewritten.dom == diagram.dom
+    assert rewritten.cod == cg.s
+    assert rewritten.boxes[0] == Word('puer', cg.Sanskrit_Prathama)
+    assert rewritten.boxes[1].cod == cg.Sanskrit_Prathama.r @ cg.s @ cg.Sanskrit_Dvitiya.l
+
+def test_rewrite_many_shares_functor_cache():
+    """Test the batch API reuses one functor and keeps failed parses as None."""
+    cg = classical_grammar
+    functor = cg.case_functor()
+    diagrams = [Word('rex', cg.Nominative), None, Word('rex', cg.Nominative)]
+    out = cg.rewrite_many(diagrams, functor)
+    assert out[1] is None
+    assert out[0] == out[2] == Word('rex', cg.Sanskrit_Prathama)
+    assert len(functor.ar_cache) >= 1
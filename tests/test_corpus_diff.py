@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import jsonl_codec
+from src.corpus_diff import diff_records, diff_sources
+from src.snapshot_store import SnapshotStore
+
+
+def _rec(i, **extra):
+    return dict({'id': f'e{i}', 'domain': 'Nyāya', 'pratijna': f'claim {i}'}, **extra)
+
+
+class TestCorpusDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_added_removed_modified_with_field_diffs(self):
+        a = [_rec(0), _rec(1), _rec(2), {'pratijna': 'no id'}]
+        b = [_rec(0), _rec(1, pratijna='revised', hetu='new'), _rec(3), {'pratijna': 'no id'}]
+        report = diff_records(lambda: iter(a), lambda: iter(b))
+        self.assertEqual(report.counts, {'added': 1, 'removed': 1, 'modified': 1, 'unchanged': 2})
+        self.assertEqual(report.added[0]['key'], 'e3')
+        self.assertEqual(report.removed[0]['key'], 'e2')
+        self.assertEqual(report.modified[0]['fields'], {
+            'pratijna': {'from': 'claim 1', 'to': 'revised'},
+            'hetu': {'from': None, 'to': 'new'},
+        })
+
+    def test_key_order_and_ignored_fields(self):
+        a = [{'id': 'x', 'hetu': 'h', 'domain': 'd', 'staging_status': 'pending'}]
+        b = [{'domain': 'd', 'staging_status': 'approved', 'hetu': 'h', 'id': 'x'}]
+        self.assertEqual(diff_records(lambda: iter(a), lambda: iter(b)).counts['modified'], 1)
+        report = diff_records(lambda: iter(a), lambda: iter(b), ignore_fields=['staging_status'])
+        self.assertEqual(report.counts['unchanged'], 1)
+
+    def test_pretty_round_file_against_jsonl_and_snapshot(self):
+        pretty = self._path('round_pretty.json')
+        clean = self._path('round_clean.jsonl')
+        with open(pretty, 'w', encoding='utf-8') as f:
+            json.dump([_rec(0), _rec(1)], f, ensure_ascii=False, indent=2)
+        jsonl_codec.write_jsonl(clean, [_rec(0), _rec(1, hetu='h')])
+        self.assertEqual(diff_sources(pretty, clean).counts['modified'], 1)
+
+        store_root = self._path('store')
+        SnapshotStore(store_root).snapshot('round', [_rec(0), _rec(1)])
+        report = diff_sources('snapshot:round', pretty, store_root=store_root)
+        self.assertEqual(report.counts['unchanged'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
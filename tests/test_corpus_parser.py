@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.corpus_parser import FAILURE_LOG, load_diagrams, parse_corpus
+
+
+class WordParser:
+    """Minimal parser: a 'diagram' is the tuple of words; sentences containing 'xx' fail."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def sentence2diagram(self, sentence):
+        if 'xx' in sentence:
+            raise ValueError('no parse')
+        return tuple(sentence.split())
+
+    def sentences2diagrams(self, sentences, suppress_exceptions=False):
+        return [None if 'xx' in s else tuple(s.split()) for s in sentences]
+
+
+SPEC = f"{WordParser.__module__}:WordParser"
+CORPUS = [
+    {'id': 'a', 'pratijna': 'the hill has fire', 'hetu': 'because smoke', 'nigamana': 'the hill has fire'},
+    {'id': 'b', 'pratijna': 'sound is xx', 'hetu': 'because produced', 'nigamana': ''},
+]
+
+
+class TestCorpusParser(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.corpus = Path(self.tmp.name) / 'corpus.jsonl'
+        self.root = Path(self.tmp.name) / 'cache'
+        jsonl_codec.write_jsonl(self.corpus, CORPUS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, workers, **kwargs):
+        return parse_corpus(self.corpus, self.root, workers=workers, batch_size=2,
+                            parser_spec=SPEC, parser_kwargs={}, **kwargs)
+
+    def test_parses_distinct_sentences_and_logs_failures(self):
+        summary = self._run(workers=0)
+        self.assertEqual((summary['steps'], summary['parsed'], summary['failed']), (5, 3, 1))
+        failures = jsonl_codec.read_jsonl(Path(summary['store']) / FAILURE_LOG)
+        self.assertEqual([(f['id'], f['field']) for f in failures], [('b', 'pratijna')])
+        self.assertIn('no parse', failures[0]['error'])
+
+        diagrams = list(load_diagrams(self.corpus, self.root, parser_spec=SPEC, parser_kwargs={}))
+        self.assertEqual(diagrams[0], ('a', 'pratijna', ('the', 'hill', 'has', 'fire')))
+        self.assertEqual(diagrams[3], ('b', 'pratijna', None))
+
+    def test_rerun_is_incremental(self):
+        self._run(workers=0)
+        summary = self._run(workers=0)
+        self.assertEqual((summary['parsed'], summary['failed'], summary['cached']), (0, 0, 4))
+        summary = self._run(workers=0, retry_failed=True)
+        self.assertEqual(summary['failed'], 1)
+
+    def test_process_pool_matches_in_process(self):
+        summary = self._run(workers=2)
+        self.assertEqual((summary['parsed'], summary['failed']), (3, 1))
+        self.assertEqual(summary['batches'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from src import corpus_store, jsonl_codec
+
+
+def _records(n):
+    return [{'id': f'e{i}', 'domain': 'Nyāya', 'pratijna': f'claim {i}'} for i in range(n)]
+
+
+class TestCorpusStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'approved.jsonl.gz')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_frames_and_random_access(self):
+        index = corpus_store.write_compressed(self.path, _records(25), records_per_frame=10)
+        self.assertEqual(index['records'], 25)
+        self.assertEqual([f['records'] for f in index['frames']], [10, 10, 5])
+
+        corpus = corpus_store.CompressedCorpus(self.path)
+        self.assertEqual(len(corpus), 25)
+        self.assertEqual(corpus.get(0)['id'], 'e0')
+        self.assertEqual(corpus.get(17)['id'], 'e17')
+        self.assertEqual(corpus.get(-1)['id'], 'e24')
+        with self.assertRaises(IndexError):
+            corpus.get(25)
+        self.assertEqual(list(corpus), _records(25))
+
+    def test_shared_loader_reads_compressed_transparently(self):
+        jsonl_codec.write_jsonl(self.path, _records(5))
+        self.assertTrue(os.path.exists(corpus_store.index_path(self.path)))
+        self.assertEqual(jsonl_codec.read_jsonl(self.path), _records(5))
+        with self.assertRaises(ValueError):
+            jsonl_codec.write_jsonl(self.path, _records(1), append=True)
+
+    def test_frames_are_a_valid_gzip_stream_without_index(self):
+        corpus_store.write_compressed(self.path, _records(12), records_per_frame=5)
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 12)
+        os.remove(corpus_store.index_path(self.path))
+        self.assertEqual(corpus_store.read_compressed(self.path), _records(12))
+
+
+    def test_index_of_another_write_is_ignored(self):
+        corpus_store.write_compressed(self.path, _records(12), records_per_frame=5)
+        with open(corpus_store.index_path(self.path), 'rb') as f:
+            old_index = f.read()
+        corpus_store.write_compressed(self.path, [dict(r, pratijna='other') for r in _records(12)],
+                                      records_per_frame=5)
+        # As if the corpus was replaced but the index write never happened
+        with open(corpus_store.index_path(self.path), 'wb') as f:
+            f.write(old_index)
+        corpus = corpus_store.CompressedCorpus(self.path)
+        self.assertIsNone(corpus.index)
+        self.assertEqual([r['pratijna'] for r in corpus], ['other'] * 12)
+        self.assertEqual(os.listdir(self.tmp.name).count('approved.jsonl.gz.frames.json.tmp'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
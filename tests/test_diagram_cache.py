@@ -0,0 +1,153 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.diagram_cache import FAILED, DiagramCache, LazyParser, ShardedStore, ansatz_config, is_failed, sentence_key
+
+
+class CountingParser:
+    """Stands in for a lambeq parser: records which sentences it was asked to parse."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def sentences2diagrams(self, sentences, suppress_exceptions=False):
+        self.calls.append(list(sentences))
+        out = []
+        for s in sentences:
+            if s in self.fail:
+                if not suppress_exceptions:
+                    raise ValueError(s)
+                out.append(None)
+            else:
+                out.append(('diagram', s))
+        return out
+
+
+class Diagram:
+    """Like lambeq diagrams, refuses to be compared with anything but another diagram."""
+
+    def __eq__(self, other):
+        if not isinstance(other, Diagram):
+            raise TypeError('cannot compare a diagram with %r' % type(other).__name__)
+        return True
+
+
+class TestDiagramCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cfg = {'parser': 'CountingParser'}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_new_sentences_are_parsed_across_sessions(self):
+        parser = CountingParser()
+        first = DiagramCache(self.tmp.name).diagrams(['a b', 'c'], parser, self.cfg)
+        self.assertEqual(first, [('diagram', 'a b'), ('diagram', 'c')])
+
+        cache = DiagramCache(self.tmp.name)
+        again = cache.diagrams(['c', 'd', 'a  b'], parser, self.cfg)
+        self.assertEqual(parser.calls, [['a b', 'c'], ['d']])
+        self.assertEqual(again, [('diagram', 'c'), ('diagram', 'd'), ('diagram', 'a b')])
+        self.assertEqual(cache.stats['diagram_hits'], 2)
+
+    def test_config_change_invalidates(self):
+        parser = CountingParser()
+        cache = DiagramCache(self.tmp.name)
+        cache.diagrams(['a'], parser, self.cfg)
+        cache.diagrams(['a'], parser, {'parser': 'CountingParser', 'model': 'other'})
+        self.assertEqual(len(parser.calls), 2)
+
+    def test_failures_are_remembered_unless_retried(self):
+        parser = CountingParser(fail={'bad'})
+        cache = DiagramCache(self.tmp.name)
+        out = cache.diagrams(['ok', 'bad'], parser, self.cfg, suppress_exceptions=True)
+        self.assertEqual(out, [('diagram', 'ok'), None])
+        cache.diagrams(['bad'], parser, self.cfg, suppress_exceptions=True)
+        self.assertEqual(len(parser.calls), 1)
+        parser.fail.clear()
+        out = cache.diagrams(['bad'], parser, self.cfg, retry_failed=True)
+        self.assertEqual(out, [('diagram', 'bad')])
+
+    def test_cached_diagrams_are_not_compared_with_the_failure_marker(self):
+        self.assertFalse(is_failed(Diagram()))
+        cache = DiagramCache(self.tmp.name)
+        store = cache.diagram_store(self.cfg)
+        store.put(sentence_key('a'), Diagram())
+        store.flush()
+        out = cache.diagrams(['a'], CountingParser(), self.cfg, retry_failed=True)
+        self.assertIsInstance(out[0], Diagram)
+
+    def test_lazy_parser_is_built_only_on_a_miss(self):
+        built = []
+
+        def factory():
+            built.append(CountingParser())
+            return built[-1]
+
+        DiagramCache(self.tmp.name).diagrams(['a'], LazyParser(factory), self.cfg)
+        DiagramCache(self.tmp.name).diagrams(['a'], LazyParser(factory), self.cfg)
+        self.assertEqual(len(built), 1)
+        self.assertEqual(built[0].calls, [['a']])
+
+    def test_circuits_cached_per_ansatz(self):
+        applied = []
+
+        def ansatz(diagram):
+            applied.append(diagram)
+            return ('circuit', diagram)
+
+        cache = DiagramCache(self.tmp.name)
+        diagrams = cache.diagrams(['x', 'y'], CountingParser(), self.cfg)
+        cache.circuits(['x', 'y'], diagrams, ansatz, self.cfg, {'ansatz': 'A'})
+        out = DiagramCache(self.tmp.name).circuits(['x', 'y'], diagrams, ansatz, self.cfg, {'ansatz': 'A'})
+        self.assertEqual(out, [('circuit', ('diagram', 'x')), ('circuit', ('diagram', 'y'))])
+        self.assertEqual(len(applied), 2)
+        cache.circuits(['x'], diagrams[:1], ansatz, self.cfg, {'ansatz': 'B'})
+        self.assertEqual(len(applied), 3)
+
+    def test_sharded_store_appends_only_new_entries(self):
+        store = ShardedStore(self.tmp.name)
+        keys = [sentence_key(str(i)) for i in range(50)]
+        for k in keys:
+            store.put(k, k[:4])
+        self.assertGreater(store.flush(), 1)
+        sizes = {p.name: p.stat().st_size for p in Path(self.tmp.name).glob('shard_*.log')}
+        store.put(keys[0], 'new')
+        self.assertEqual(store.flush(), 1)
+        grown = {p.name for p in Path(self.tmp.name).glob('shard_*.log') if p.stat().st_size != sizes[p.name]}
+        self.assertEqual(grown, {f"shard_{keys[0][:2]}.log"})
+
+        reopened = ShardedStore(self.tmp.name)
+        self.assertEqual(len(reopened), 50)
+        self.assertEqual(reopened.get(keys[0]), 'new')
+        self.assertEqual(reopened.compact(), 1)
+        self.assertEqual(dict(ShardedStore(self.tmp.name).items()), {k: 'new' if k == keys[0] else k[:4] for k in keys})
+
+    def test_sharded_store_ignores_a_torn_tail(self):
+        store = ShardedStore(self.tmp.name)
+        key = sentence_key('a')
+        store.put(key, 'kept')
+        store.flush()
+        log = Path(self.tmp.name) / f"shard_{key[:2]}.log"
+        with log.open('ab') as f:
+            f.write(b'\x00\x40partial')
+        reopened = ShardedStore(self.tmp.name)
+        self.assertEqual(reopened.get(key), 'kept')
+        other = key[:2] + '0' * 62
+        reopened.put(other, FAILED)
+        reopened.flush()
+        again = ShardedStore(self.tmp.name)
+        self.assertEqual((again.get(key), again.failed(other)), ('kept', True))
+
+    def test_ansatz_config_includes_type_map(self):
+        class Ansatz:
+            ob_map = {'n': 2, 's': 2}
+        self.assertEqual(ansatz_config(Ansatz())['ob_map'], [('n', '2'), ('s', '2')])
+
+
+if __name__ == '__main__':
+    unittest.main()
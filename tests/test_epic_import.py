@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.epic_import import import_text, read_plain, read_tei
+
+PLAIN = """BOOK I
+Arma virumque cano, Troiae qui primus ab oris
+Italiam fato profugus Laviniaque venit
+
+litora, multum ille et terris iactatus et alto
+vi superum saevae memorem Iunonis ob iram;
+multa quoque et bello passus, dum conderet urbem,  5
+Liber II
+Conticuere omnes intentique ora tenebant
+"""
+
+TEI = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><title>Ilias</title></teiHeader>
+<text><body><div type="textpart" subtype="book" n="1">
+<l n="1">μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος<note>proem</note></l>
+<l>οὐλομένην, ἣ μυρί᾽ Ἀχαιοῖς ἄλγε᾽ ἔθηκε,</l>
+<l n="5">Διὸς δ᾽ ἐτελείετο βουλή,</l>
+</div></body></text></TEI>"""
+
+
+class TestEpicImport(unittest.TestCase):
+
+    def test_plain_text_alignment(self):
+        lines = list(read_plain(PLAIN))
+        self.assertEqual([(ln.book, ln.line) for ln in lines],
+                         [('1', 1), ('1', 2), ('1', 3), ('1', 4), ('1', 5), ('2', 1)])
+        self.assertTrue(lines[4].text.endswith('urbem,'))
+        numbered = list(read_plain('10 arma virumque cano\nTroiae qui primus', book='3'))
+        self.assertEqual([(ln.book, ln.line) for ln in numbered], [('3', 10), ('3', 11)])
+
+    def test_tei_lines(self):
+        lines = list(read_tei(TEI))
+        self.assertEqual([(ln.book, ln.line) for ln in lines], [('1', 1), ('1', 2), ('1', 5)])
+        self.assertEqual(lines[0].text, 'μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος')
+
+    def test_import_writes_records_and_skips_existing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / 'epic_lines.jsonl'
+            summary = import_text(PLAIN, 'Aeneid', out, workers=0)
+            self.assertEqual((summary['language'], summary['written']), ('latin', 6))
+            recs = jsonl_codec.read_jsonl(out)
+            self.assertEqual(recs[0]['work'], 'Aeneid')
+            self.assertEqual((recs[0]['book'], recs[0]['line']), ('1', 1))
+            self.assertIn('DDSSD', recs[0]['latin_meter'])
+
+            again = import_text(PLAIN, 'Aeneid', out, workers=0, skip_existing=True)
+            self.assertEqual((again['written'], again['skipped_existing']), (0, 6))
+            greek = import_text(TEI, 'Iliad', out, workers=2, skip_existing=True)
+            self.assertEqual((greek['language'], greek['written']), ('greek', 3))
+            self.assertEqual(len(jsonl_codec.read_jsonl(out)), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
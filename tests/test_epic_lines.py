@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.epic_lines import EpicLines, file_fingerprint, fold, page_count
+
+LINES = [
+    {'ancient_greek_text': 'μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος', 'english_translation': 'Sing, goddess, the wrath'},
+    {'latin_text': 'Arma virumque cano', 'english_translation': 'Arms and the man I sing'},
+    {'ancient_greek_text': 'ἄνδρα μοι ἔννεπε, μοῦσα', 'english_translation': 'Tell me, Muse, of the man'},
+]
+
+
+class TestEpicLines(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'epic_lines.jsonl'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refresh_reads_only_appended_lines(self):
+        store = EpicLines(self.path)
+        self.assertEqual(store.refresh(), 0)
+        jsonl_codec.write_jsonl(self.path, LINES[:2])
+        self.assertEqual(store.refresh(), 2)
+        self.assertEqual(store.refresh(), 0)
+        with self.path.open('ab') as f:
+            f.write(b'{not json}\n{"latin_text": "partial')
+        self.assertEqual(store.refresh(), 0)
+        self.assertEqual(store.malformed, 1)
+        with self.path.open('ab') as f:
+            f.write(b'"}\n')
+        self.assertEqual(store.refresh(), 1)
+        self.assertEqual(store.records[-1], {'latin_text': 'partial'})
+
+    def test_rewritten_file_is_reloaded(self):
+        store = EpicLines(self.path)
+        jsonl_codec.write_jsonl(self.path, LINES)
+        store.refresh()
+        jsonl_codec.write_jsonl(self.path, LINES[:1])
+        store.refresh()
+        self.assertEqual(store.records, LINES[:1])
+
+    def test_rewritten_in_place_is_reloaded(self):
+        store = EpicLines(self.path)
+        jsonl_codec.write_jsonl(self.path, LINES[:2])
+        store.refresh()
+        generation = store.generation
+        # Same inode, same size, then larger: the stored offset no longer ends a known line
+        data = self.path.read_bytes()
+        with self.path.open('r+b') as f:
+            f.write(data.replace(b'cano', b'CANO'))
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(store.refresh(), 2)
+        self.assertEqual(store.records[1]['latin_text'], 'Arma virumque CANO')
+        with self.path.open('r+b') as f:
+            f.write(b'{"latin_text": "x"}\n' + data)
+        self.assertEqual(store.refresh(), 3)
+        self.assertEqual(store.records[0], {'latin_text': 'x'})
+        self.assertEqual(store.generation, generation + 2)
+        self.assertEqual(store.refresh(), 0)
+
+    def test_append_and_filter(self):
+        store = EpicLines(self.path)
+        self.assertEqual(store.append(LINES), 0)
+        self.assertEqual(store.append(LINES[:1]), 3)
+        self.assertEqual(store.filter('μηνιν'), [0, 3])
+        self.assertEqual(store.filter('man', has=('latin_text',)), [1])
+        self.assertEqual(store.filter(where={'latin_text': 'Arma virumque cano'}), [1])
+        self.assertEqual(store.page(store.filter(), 1, 3), [LINES[0]])
+        self.assertEqual(page_count(4, 3), 2)
+        self.assertEqual(page_count(0, 3), 1)
+
+    def test_fold_and_fingerprint(self):
+        self.assertEqual(fold('Ἀχιλῆος'), fold('αχιληοσ'))
+        self.assertEqual(file_fingerprint(self.path), (0, 0))
+        jsonl_codec.write_jsonl(self.path, LINES)
+        self.assertEqual(file_fingerprint(self.path)[0], os.path.getsize(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.evidence_verifier import EvidenceVerifier, is_generic_url, summarize
+from src.source_notes import SourceNotesIndex
+
+NOTE = """URL: https://iep.utm.edu/al-ghazali/
+Provider: iep
+Title: Al-Ghazali
+
+Key points (bullets)
+- Occasionalism: fire does not intrinsically burn cotton; God creates the conjunction.
+- Doubt is a pedagogical step toward certainty through a divine light.
+- Practical spirituality informs ethics.
+"""
+
+SOURCE = 'Islamic Philosophy / IEP: Al-Ghazali, https://iep.utm.edu/al-ghazali/ (accessed 2025-08-15)'
+
+
+class TestEvidenceVerifier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / 'iep').mkdir()
+        (root / 'iep' / 'al-ghazali_iep_20250815.txt').write_text(NOTE, encoding='utf-8')
+        self.verifier = EvidenceVerifier(SourceNotesIndex.open(root))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_supported_entry(self):
+        v = self.verifier.verify({
+            'hetu': 'Fire does not intrinsically burn cotton; God creates the conjunction.',
+            'udaharana': 'Methodical doubt leads to certainty through divine light.',
+            'grounding_authority': SOURCE,
+        })
+        self.assertEqual(v.verdict, 'supported')
+        self.assertEqual(v.evidence['hetu'], 'iep/al-ghazali_iep_20250815.txt#0')
+        self.assertEqual(v.evidence['udaharana'], 'iep/al-ghazali_iep_20250815.txt#1')
+        self.assertGreater(v.support['hetu'], v.support['udaharana'])
+        self.assertLessEqual(v.support['hetu'], 1.0)
+
+    def test_partial_and_unsupported(self):
+        partial = self.verifier.verify({'hetu': 'Fire does not burn cotton by itself.',
+                                        'udaharana': 'A falling apple.', 'grounding_authority': SOURCE})
+        self.assertEqual(partial.verdict, 'partial')
+        self.assertEqual(partial.support['udaharana'], 0.0)
+        self.assertIsNone(partial.evidence['udaharana'])
+        unsupported = self.verifier.verify({'hetu': 'Markets clear.', 'udaharana': 'Prices fall.',
+                                            'grounding_authority': SOURCE})
+        self.assertEqual(unsupported.verdict, 'unsupported')
+
+    def test_unresolved_and_generic(self):
+        generic = {'hetu': 'x', 'grounding_authority': 'Reference / Wikipedia, https://en.wikipedia.org/'}
+        unresolved = {'hetu': 'x', 'grounding_authority': 'SEP: Karma, https://plato.stanford.edu/entries/karma/'}
+        verdicts = self.verifier.verify_all([generic, unresolved, {'hetu': 'x'}])
+        self.assertEqual([v.verdict for v in verdicts], ['generic', 'unresolved', 'unresolved'])
+        self.assertTrue(is_generic_url('https://ashtadhyayi.com/'))
+        self.assertFalse(is_generic_url('https://en.wikipedia.org/wiki/Hanuman_Chalisa'))
+        self.assertEqual(summarize(verdicts)['verdicts'], {'generic': 1, 'unresolved': 2})
+
+    def test_note_vectors_are_cached(self):
+        note = next(iter(self.verifier.index.notes.values()))
+        self.assertIs(self.verifier.note_vectors(note), self.verifier.note_vectors(note))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.hexameter import annotate_record, scan_file, scan_line, scan_lines, word_shape
+
+
+class TestHexameter(unittest.TestCase):
+
+    def test_latin_lines(self):
+        self.assertEqual(scan_line('Arma virumque cano, Troiae qui primus ab oris').feet, 'DDSSD')
+        # elision of -e before a vowel (conticuer(e) omnes, intentiqu(e) ora)
+        result = scan_line('conticuere omnes intentique ora tenebant', 'latin')
+        self.assertEqual(result.feet, 'DSSSD')
+        self.assertEqual(result.syllables, 14)
+
+    def test_greek_lines(self):
+        result = scan_line('μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος')
+        self.assertEqual(result.language, 'greek')
+        self.assertEqual((result.feet, result.synizeses), ('DDSDD', 1))
+        self.assertEqual(result.pattern, '- u u | - u u | - - | - u u | - u u | - x')
+        self.assertEqual(scan_line('ἄνδρα μοι ἔννεπε, μοῦσα, πολύτροπον, ὃς μάλα πολλὰ').feet, 'DDDDD')
+
+    def test_word_quantities(self):
+        shape = word_shape('Τροίης', 'greek')
+        self.assertEqual([sorted(n.nature) for n in shape.nuclei], [['L'], ['L']])
+        self.assertTrue(word_shape('arma', 'latin').elidable)
+        self.assertEqual(word_shape('quid', 'latin').lead, 1)  # qu is one consonant
+
+    def test_unscannable_and_batch(self):
+        results = scan_lines(['arma cano', 'Arma virumque cano, Troiae qui primus ab oris'])
+        self.assertFalse(results[0].ok)
+        self.assertIn('No hexameter', results[0].describe())
+        self.assertTrue(results[1].describe().startswith('Meter: - u u'))
+
+    def test_annotate_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'epic_lines.jsonl'
+            jsonl_codec.write_jsonl(path, [{'latin_text': 'Arma virumque cano, Troiae qui primus ab oris'},
+                                           {'ancient_greek_text': 'μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος',
+                                            'greek_meter': 'kept'}])
+            self.assertEqual(scan_file(path)['records'], 2)
+            recs = jsonl_codec.read_jsonl(path)
+            self.assertIn('DDSSD', recs[0]['latin_meter'])
+            self.assertEqual(recs[1]['greek_meter'], 'kept')
+            self.assertIn('DDSDD', annotate_record(recs[1], overwrite=True)['greek_meter'])
+
+
+if __name__ == '__main__':
+    unittest.main()
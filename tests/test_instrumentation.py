@@ -0,0 +1,50 @@
+import unittest
+
+from src.instrumentation import Tracer
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = Tracer()
+
+    def test_span_records_metrics_and_nesting(self):
+        with self.tracer.span('outer', records=3) as outer:
+            outer.add_io(read=100)
+            with self.tracer.span('inner') as inner:
+                inner.add_records(2)
+                inner.add_io(written=50)
+
+        rows = {row['name']: row for row in self.tracer.summary()}
+        self.assertEqual(rows['outer']['records'], 3)
+        self.assertEqual(rows['outer']['bytes_read'], 100)
+        self.assertEqual(rows['inner']['parent'], 'outer')
+        self.assertEqual(rows['inner']['bytes_written'], 50)
+        self.assertGreaterEqual(rows['outer']['wall_s'], rows['inner']['wall_s'])
+
+    def test_traced_decorator_counts_result(self):
+        @self.tracer.traced('load')
+        def load():
+            return [1, 2, 3, 4]
+
+        self.assertEqual(load(), [1, 2, 3, 4])
+        self.assertEqual(self.tracer.summary()[0]['records'], 4)
+
+    def test_error_is_recorded_and_reraised(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span('fails'):
+                raise ValueError('boom')
+        self.assertIn('ValueError', self.tracer.summary()[0]['meta']['error'])
+
+    def test_chrome_trace_events(self):
+        with self.tracer.span('stage', records=1):
+            pass
+        trace = self.tracer.chrome_trace()
+        event = trace['traceEvents'][0]
+        self.assertEqual(event['ph'], 'X')
+        self.assertEqual(event['name'], 'stage')
+        self.assertEqual(event['args']['records'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from src import jsonl_codec
+
+ENTRY = {
+    'domain': 'Sanskrit Grammar / Kāraka',
+    'pratijna': 'p', 'hetu': 'h', 'udaharana': 'u', 'upanaya': 'up', 'nigamana': 'n',
+    'grounding_authority': 'Pāṇini',
+    'cultural_tradition': 'Non-Western',
+    'custom_field': {'kept': True},
+}
+
+
+class TestJsonlCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'corpus.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_preserves_all_fields(self):
+        self.assertEqual(jsonl_codec.write_jsonl(self.path, [ENTRY, ENTRY]), 2)
+        self.assertEqual(jsonl_codec.read_jsonl(self.path), [ENTRY, ENTRY])
+        jsonl_codec.write_jsonl(self.path, [ENTRY], append=True)
+        self.assertEqual(len(jsonl_codec.read_jsonl(self.path)), 3)
+
+    def test_canonical_line_format(self):
+        self.assertEqual(jsonl_codec.dumps({'a': 'ā', 'b': [1, 2]}), '{"a":"ā","b":[1,2]}')
+
+    def test_bom_blank_lines_and_skip(self):
+        with open(self.path, 'w', encoding='utf-8-sig') as f:
+            f.write('{"a": 1}\n\n{broken\n{"a": 2}\n')
+        self.assertEqual(jsonl_codec.read_jsonl(self.path, errors='skip'), [{'a': 1}, {'a': 2}])
+        with self.assertRaises(ValueError):
+            jsonl_codec.read_jsonl(self.path)
+
+    def test_missing_ok(self):
+        self.assertEqual(jsonl_codec.read_jsonl(self.path, missing_ok=True), [])
+        with self.assertRaises(FileNotFoundError):
+            jsonl_codec.read_jsonl(self.path)
+
+    def test_typed_entries_validate_schema(self):
+        entry = jsonl_codec.decode_entry(jsonl_codec.dumps(ENTRY))
+        self.assertEqual(entry.grounding_authority, 'Pāṇini')
+        self.assertEqual(entry.cultural_tradition, 'Non-Western')
+        self.assertNotIn('custom_field', entry.to_dict())
+
+        missing = dict(ENTRY, hetu='')
+        with self.assertRaises(jsonl_codec.SchemaError):
+            jsonl_codec.decode_entry(jsonl_codec.dumps(missing))
+
+        self.assertEqual(jsonl_codec.entry_from_dict(ENTRY), entry)
+        with self.assertRaises(jsonl_codec.SchemaError):
+            jsonl_codec.entry_from_dict(missing)
+        for bad in ({'id': 123}, {'staging_round': True}, {'cultural_traditions': ['Nyāya', 1]},
+                    {'batch_metadata': []}):
+            with self.assertRaises(jsonl_codec.SchemaError):
+                jsonl_codec.entry_from_dict(dict(ENTRY, **bad))
+            with self.assertRaises(jsonl_codec.SchemaError):
+                jsonl_codec.decode_entry(jsonl_codec.dumps(dict(ENTRY, **bad)))
+        self.assertEqual(jsonl_codec.entry_from_dict(dict(ENTRY, staging_round=2)).staging_round, 2)
+
+        jsonl_codec.write_jsonl(self.path, [ENTRY, missing, ENTRY])
+        self.assertEqual(len(jsonl_codec.read_entries(self.path, errors='skip')), 2)
+        with self.assertRaises(ValueError):
+            jsonl_codec.read_entries(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from src import jsonl_codec
+from src.jsonl_index import JsonlIndex, index_path
+
+
+def _recs(start, stop):
+    return [{'id': f'e{i}', 'pratijna': f'claim {i}'} for i in range(start, stop)]
+
+
+class TestJsonlIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'round_clean.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_random_access_slicing_and_ids(self):
+        with open(self.path, 'w', encoding='utf-8-sig') as f:
+            f.write('{"id": "e0"}\n\n{"pratijna": "no id"}\n{"id": "e2"}\n')
+        with JsonlIndex(self.path) as index:
+            self.assertTrue(index_path(self.path).exists())
+            self.assertEqual(len(index), 3)
+            self.assertEqual(index.get(0), {'id': 'e0'})
+            self.assertEqual(index[-1], {'id': 'e2'})
+            self.assertEqual(index[1:], [{'pratijna': 'no id'}, {'id': 'e2'}])
+            self.assertEqual(index.get_by_id('e2'), {'id': 'e2'})
+            with self.assertRaises(KeyError):
+                index.get_by_id('missing')
+
+    def test_maintained_on_append_and_rebuilt_on_rewrite(self):
+        jsonl_codec.write_jsonl(self.path, _recs(0, 5))
+        JsonlIndex(self.path).close()
+
+        jsonl_codec.write_jsonl(self.path, _recs(5, 8), append=True)
+        with open(index_path(self.path), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 1 + 8)
+
+        jsonl_codec.write_jsonl(self.path, _recs(100, 102))
+        with JsonlIndex(self.path) as index:
+            self.assertEqual(index[:], _recs(100, 102))
+
+    def test_foreign_appends_are_picked_up(self):
+        jsonl_codec.write_jsonl(self.path, _recs(0, 3))
+        JsonlIndex(self.path).close()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"id": "late"}\n')
+        with JsonlIndex(self.path) as index:
+            self.assertEqual(len(index), 4)
+            self.assertEqual(index.position_of('late'), 3)
+
+    def test_same_length_rewrite_is_rebuilt(self):
+        jsonl_codec.write_jsonl(self.path, [{'id': 'a'}, {'id': 'b'}])
+        JsonlIndex(self.path).close()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"id": "x"}\n{"id": "y"}\n')
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        with JsonlIndex(self.path) as index:
+            self.assertEqual(index.get(0), {'id': 'x'})
+            with self.assertRaises(KeyError):
+                index.get_by_id('a')
+
+    def test_rewritten_tail_is_rebuilt_not_extended(self):
+        jsonl_codec.write_jsonl(self.path, _recs(0, 2))
+        JsonlIndex(self.path).close()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"id": "e0", "pratijna": "claim 0"}\n{"id": "zz", "pratijna": "claim 1"}\n{"id": "e9"}\n')
+        with JsonlIndex(self.path) as index:
+            self.assertEqual(index.ids, ['e0', 'zz', 'e9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import codecs
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.jsonl_repair import RepairError, RepairReport, iter_objects, repair_file
+
+
+def pretty(*objs):
+    return '\n'.join(json.dumps(o, ensure_ascii=False, indent=4) for o in objs) + '\n'
+
+
+class TestJsonlRepair(unittest.TestCase):
+
+    def setUp(self):
+        self.objs = [{'id': i, 'pratijna': f'ṣaṭ {i} — {{brace}} "quoted"'} for i in range(20)]
+
+    def test_pretty_objects_across_small_chunks(self):
+        data = ('﻿' + pretty(*self.objs)).encode('utf-8')
+        got = list(iter_objects(io.BytesIO(data), chunk_size=7))
+        self.assertEqual(got, self.objs)
+
+    def test_json_array_export(self):
+        data = json.dumps(self.objs, indent=2, ensure_ascii=False).encode('utf-8')
+        self.assertEqual(list(iter_objects(io.BytesIO(data), chunk_size=16)), self.objs)
+
+    def test_broken_object_reports_byte_offset_and_resyncs(self):
+        good = pretty(self.objs[0])
+        bad = '{\n    "id": 1,\n    "pratijna": oops\n}\n'
+        data = (good + bad + pretty(self.objs[2])).encode('utf-8')
+
+        with self.assertRaises(RepairError) as ctx:
+            list(iter_objects(io.BytesIO(data), chunk_size=8))
+        self.assertEqual(ctx.exception.broken.byte_offset, len(good.encode('utf-8')))
+
+        report = RepairReport()
+        got = list(iter_objects(io.BytesIO(data), resync=True, chunk_size=8, report=report))
+        self.assertEqual(got, [self.objs[0], self.objs[2]])
+        self.assertEqual(len(report.broken), 1)
+
+    def test_byte_offsets_count_the_bom(self):
+        good = pretty(self.objs[0])
+        data = codecs.BOM_UTF8 + (good + '{"id": oops}\n').encode('utf-8')
+        for chunk_size in (2, 8):
+            with self.assertRaises(RepairError) as ctx:
+                list(iter_objects(io.BytesIO(data), chunk_size=chunk_size))
+            self.assertEqual(ctx.exception.broken.byte_offset, 3 + len(good.encode('utf-8')))
+
+    def test_unterminated_object_is_skipped(self):
+        data = ('{\n  "id": 1,\n  "x": "y"\n' + pretty(self.objs[3])).encode('utf-8')
+        got = list(iter_objects(io.BytesIO(data), resync=True, chunk_size=5))
+        self.assertEqual(got, [self.objs[3]])
+
+    def test_repair_file_writes_canonical_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, 'in.jsonl')
+            dst = os.path.join(tmp, 'out.jsonl')
+            with open(src, 'w', encoding='utf-8') as f:
+                f.write(pretty(*self.objs) + '{"id": 99, "trunc')
+            report = repair_file(src, dst, resync=True, chunk_size=32)
+
+            with open(dst, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertEqual([json.loads(l) for l in lines], self.objs)
+            self.assertEqual(report.objects_written, len(self.objs))
+            self.assertEqual(report.broken[0].reason, 'truncated object at end of input')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.epic_lines import EpicLines
+from src.morphemes import MorphemeIndex, build_index, parse_breakdown
+
+LINES = [
+    {'ancient_greek_text': 'μῆνιν ἄειδε θεὰ', 'morpheme_breakdown': 'μῆνιν:μῆνι-ν|wrath; ἄειδε:ἀειδ-ε|sing'},
+    {'latin_text': 'Arma virumque cano', 'morpheme_breakdown': 'arma:arm-a|arms virumque:vir-um-que|and the man'},
+    {'ancient_greek_text': 'Πηληϊάδεω Ἀχιλῆος', 'morpheme_breakdown': 'Ἀχιλῆος:Ἀχιλευ-GEN|of Achilles'},
+]
+
+
+class TestParseBreakdown(unittest.TestCase):
+
+    def test_tokens(self):
+        tokens = parse_breakdown(LINES[0]['morpheme_breakdown'])
+        self.assertEqual([t.word for t in tokens], ['μῆνιν', 'ἄειδε'])
+        self.assertEqual(tokens[0].morphemes, ['μῆνι', 'ν'])
+        self.assertEqual(tokens[0].lemma, 'μῆνι')
+        self.assertEqual(tokens[0].translation, 'wrath')
+        self.assertEqual(tokens[1].position, 1)
+
+    def test_whitespace_separated_translations(self):
+        tokens = parse_breakdown(LINES[1]['morpheme_breakdown'])
+        self.assertEqual([t.translation for t in tokens], ['arms', 'and the man'])
+
+    def test_cases(self):
+        self.assertEqual(parse_breakdown(LINES[0]['morpheme_breakdown'])[0].cases, ('ACC',))
+        self.assertEqual(parse_breakdown(LINES[1]['morpheme_breakdown'])[0].cases, ('NOM', 'ABL'))
+        tagged = parse_breakdown(LINES[2]['morpheme_breakdown'])[0]
+        self.assertEqual(tagged.cases, ('GEN',))
+        self.assertEqual(tagged.morphemes, ['Ἀχιλευ'])
+
+    def test_verbal_endings_need_a_nominal_tag(self):
+        cases = lambda text: [t.cases for t in parse_breakdown(text)]
+        self.assertEqual(cases('cano:can-o|I sing'), [()])
+        self.assertEqual(cases('viro:vir-o-NOUN|to the man'), [('DAT', 'ABL')])
+        self.assertEqual(cases('λύω:λυ-ω|I loose; ἵππῳ:ἱππ-ω-NOUN|horse'), [(), ('DAT',)])
+        self.assertEqual(cases('amata:amat-a-VERB|loved'), [()])
+        self.assertEqual(cases('ἵππῳ:ἱππ-ῳ|horse; θεῷ:θε-ῷ|god'), [('DAT',), ('DAT',)])
+        self.assertEqual(parse_breakdown('viro:vir-o-NOUN')[0].morphemes, ['vir', 'o'])
+
+    def test_only_uppercase_tags_after_the_lemma(self):
+        for text, lemma, cases in (('genus:gen-us', 'gen', ('NOM',)), ('vocat:voc-at', 'voc', ()),
+                                   ('datus:dat-us', 'dat', ('NOM',)), ('regis:reg-gen', 'reg', ())):
+            token = parse_breakdown(text)[0]
+            self.assertEqual((token.lemma, token.cases), (lemma, cases), text)
+        self.assertEqual(parse_breakdown('GEN:GEN-us')[0].morphemes, ['GEN', 'us'])
+
+    def test_empty(self):
+        self.assertEqual(parse_breakdown(''), [])
+        self.assertEqual(parse_breakdown(None), [])
+        self.assertEqual(parse_breakdown('no colon here'), [])
+
+
+class TestMorphemeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'epic_lines.jsonl'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup(self):
+        index = build_index(LINES)
+        self.assertEqual(index.lookup('μηνι', 'lemma'), [(0, 0)])
+        self.assertEqual(index.lines_with('VIR'), [1])
+        self.assertEqual(index.lines_with('gen', 'case'), [2])
+        self.assertEqual(index.lines_with('ACC', 'case'), [0])
+        self.assertEqual(index.lines_with('missing'), [])
+
+    def test_update_is_incremental(self):
+        store = EpicLines(self.path)
+        jsonl_codec.write_jsonl(self.path, LINES[:2])
+        store.refresh()
+        index = MorphemeIndex()
+        self.assertEqual(index.update(store), 2)
+        self.assertEqual(index.update(store), 0)
+        store.append(LINES[2:])
+        self.assertEqual(index.update(store), 1)
+        self.assertEqual(index.lines_with('Ἀχιλευ'), [2])
+
+    def test_reloaded_store_is_reindexed(self):
+        store = EpicLines(self.path)
+        jsonl_codec.write_jsonl(self.path, LINES)
+        store.refresh()
+        index = MorphemeIndex()
+        index.update(store)
+        self.path.unlink()
+        jsonl_codec.write_jsonl(self.path, LINES[1:2])
+        store.refresh()
+        index.update(store)
+        self.assertEqual(index.lines_with('vir'), [0])
+        self.assertEqual(index.lines_with('μηνι'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.review_evaluator import (RoundEvaluator, content_hash, improvement_queue, length_score,
+                                  scorer_name)
+
+CALLS = []
+
+
+def counting_score(record):
+    CALLS.append(record['id'])
+    return {'score': len(record['hetu']) / 10, 'feedback': 'ok'}
+
+
+def failing_score(record):
+    raise ValueError('boom')
+
+
+def make_records(n):
+    return [{'id': f'r{i}', 'domain': 'D / S', 'pratijna': 'p', 'hetu': 'h' * (i % 7), 'udaharana': 'u',
+             'upanaya': 'up', 'nigamana': 'n', 'grounding_authority': 'g', 'status': 'queued'} for i in range(n)]
+
+
+class TestReviewEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        CALLS.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_hash_ignores_review_metadata(self):
+        a, b = make_records(1)[0], dict(make_records(1)[0], status='approved', notes='x', hetu='changed')
+        self.assertEqual(content_hash(a), content_hash(dict(a, status='approved', notes='x')))
+        self.assertNotEqual(content_hash(a), content_hash(b))
+
+    def test_parallel_round_matches_serial(self):
+        records = make_records(300)
+        evaluator = RoundEvaluator(cache_path=self.dir / 'cache.jsonl', workers=2, chunk_size=16)
+        results = evaluator.evaluate_round(records)
+        self.assertEqual(len(results), 300)
+        for r in records:
+            self.assertEqual(r['eval'], length_score(r))
+
+    def test_cache_and_ledger(self):
+        records = make_records(20)
+        ledger = self.dir / 'ledger.jsonl'
+        evaluator = RoundEvaluator(counting_score, self.dir / 'cache.jsonl', workers=1, executor='thread')
+        evaluator.evaluate_round(records, ledger)
+        self.assertEqual(len(CALLS), 7)  # duplicate contents are scored once
+        rows = jsonl_codec.read_jsonl(ledger)
+        self.assertEqual(sorted(r['id'] for r in rows), sorted(r['id'] for r in records))
+        self.assertTrue(all(r['decision'] == 'evaluated' for r in rows))
+
+        reopened = RoundEvaluator(counting_score, self.dir / 'cache.jsonl', workers=1)
+        reopened.evaluate_round(records)
+        self.assertEqual(len(CALLS), 7)
+        edited = dict(records[0], hetu='longer hetu')
+        self.assertEqual(reopened.evaluate(edited)['score'], 1.1)
+        self.assertEqual(len(CALLS), 8)
+        self.assertNotEqual(scorer_name(counting_score), scorer_name(length_score))
+
+    def test_rerun_logs_only_new_evaluations(self):
+        records = make_records(20)
+        ledger = self.dir / 'ledger.jsonl'
+        evaluator = RoundEvaluator(counting_score, self.dir / 'cache.jsonl', workers=1)
+        evaluator.evaluate_round(records, ledger)
+        evaluator.evaluate_round(records, ledger)
+        self.assertEqual(len(jsonl_codec.read_jsonl(ledger)), 20)
+        records[0]['hetu'] = 'hhhhhhhhh'
+        evaluator.evaluate_round(records, ledger)
+        self.assertEqual([r['id'] for r in jsonl_codec.read_jsonl(ledger)[20:]], ['r0'])
+
+    def test_errors_are_reported_not_cached(self):
+        records = make_records(2)
+        evaluator = RoundEvaluator(failing_score, self.dir / 'cache.jsonl', workers=1)
+        evaluator.evaluate_round(records)
+        self.assertIn('boom', records[0]['eval']['feedback'])
+        self.assertFalse((self.dir / 'cache.jsonl').exists())
+        self.assertEqual(len(improvement_queue(records)), 2)
+
+    def test_improvement_queue(self):
+        records = make_records(3)
+        RoundEvaluator(counting_score, workers=1).evaluate_round(records)
+        records[2]['status'] = 'disapproved'
+        queue = improvement_queue(records, threshold=0.15)
+        self.assertEqual([q['record']['hetu'] for q in queue], ['', 'h', 'hh'])
+        self.assertEqual(queue[0]['feedback'], 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
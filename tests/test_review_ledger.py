@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src import jsonl_codec
+from src.review_ledger import ReviewLedger, apply_state, decision_row, evaluation_row
+
+
+def rec(i, **kw):
+    r = {'id': f'r{i}', 'domain': 'D / S', 'pratijna': f'p{i}', 'hetu': 'h', 'udaharana': 'u', 'upanaya': 'up',
+         'nigamana': 'n', 'grounding_authority': 'g', 'status': 'queued'}
+    r.update(kw)
+    return r
+
+
+class TestReviewLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'ledger.jsonl'
+        self.ledger = ReviewLedger(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_latest_status(self):
+        self.ledger.record_decision('approved', rec(0, status='approved'))
+        self.ledger.record_decision('disapproved', rec(1, status='disapproved'))
+        self.ledger.append([evaluation_row('r2', {'score': 0.3})])
+        self.ledger.record_decision('edited', rec(1), rec(1, pratijna='better', status='edited'))
+        state = self.ledger.replay()
+        self.assertEqual(self.ledger.status_index(), {'r0': 'approved', 'r1': 'edited', 'r2': 'queued'})
+        self.assertEqual(state['r1']['record']['pratijna'], 'better')
+        self.assertEqual(state['r2']['eval'], {'score': 0.3})
+        with self.assertRaises(ValueError):
+            decision_row('maybe', rec(0))
+
+    def test_compaction_is_incremental(self):
+        self.ledger.append(decision_row('approved', rec(i)) for i in range(50))
+        self.assertEqual(self.ledger.compact()['applied'], 50)
+        self.assertEqual(self.ledger.compact()['applied'], 0)
+        self.ledger.record_decision('disapproved', rec(3))
+        self.ledger.record_decision('approved', rec(50))
+        self.assertEqual(self.ledger.compact()['applied'], 2)
+        ids = [e['id'] for e in self.ledger.iter_entries()]
+        self.assertEqual(ids, [f'r{i}' for i in range(51)])
+        self.assertEqual(self.ledger.status_counts(), {'approved': 50, 'disapproved': 1})
+        # replay after compaction reads only the tail
+        with self.path.open('ab') as f:
+            f.write(b'{"id": "r4", "decision": "disapproved", "after": {"id": "r4"}}\n{"id": "r5", "dec')
+        self.assertEqual(self.ledger.status_index()['r4'], 'disapproved')
+        self.assertEqual(self.ledger.status_index()['r5'], 'approved')
+
+    def test_replaced_ledger_invalidates_checkpoint(self):
+        self.ledger.append(decision_row('approved', rec(i)) for i in range(3))
+        self.ledger.compact()
+        self.path.unlink()
+        self.ledger.record_decision('disapproved', rec(9))
+        self.assertEqual(self.ledger.status_index(), {'r9': 'disapproved'})
+
+    def test_rewritten_ledger_tail_invalidates_checkpoint(self):
+        self.ledger.append(decision_row('approved', rec(i)) for i in range(50))
+        self.ledger.compact()
+        self.assertGreater(self.path.stat().st_size, 4096)
+        # Same length, same inode, same first bytes: only the last covered line changes
+        data = self.path.read_bytes()
+        cut = data.rindex(b'"decision":"approved"')
+        with self.path.open('r+b') as f:
+            f.seek(cut)
+            f.write(b'"decision":"edited",  ')
+        self.assertEqual(self.path.stat().st_size, len(data))
+        self.assertEqual(self.ledger.status_index()['r49'], 'edited')
+
+    def test_write_approved_snapshot(self):
+        self.ledger.record_decision('approved', rec(0))
+        self.ledger.record_decision('approved', rec(1))
+        self.ledger.record_decision('edited', rec(2), rec(2, hetu='h2'))
+        self.ledger.compact()
+        self.ledger.record_decision('disapproved', rec(1))
+        out = Path(self.tmp.name) / 'approved.jsonl'
+        self.assertEqual(self.ledger.write_approved(out), 2)
+        rows = jsonl_codec.read_jsonl(out)
+        self.assertEqual([r['pratijna'] for r in rows], ['p0', 'p2'])
+        self.assertEqual(rows[1]['hetu'], 'h2')
+        self.assertNotIn('status', rows[0])
+
+    def test_apply_state(self):
+        records = [rec(0), rec(1), rec(2)]
+        self.ledger.record_decision('approved', rec(0, status='approved'))
+        self.ledger.append([evaluation_row('r1', {'score': 1.0})])
+        apply_state(records, self.ledger.replay())
+        self.assertEqual(records[0]['status'], 'approved')
+        self.assertEqual(records[1]['eval'], {'score': 1.0})
+        self.assertNotIn('eval', records[2])
+
+    def test_seed_from_an_earlier_session(self):
+        old = ReviewLedger(Path(self.tmp.name) / 'old.jsonl')
+        old.record_decision('approved', rec(0))
+        old.record_decision('edited', rec(1), rec(1, hetu='h1'))
+        old.append([evaluation_row('r2', {'score': 0.5})])
+        self.ledger.append([evaluation_row('r0', {'score': 0.9})])
+        self.ledger.record_decision('disapproved', rec(1))
+        self.assertEqual(self.ledger.seed(old.replay()), 2)
+        state = self.ledger.replay()
+        self.assertEqual({rid: e['status'] for rid, e in state.items()},
+                         {'r0': 'approved', 'r1': 'disapproved', 'r2': 'queued'})
+        self.assertEqual((state['r0']['eval'], state['r2']['eval']), ({'score': 0.9}, {'score': 0.5}))
+        out = Path(self.tmp.name) / 'approved.jsonl'
+        self.assertEqual(self.ledger.write_approved(out), 1)
+        self.assertEqual(self.ledger.seed(old.replay()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
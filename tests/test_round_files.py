@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import jsonl_codec, round_files
+
+RECS = [{'id': 'a', 'pratijna': 'ā', 'nested': {'k': [1, 2]}}, {'id': 'b', 'notes': None}, {'id': 'c'}]
+
+
+class TestRoundFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pretty, self.clean = round_files.round_paths(self.tmp.name, 'staging_round_0001')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected(self, recs):
+        return json.dumps(recs, ensure_ascii=False, indent=2)
+
+    def test_append_matches_full_serialization(self):
+        round_files.write_pretty(self.pretty, [])
+        self.assertEqual(self.pretty.read_text(encoding='utf-8'), self._expected([]))
+        round_files.append_pretty(self.pretty, RECS[:1])
+        round_files.append_pretty(self.pretty, RECS[1:])
+        self.assertEqual(self.pretty.read_text(encoding='utf-8'), self._expected(RECS))
+
+    def test_append_round_keeps_view_in_sync_or_marks_stale(self):
+        self.assertEqual(round_files.append_round(self.pretty, self.clean, RECS[:1])['pretty'], 'written')
+        self.assertEqual(round_files.append_round(self.pretty, self.clean, RECS[1:2])['pretty'], 'appended')
+        self.assertEqual(json.loads(self.pretty.read_text(encoding='utf-8')), RECS[:2])
+
+        # Rewriting the clean file with the same content keeps the view in sync, whatever its mtime
+        jsonl_codec.write_jsonl(self.clean, RECS[:2])
+        os.utime(self.pretty, ns=(0, 0))
+        self.assertTrue(round_files.is_pretty_fresh(self.pretty, self.clean))
+
+        # An out-of-band edit of the same size, keeping the mtime, makes the view stale until regenerated
+        mtime = self.clean.stat().st_mtime_ns
+        edited = [RECS[0], dict(RECS[1], id='B')]
+        jsonl_codec.write_jsonl(self.clean, edited)
+        os.utime(self.clean, ns=(mtime, mtime))
+        self.assertEqual(round_files.append_round(self.pretty, self.clean, RECS[2:])['pretty'], 'stale')
+        round_files.ensure_pretty(self.clean, self.pretty)
+        self.assertEqual(self.pretty.read_text(encoding='utf-8'), self._expected(edited + RECS[2:]))
+        self.assertTrue(round_files.is_pretty_fresh(self.pretty, self.clean))
+
+
+if __name__ == '__main__':
+    unittest.main()
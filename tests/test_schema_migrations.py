@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from src import jsonl_codec, schema_migrations
+from src.jsonl_codec import SchemaError
+from src.schema_migrations import (CURRENT_VERSION, VERSION_FIELD, detect, migrate, migrate_file, migrate_stream,
+                                   require_canonical)
+
+NYAYA = {'id': 'n1', 'domain': 'Logic / Inference', 'pratijna': 'p', 'hetu': 'h', 'udaharana': 'u',
+         'upanaya': 'up', 'nigamana': 'n', 'grounding_authority': 'g'}
+
+SYLLOGISM = {
+    'domain': 'Philosophy of Religion / Problem of Evil',
+    'major_premise': 'If a perfectly good being exists, then gratuitous evil cannot exist, as it would be prevented.',
+    'minor_premise': 'Gratuitous evil appears to exist. Many cases resist theodicy.',
+    'conclusion': 'The existence of a perfectly good being is doubtful.',
+    'logical_structure': 'modus_tollens',
+    'keywords': ['theodicy', 'evil', 'omnipotence'],
+    'cultural_context': ['Christian theology', 'Hindu karma theory'],
+    'source_authority': 'Mackie, Evil and Omnipotence (1955)',
+}
+
+
+class TestSchemaMigrations(unittest.TestCase):
+
+    def test_detect(self):
+        self.assertEqual(detect(NYAYA), ('nyaya', 0))
+        self.assertEqual(detect(SYLLOGISM), ('syllogism', 0))
+        self.assertEqual(detect({**NYAYA, VERSION_FIELD: CURRENT_VERSION}), schema_migrations.CANONICAL)
+        self.assertIsNone(detect({'domain': 'x'}))
+
+    def test_nyaya_is_stamped(self):
+        out = migrate(NYAYA)
+        self.assertEqual(out, {**NYAYA, VERSION_FIELD: CURRENT_VERSION})
+        self.assertNotIn(VERSION_FIELD, NYAYA)
+        self.assertIs(migrate(out), out)
+        jsonl_codec.decode_entry(jsonl_codec.dumps(out))
+
+    def test_syllogism_to_nyaya(self):
+        out = migrate(SYLLOGISM)
+        self.assertEqual(out[VERSION_FIELD], CURRENT_VERSION)
+        for field in jsonl_codec.REQUIRED_FIELDS:
+            self.assertTrue(out[field], field)
+        self.assertEqual(out['pratijna'], SYLLOGISM['conclusion'])
+        self.assertEqual(out['nigamana'], SYLLOGISM['conclusion'])
+        self.assertEqual(out['hetu'], 'Because gratuitous evil appears to exist, and if a perfectly good being exists.')
+        self.assertEqual(out['upanaya'], 'Since modus tollens applies here, the reasoning from Christian theology '
+                                         'tradition shows the connection.')
+        self.assertEqual(out['grounding_authority'], SYLLOGISM['source_authority'])
+        self.assertEqual(out['cultural_tradition'], 'Non-Western')
+        self.assertEqual(out['complexity_indicators'], ['theodicy', 'evil', 'omnipotence'])
+        self.assertEqual(out['migrated_from']['major_premise'], SYLLOGISM['major_premise'])
+        self.assertNotIn('major_premise', out)
+
+    def test_stream_errors(self):
+        records = [NYAYA, {'domain': 'x'}, SYLLOGISM]
+        with self.assertRaises(SchemaError):
+            list(migrate_stream(records))
+        stats = Counter()
+        kept = list(migrate_stream(records, errors='keep', stats=stats))
+        self.assertEqual(kept[1], {'domain': 'x'})
+        self.assertEqual(stats, {'migrated': 2, 'unrecognized': 1})
+        self.assertEqual(len(list(migrate_stream(records, errors='skip'))), 2)
+
+    def test_readers_require_canonical_records(self):
+        canonical = migrate(NYAYA)
+        self.assertEqual(list(require_canonical([canonical])), [canonical])
+        with self.assertRaisesRegex(SchemaError, 'record 2 of staging.jsonl'):
+            list(require_canonical([canonical, NYAYA], 'staging.jsonl'))
+
+    def test_migrate_file_in_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'staging.jsonl'
+            jsonl_codec.write_jsonl(path, [NYAYA, SYLLOGISM])
+            self.assertEqual(migrate_file(path), {'migrated': 2})
+            self.assertEqual(migrate_file(path), {'canonical': 2})
+            rows = jsonl_codec.read_jsonl(path)
+            self.assertTrue(all(r[VERSION_FIELD] == CURRENT_VERSION for r in rows))
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ['staging.jsonl'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from src import corpus_store, jsonl_codec
+from src.snapshot_store import SnapshotError, SnapshotStore, record_hash
+
+
+def _rec(i, **extra):
+    return dict({'id': f'e{i}', 'domain': 'Nyāya', 'pratijna': f'claim {i}'}, **extra)
+
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmp.name, 'store'))
+        self.corpus = os.path.join(self.tmp.name, 'corpus.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_ignores_key_order(self):
+        self.assertEqual(record_hash({'a': 1, 'b': 'ā'}), record_hash({'b': 'ā', 'a': 1}))
+        self.assertNotEqual(record_hash({'a': 1}), record_hash({'a': 2}))
+
+    def test_hash_uses_stdlib_json_whatever_the_backend(self):
+        rec = {'b': 1e20, 'a': 'ā'}
+        stdlib = json.dumps(rec, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self.assertEqual(record_hash(rec), hashlib.blake2b(stdlib, digest_size=16).hexdigest())
+
+    def test_records_stored_once_across_snapshots(self):
+        self.store.snapshot('r1', [_rec(0), _rec(1)])
+        self.store.snapshot('r2', [_rec(1), _rec(0), _rec(2)])
+        self.assertEqual(len(jsonl_codec.read_jsonl(self.store.pack_path)), 3)
+        self.assertEqual(list(self.store.iter_records('r2')), [_rec(1), _rec(0), _rec(2)])
+        # A fresh instance rebuilds the same object index from disk
+        self.assertEqual(len(SnapshotStore(self.store.root).index), 3)
+
+    def test_pack_is_compressed_and_reindexed_after_a_crash(self):
+        self.store.snapshot('r1', [_rec(0)])
+        self.assertTrue(corpus_store.is_compressed(self.store.pack_path))
+        # A frame appended without its index lines, then a truncated one
+        frame = corpus_store.compress_frame(self.store.codec, [jsonl_codec._dumps_bytes(_rec(1)) + b'\n'])
+        with open(self.store.pack_path, 'ab') as pack:
+            pack.write(frame + frame[:5])
+        store = SnapshotStore(self.store.root)
+        self.assertEqual(store.get(record_hash(_rec(1))), _rec(1))
+        self.assertEqual(jsonl_codec.read_jsonl(store.pack_path), [_rec(0), _rec(1)])
+
+    def test_backup_then_append_is_incremental(self):
+        jsonl_codec.write_jsonl(self.corpus, [_rec(0), _rec(1)])
+        parent = self.store.backup_file(self.corpus)
+        self.assertEqual(self.store.backup_file(self.corpus), parent)  # unchanged file: no new snapshot
+
+        jsonl_codec.write_jsonl(self.corpus, [_rec(2)], append=True)
+        head = self.store.record_append(self.corpus, [_rec(2)], parent)
+        manifest = self.store.manifest(head)
+        self.assertEqual((manifest['kind'], manifest['count'], len(manifest['hashes'])), ('append', 3, 1))
+        self.assertEqual(self.store.backup_file(self.corpus), head)
+
+        out = os.path.join(self.tmp.name, 'restored.jsonl')
+        self.assertEqual(self.store.restore(head, out), 3)
+        self.assertEqual(jsonl_codec.read_jsonl(out), jsonl_codec.read_jsonl(self.corpus))
+        self.assertEqual([m['name'] for m in self.store.log('corpus.jsonl')], [parent, head])
+
+    def test_diff_reports_added_removed_and_modified(self):
+        self.store.snapshot('a', [_rec(0), _rec(1), _rec(2)])
+        self.store.snapshot('b', [_rec(0), _rec(1, hetu='new'), _rec(3)])
+        d = self.store.diff('a', 'b')
+        self.assertEqual(d['unchanged'], 1)
+        self.assertEqual([m['id'] for m in d['modified']], ['e1'])
+        self.assertEqual(d['added'], [record_hash(_rec(3))])
+        self.assertEqual(d['removed'], [record_hash(_rec(2))])
+        with self.assertRaises(SnapshotError):
+            self.store.diff('a', 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.source_fetch import (EXTRACTED_MARKER, HttpCache, ManifestRow, extract_text, fetch_all,
+                              fetch_notes, manifest_from_notes, read_manifest, read_note_header)
+
+PAGES = {
+    '/entries/speech-acts/': ('"v1"', '<html><head><title>Speech Acts</title></head><body><nav>Menu</nav>'
+                                      '<div id="content"><p>Austin &amp; Searle.</p><p>Illocution.</p></div>'
+                                      '<script>x()</script></body></html>'),
+    '/confucius/': ('"c1"', '<html><title>Confucius</title><article><h1>Ren</h1><p>Li and ren.</p></article></html>'),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path not in PAGES:
+            self.send_error(404)
+            return
+        etag, html = PAGES[self.path]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSourceFetch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = HttpCache(self.root / 'cache')
+        _Handler.requests_seen.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_conditional_requests_use_cache(self):
+        url = self.base + '/confucius/'
+        first = fetch_all([url, url], self.cache, workers=2)
+        self.assertEqual(first[url].status, 'fetched')
+        self.assertTrue(first[url].changed)
+        second = fetch_all([url], self.cache)
+        self.assertEqual(second[url].status, 'not_modified')
+        self.assertEqual(second[url].body, first[url].body)
+        self.assertEqual(_Handler.requests_seen, [('/confucius/', None), ('/confucius/', '"c1"')])
+
+    def test_errors_and_stale_fallback(self):
+        missing = self.base + '/missing/'
+        self.assertEqual(fetch_all([missing], self.cache)[missing].status, 'error')
+        url = self.base + '/confucius/'
+        fetch_all([url], self.cache)
+        offline = HttpCache(self.cache.root)
+        dead = 'http://127.0.0.1:9/confucius/'
+        offline._write(offline._path(dead, '.json'), offline._path(url, '.json').read_bytes())
+        offline._write(offline._path(dead, '.body'), offline._path(url, '.body').read_bytes())
+        res = fetch_all([dead], offline)[dead]
+        self.assertEqual(res.status, 'stale')
+        self.assertIn('Confucius', res.html)
+
+    def test_extract_text(self):
+        title, text = extract_text(PAGES['/entries/speech-acts/'][1])
+        self.assertEqual(title, 'Speech Acts')
+        self.assertEqual(text, 'Austin & Searle.\nIllocution.')
+
+    def test_fetch_notes_writes_only_new_or_changed(self):
+        rows = [ManifestRow(self.base + '/entries/speech-acts/', 'sep', 'speech-acts'),
+                ManifestRow(self.base + '/confucius/', 'iep', 'confucius')]
+        outdir = self.root / 'sources'
+        reports = fetch_notes(rows, outdir, self.cache, processes=2)
+        self.assertTrue(all(r['note'] for r in reports))
+        note = Path(reports[0]['note'])
+        self.assertEqual(note.parent, outdir / 'sep')
+        self.assertEqual(read_note_header(note)['Title'], 'Speech Acts')
+        self.assertIn(EXTRACTED_MARKER, note.read_text(encoding='utf-8'))
+
+        self.assertEqual(manifest_from_notes(outdir), sorted(rows, key=lambda r: r.provider))
+        again = fetch_notes(rows, outdir, self.cache)
+        self.assertEqual([r['status'] for r in again], ['not_modified', 'not_modified'])
+        self.assertEqual([r['note'] for r in again], [None, None])
+
+    def test_read_manifest(self):
+        path = self.root / 'm.csv'
+        path.write_text('url,provider,slug\nhttps://x.org/a,sep,a\n,,\n', encoding='utf-8')
+        self.assertEqual(read_manifest(path), [ManifestRow('https://x.org/a', 'sep', 'a')])
+
+
+if __name__ == '__main__':
+    unittest.main()
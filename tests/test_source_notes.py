@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.source_fetch import NoteData, write_note
+from src.source_notes import SourceNotesIndex, normalize_url, parse_note, split_passages, terms
+
+HAND_NOTE = """URL: https://iep.utm.edu/confucius/
+Provider: iep
+Title: Confucius
+Accessed: 2025-08-15 (UTC)
+
+Summary (research notes)
+- Ren (co-humanity): central virtue expressed in considerate relations.
+- Li (ritual propriety): embodied social norms that cultivate virtue.
+
+Key points (bullets)
+- Junzi leads by virtue rather than by punishment.
+"""
+
+ENTRY = {
+    'pratijna': 'Ritual propriety cultivates virtue.',
+    'hetu': 'Embodied social norms train dispositions.',
+    'udaharana': 'Bowing shapes respect.',
+    'grounding_authority': 'Chinese Philosophy / IEP: Confucius, http://www.iep.utm.edu/confucius (accessed 2025-08-15)',
+}
+
+
+class TestSourceNotes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / 'sources'
+        (self.root / 'iep').mkdir(parents=True)
+        self.hand = self.root / 'iep' / 'confucius_iep_20250815.txt'
+        self.hand.write_text(HAND_NOTE, encoding='utf-8')
+        self.fetched = write_note(self.root / 'sep', NoteData(
+            'sep', 'speech-acts', 'https://plato.stanford.edu/entries/speech-acts/', 'Speech Acts',
+            'Illocutionary force differs from propositional content.\n\nFelicity conditions govern success.'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url('http://www.IEP.utm.edu/confucius/#x'), 'iep.utm.edu/confucius')
+        self.assertEqual(normalize_url('https://iep.utm.edu/confucius'), 'iep.utm.edu/confucius')
+
+    def test_terms_fold_accents_before_splitting(self):
+        # r̥ has no precomposed form; its combining ring must not split the word
+        self.assertEqual(terms('kr̥ṣṇa and vr̥tti'), ['krsna', 'vrtti'])
+        self.assertEqual(terms('Pāṇini’s Aṣṭādhyāyī, the-end'), ['panini', 'astadhyayi', 'end'])
+
+    def test_passages_and_sections(self):
+        passages = split_passages(HAND_NOTE.split('\n\n', 1)[1], 'n')
+        self.assertEqual([p.section for p in passages], ['Summary (research notes)'] * 2 + ['Key points (bullets)'])
+        self.assertTrue(passages[0].text.startswith('Ren (co-humanity)'))
+        self.assertEqual(passages[1].counts['virtue'], 1)
+
+    def test_parse_fetched_note(self):
+        note = parse_note(self.fetched, self.root)
+        self.assertEqual((note.provider, note.slug, note.title), ('sep', 'speech-acts', 'Speech Acts'))
+        self.assertEqual([p.number for p in note.passages], [0, 1])
+        self.assertIn('illocutionary', note.passages[0].counts)
+
+    def test_link_entry(self):
+        index = SourceNotesIndex.open(self.root)
+        link = index.link(ENTRY)
+        self.assertTrue(link.resolved)
+        self.assertEqual(link.notes, ['iep/confucius_iep_20250815.txt'])
+        self.assertEqual(link.passages[0][0], 'iep/confucius_iep_20250815.txt#1')
+        self.assertFalse(index.link({'grounding_authority': 'https://example.org/x'}).resolved)
+        self.assertEqual(index.search('illocutionary')[0][0].split('#')[0], index.notes_for_url(
+            'https://plato.stanford.edu/entries/speech-acts')[0].path)
+
+    def test_refresh_is_incremental_and_persisted(self):
+        index = SourceNotesIndex.open(self.root)
+        self.assertTrue((self.root / '.notes_index.json').exists())
+        reopened = SourceNotesIndex(self.root)
+        reopened.load()
+        self.assertEqual(reopened.refresh(), 0)
+        self.assertEqual(set(reopened.passages), set(index.passages))
+
+        self.hand.write_text(HAND_NOTE + '- Xiao: filial piety.\n', encoding='utf-8')
+        os.utime(self.hand, ns=(0, 1))
+        self.fetched.unlink()
+        self.assertEqual(reopened.refresh(), 2)
+        self.assertEqual(reopened.search('filial')[0][0], 'iep/confucius_iep_20250815.txt#3')
+        self.assertEqual(reopened.search('illocutionary'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
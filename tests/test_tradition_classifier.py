@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import jsonl_codec
+from src.tradition_classifier import (DEFAULT_TRAINING, PARENTS, PREDICTED, TraditionClassifier, classify,
+                                     entry_labels, load_training)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+TOPICS = {
+    'Buddhist': ('Madhyamaka emptiness', 'Nāgārjuna dependent origination', 'Buddhist sangha'),
+    'Chinese': ('Confucian ren and li', 'Daoist wu wei', 'Mencius on human nature'),
+    'Hindu': ('Advaita Vedānta brahman', 'Vedic dharma and karma', 'Upaniṣad ātman'),
+    'Western': ('Kantian categorical imperative', 'Cartesian cogito', 'Austin and Searle on speech acts'),
+}
+
+
+def entry(tradition, topic, i, **kw):
+    text = f"{topic} {i}"
+    e = {'domain': f"Philosophy / {topic}", 'pratijna': f"{text} is a thesis.", 'hetu': f"Because of {topic}.",
+         'udaharana': f"As with {topic}.", 'upanaya': f"So {topic} applies.", 'nigamana': 'Therefore it holds.',
+         'grounding_authority': f"{topic} handbook", 'cultural_tradition': tradition}
+    e.update(kw)
+    return e
+
+
+def corpus():
+    return [entry(t, topic, i) for t, topics in TOPICS.items() for topic in topics for i in range(3)]
+
+
+class TestTraditionClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_labels_include_parents(self):
+        self.assertEqual(entry_labels({'cultural_tradition': 'Hindu'}), {'Hindu', 'Indian', 'Non-Western'})
+        self.assertEqual(entry_labels({'cultural_tradition': 'Unknown'}), set())
+        self.assertEqual(entry_labels({'cultural_traditions': ['Buddhist', 'Chinese']}),
+                         {'Buddhist', 'Chinese', 'Non-Western'})
+
+    def test_fit_and_predict(self):
+        model = TraditionClassifier.fit(corpus(), min_df=1)
+        self.assertEqual(model.labels, ['Buddhist', 'Chinese', 'Hindu', 'Indian', 'Non-Western', 'Western'])
+        preds = model.predict([
+            {'pratijna': 'Confucian ren shapes conduct', 'domain': 'Ethics'},
+            {'pratijna': 'Upaniṣad ātman and brahman', 'domain': 'Metaphysics'},
+            {'pratijna': 'Searle on speech acts', 'domain': 'Language'},
+        ])
+        self.assertEqual([p.tradition for p in preds], ['Non-Western', 'Non-Western', 'Western'])
+        self.assertIn('Chinese', preds[0].traditions)
+        self.assertIn('Hindu', preds[1].traditions)
+        self.assertIn('Indian', preds[1].traditions)
+        self.assertNotIn('Non-Western', preds[2].traditions)
+
+    def test_needs_two_traditions(self):
+        with self.assertRaises(ValueError):
+            TraditionClassifier.fit([entry('Western', 'Kant', i) for i in range(3)], min_df=1)
+
+    def test_classify_only_unknown(self):
+        model = TraditionClassifier.fit(corpus(), min_df=1)
+        entries = [{'pratijna': 'Madhyamaka emptiness'}, {'pratijna': 'Cartesian cogito', 'cultural_tradition': 'Chinese'},
+                   {'pratijna': 'Kantian categorical imperative', 'cultural_tradition': 'Unknown'}]
+        self.assertEqual(classify(entries, model), 2)
+        self.assertEqual(entries[0]['cultural_tradition'], 'Non-Western')
+        self.assertIn('Buddhist', entries[0]['cultural_traditions'])
+        self.assertEqual(entries[1]['cultural_tradition'], 'Chinese')
+        self.assertEqual(entries[2]['cultural_tradition'], 'Western')
+        self.assertEqual([e.get('label_source') for e in entries], [PREDICTED, None, PREDICTED])
+
+    def test_predict_traditions_keeps_fine_labels(self):
+        import classify_cultural_traditions
+        with mock.patch.object(classify_cultural_traditions, '_model', TraditionClassifier.fit(corpus(), min_df=1)):
+            fields = classify_cultural_traditions.predict_traditions([
+                {'pratijna': 'Madhyamaka emptiness'},
+                {'pratijna': 'Cartesian cogito', 'cultural_tradition': 'Western'},
+            ])
+        self.assertEqual(list(fields), ['0'])
+        self.assertEqual(fields['0']['cultural_tradition'], 'Non-Western')
+        self.assertIn('Buddhist', fields['0']['cultural_traditions'])
+        self.assertEqual(fields['0']['label_source'], PREDICTED)
+
+    def test_predicted_labels_are_not_trained_on(self):
+        training = self.root / 'train.jsonl'
+        predicted = entry('Western', 'Madhyamaka emptiness', 9, label_source=PREDICTED)
+        jsonl_codec.write_jsonl(training, corpus() + [predicted])
+        self.assertEqual(len(load_training([training])), len(corpus()))
+
+    def test_seed_labels_cover_fine_traditions(self):
+        seed = load_training([REPO_ROOT / DEFAULT_TRAINING[0]])
+        covered = {l for e in seed for l in entry_labels(e)}
+        self.assertLessEqual(set(PARENTS), covered)
+
+    def test_open_retrains_only_when_training_changes(self):
+        training = self.root / 'train.jsonl'
+        model_path = self.root / 'model.json'
+        jsonl_codec.write_jsonl(training, corpus() + [{'domain': 'unlabelled'}])
+        self.assertEqual(len(load_training([training])), len(corpus()))
+
+        first = TraditionClassifier.open(model_path, [training])
+        mtime = model_path.stat().st_mtime_ns
+        again = TraditionClassifier.open(model_path, [training])
+        self.assertEqual(model_path.stat().st_mtime_ns, mtime)
+        self.assertEqual(again.labels, first.labels)
+        sample = [{'pratijna': 'Daoist wu wei'}]
+        self.assertEqual(again.predict(sample), first.predict(sample))
+
+        jsonl_codec.write_jsonl(training, [entry('Islamic', 'Al-Ghazali occasionalism', i) for i in range(3)],
+                                append=True)
+        os.utime(training, ns=(mtime + 10**9, mtime + 10**9))
+        self.assertIn('Islamic', TraditionClassifier.open(model_path, [training]).labels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.workflow_dag import Stage, WorkflowError, WorkflowRunner
+
+
+class TestWorkflowRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_runs_stages_in_dependency_order(self):
+        stages = [
+            Stage('total', lambda doubled, tripled: {'total': doubled + tripled},
+                  inputs=('doubled', 'tripled'), outputs=('total',)),
+            Stage('double', lambda x: {'doubled': x * 2}, inputs=('x',), outputs=('doubled',)),
+            Stage('triple', lambda x: {'tripled': x * 3}, inputs=('x',), outputs=('tripled',)),
+        ]
+        artifacts = WorkflowRunner(stages).run({'x': 2})
+        self.assertEqual(artifacts['total'], 10)
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def left(x):
+            barrier.wait()
+            return {'left': x}
+
+        def right(x):
+            barrier.wait()
+            return {'right': x}
+
+        stages = [
+            Stage('left', left, inputs=('x',), outputs=('left',)),
+            Stage('right', right, inputs=('x',), outputs=('right',)),
+        ]
+        artifacts = WorkflowRunner(stages, max_workers=2).run({'x': 1})
+        self.assertEqual((artifacts['left'], artifacts['right']), (1, 1))
+
+    def test_cached_stage_is_skipped_when_inputs_unchanged(self):
+        calls = []
+
+        def count(items):
+            calls.append(1)
+            return {'n': len(items)}
+
+        stages = [Stage('count', count, inputs=('items',), outputs=('n',))]
+        WorkflowRunner(stages, cache_dir=self.cache_dir).run({'items': [1, 2, 3]})
+        runner = WorkflowRunner(stages, cache_dir=self.cache_dir)
+        artifacts = runner.run({'items': [1, 2, 3]})
+
+        self.assertEqual(artifacts['n'], 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(runner.results['count'].status, 'cached')
+
+        WorkflowRunner(stages, cache_dir=self.cache_dir).run({'items': [1, 2]})
+        self.assertEqual(len(calls), 2)
+
+    def test_failure_skips_dependents(self):
+        def boom(x):
+            raise ValueError('bad input')
+
+        stages = [
+            Stage('boom', boom, inputs=('x',), outputs=('y',)),
+            Stage('after', lambda y: {'z': y}, inputs=('y',), outputs=('z',)),
+        ]
+        runner = WorkflowRunner(stages)
+        with self.assertRaises(WorkflowError):
+            runner.run({'x': 1})
+        self.assertEqual(runner.results['boom'].status, 'failed')
+        self.assertEqual(runner.results['after'].status, 'skipped')
+
+    def test_cycle_is_rejected(self):
+        stages = [
+            Stage('a', lambda b: {'a': b}, inputs=('b',), outputs=('a',)),
+            Stage('b', lambda a: {'b': a}, inputs=('a',), outputs=('b',)),
+        ]
+        with self.assertRaises(WorkflowError):
+            WorkflowRunner(stages).run({})
+
+
+if __name__ == '__main__':
+    unittest.main()